@@ -4,5 +4,18 @@ Unified AI system for trade reconciliation
 """
 
 from .intelligence_engine import TradeReconIntelligenceEngine
+from .analysis_cache import AnalysisCache, exception_signature
+from .clustering import cluster_exceptions
+from .circuit_breaker import CircuitBreaker
+from .backends import LLMBackend, GroqBackend, FakeBackend
 
-__all__ = ['TradeReconIntelligenceEngine']
+__all__ = [
+    'TradeReconIntelligenceEngine',
+    'AnalysisCache',
+    'exception_signature',
+    'cluster_exceptions',
+    'CircuitBreaker',
+    'LLMBackend',
+    'GroqBackend',
+    'FakeBackend',
+]
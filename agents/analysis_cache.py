@@ -0,0 +1,340 @@
+"""
+TradeRecon Intelligence Engine - Persistent analysis cache
+Reuses analyses of recurring breaks, keyed by a normalized exception signature
+"""
+
+import hashlib
+import json
+import math
+import numbers
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+import pandas as pd
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / '.traderecon_analysis_cache.sqlite'
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10000
+
+# Fields identifying where a break happened (same symbol, same account)
+CONTEXT_FIELDS = ('symbol', 'account_id')
+
+# Per-trade values that differ between exceptions sharing a signature
+TRADE_VALUE_FIELDS = ('quantity', 'price', 'trade_time')
+
+# Renderings of a number an analysis is likely to use (100 / 1,000 / 178.90 / 1,780.90)
+NUMBER_FORMATS = (str, '{:,}'.format, '{:.2f}'.format, '{:,.2f}'.format)
+
+# A trade_id is replaced only as a whole token: not inside a longer word or
+# identifier, and not as part of a number, date or time ("1.50", "1,000",
+# "2024-01-03", "10:01")
+TOKEN_START = r'(?<![\w\-/])(?<!\d[.,:])'
+TOKEN_END = r'(?![\w\-/]|[.,:]\d)'
+
+# A numeric trade_id is indistinguishable from a quantity or duration ("1 business
+# day"), so it is only replaced where the text refers to a trade ("trade 1",
+# "Trade ID: 1", "#1")
+TRADE_REFERENCE = r'((?:\btrade(?:[ _]?id)?|\bid)\s*[:#]?\s*|#)'
+
+
+def _field_value(exception: Dict[str, Any], field: str, side: str) -> Any:
+    """Structured value of one field on one side (trade_id uses its own column names)"""
+    if field == 'trade_id':
+        return exception.get('trade_id' if side == 'broker' else 'trade_id_exchange')
+    return exception.get(f'{field}_{side}')
+
+
+def _normalize_delta(broker_value: Any, exchange_value: Any) -> Any:
+    """Exchange-minus-broker delta for numbers and timestamps, else the value pair"""
+    if isinstance(broker_value, numbers.Number) and isinstance(exchange_value, numbers.Number) \
+            and not isinstance(broker_value, bool):
+        return round(float(exchange_value) - float(broker_value), 6)
+    try:
+        delta = exchange_value - broker_value
+        if hasattr(delta, 'total_seconds'):
+            return round(delta.total_seconds(), 3)
+    except TypeError:
+        pass
+    return [str(broker_value), str(exchange_value)]
+
+
+def size_bucket(quantity: Any, price: Any) -> Optional[int]:
+    """Order of magnitude of a trade's notional (quantity x price), None if unavailable"""
+    try:
+        notional = abs(float(quantity) * float(price))
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(notional) or notional <= 0:
+        return None
+    return int(math.floor(math.log10(notional)))
+
+
+def exception_signature(exception: Dict[str, Any]) -> str:
+    """
+    Normalized signature of an exception, independent of its trade_id.
+
+    Combines exception_type, the mismatched fields, the symbol/account context
+    and per-field value deltas (numeric and time differences, or the
+    broker/exchange value pair for text fields). Differing trade_ids only
+    contribute the fact that they differ. Missing trades have no deltas, so
+    the order of magnitude of their notional (size_bucket()) is used instead.
+    """
+    exception_type = exception.get('exception_type')
+    fields_text = exception.get('mismatched_fields') or ''
+    fields = sorted(f.strip() for f in str(fields_text).split(',') if f.strip() and f.strip() != 'N/A')
+
+    side = 'exchange' if exception_type == 'missing_in_broker' else 'broker'
+    context = {field: str(exception.get(f'{field}_{side}')) for field in CONTEXT_FIELDS}
+
+    deltas = {}
+    for field in fields:
+        if field == 'trade_id':
+            deltas[field] = 'differs'
+            continue
+        broker_value = _field_value(exception, field, 'broker')
+        exchange_value = _field_value(exception, field, 'exchange')
+        if broker_value is None and exchange_value is None:
+            # Rendered-only record: fall back to the rendered value strings
+            deltas = {'broker_values': str(exception.get('broker_values')),
+                      'exchange_values': str(exception.get('exchange_values'))}
+            break
+        deltas[field] = _normalize_delta(broker_value, exchange_value)
+
+    if exception_type in ('missing_in_broker', 'missing_in_exchange'):
+        deltas['size_bucket'] = size_bucket(exception.get(f'quantity_{side}'), exception.get(f'price_{side}'))
+
+    payload = json.dumps(
+        {'exception_type': exception_type, 'fields': fields, 'context': context, 'deltas': deltas},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def substitute_trade_id(analysis: Any, old_trade_id: Any, new_trade_id: Any) -> Any:
+    """Copy of an analysis with every mention of old_trade_id (as a whole token) replaced by new_trade_id"""
+    old, new = str(old_trade_id), str(new_trade_id)
+    if not old or old == new:
+        return _substitute(analysis, None, None)
+    if old.isdigit():
+        pattern = re.compile(TRADE_REFERENCE + re.escape(old) + TOKEN_END, re.IGNORECASE)
+        return _substitute(analysis, pattern, lambda match: match.group(1) + new)
+    pattern = re.compile(TOKEN_START + re.escape(old) + TOKEN_END)
+    return _substitute(analysis, pattern, lambda match: new)
+
+
+def _substitute(analysis: Any, pattern: Optional[re.Pattern], replace: Optional[Callable]) -> Any:
+    """Copy of nested dicts/lists with pattern.sub(replace) applied to every string (None: plain copy)"""
+    if isinstance(analysis, dict):
+        return {key: _substitute(value, pattern, replace) for key, value in analysis.items()}
+    if isinstance(analysis, list):
+        return [_substitute(value, pattern, replace) for value in analysis]
+    if isinstance(analysis, str) and pattern is not None:
+        return pattern.sub(replace, analysis)
+    return analysis
+
+
+def substitute_values(analysis: Any, replacements: Dict[str, str]) -> Any:
+    """
+    Copy of an analysis with whole-token occurrences of each replacements key
+    (e.g. a rendered price or timestamp) swapped for its value, in one pass
+    """
+    replacements = {old: new for old, new in replacements.items() if old and old != new}
+    if not replacements:
+        return _substitute(analysis, None, None)
+    # Longest first, so "1,000.50" wins over "1,000"
+    alternatives = '|'.join(re.escape(old) for old in sorted(replacements, key=len, reverse=True))
+    pattern = re.compile(TOKEN_START + '(?:' + alternatives + ')' + TOKEN_END)
+    return _substitute(analysis, pattern, lambda match: replacements[match.group(0)])
+
+
+def _renderings(value: Any) -> List[str]:
+    """Text forms of a trade value, aligned across values of the same type ([] if missing)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return []
+    if hasattr(value, 'strftime'):
+        if value != value:  # NaT
+            return []
+        return [str(value), value.isoformat(), value.strftime('%H:%M:%S')]
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        if float(value).is_integer():
+            value = int(value)
+        return [fmt(value) for fmt in NUMBER_FORMATS]
+    return [str(value)]
+
+
+def _notional(exception: Dict[str, Any], side: str) -> Any:
+    try:
+        notional = float(exception.get(f'quantity_{side}')) * float(exception.get(f'price_{side}'))
+    except (TypeError, ValueError):
+        return None
+    return notional if math.isfinite(notional) else None
+
+
+def value_replacements(representative: Dict[str, Any], member: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Map the representative's rendered quantities, prices, notionals and trade
+    times to the member's, for every side both records carry
+    """
+    replacements = {}
+    for side in ('broker', 'exchange'):
+        pairs = [(representative.get(f'{field}_{side}'), member.get(f'{field}_{side}'))
+                 for field in TRADE_VALUE_FIELDS]
+        pairs.append((_notional(representative, side), _notional(member, side)))
+        for old_value, new_value in pairs:
+            old_forms, new_forms = _renderings(old_value), _renderings(new_value)
+            if len(old_forms) != len(new_forms):
+                continue
+            candidates = {}
+            for old, new in zip(old_forms, new_forms):
+                candidates.setdefault(old, []).append(new)
+            for old, news in candidates.items():
+                # "150.25" is both str() and '{:.2f}'; keep the form shaped like the quoted text
+                replacements.setdefault(old, max(news, key=lambda new: _shape(new) == _shape(old)))
+    return replacements
+
+
+def _shape(text: str) -> tuple:
+    """Thousands separator and decimal places of a rendered number"""
+    return (',' in text, len(text.rpartition('.')[2]) if '.' in text else 0)
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON-safe form of a trade value (timestamps tagged so they decode as timestamps)"""
+    if hasattr(value, 'isoformat'):
+        return {'timestamp': value.isoformat()} if value == value else None
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    return None
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return pd.Timestamp(value['timestamp'])
+    return value
+
+
+def source_values(exception: Dict[str, Any]) -> Dict[str, Any]:
+    """The trade_id and per-side trade values of an exception, JSON-safe"""
+    values = {f'{field}_{side}': _encode_value(exception.get(f'{field}_{side}'))
+              for field in TRADE_VALUE_FIELDS for side in ('broker', 'exchange')}
+    values['trade_id'] = str(exception.get('trade_id', 'Unknown'))
+    return values
+
+
+def adapt_analysis(analysis: Dict[str, Any], source: Dict[str, Any], target: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of an analysis of the source exception rewritten for the target.
+
+    Both share a signature, so only trade-level details differ: the source's
+    quantities, prices, notionals and trade times are replaced with the
+    target's, then its trade_id.
+    """
+    adapted = substitute_values(analysis, value_replacements(source, target))
+    adapted = substitute_trade_id(adapted, source.get('trade_id', 'Unknown'), target.get('trade_id', 'Unknown'))
+    adapted['_trade_id'] = target.get('trade_id', 'Unknown')
+    return adapted
+
+
+class AnalysisCache:
+    """
+    On-disk SQLite cache of engine analyses keyed by exception_signature()
+
+    Entries expire after ttl_seconds; once more than max_entries are stored
+    the least recently used ones are evicted. Safe to share between the
+    engine's worker threads.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Open (and create if needed) the cache database"""
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(analysis_cache)")}
+            if columns and 'source' not in columns:
+                # Entries without their source values cannot be adapted to another trade
+                conn.execute("DROP TABLE analysis_cache")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS analysis_cache (
+                    signature TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS analysis_cache_lru ON analysis_cache (last_used)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, exception: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Cached analysis for an exception, rewritten with its trade_id and values
+        (see adapt_analysis()).
+
+        Returns None (and counts a miss) when nothing fresh is stored.
+        """
+        signature = exception_signature(exception)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT source, analysis, created_at FROM analysis_cache WHERE signature = ?",
+                (signature,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM analysis_cache WHERE signature = ?", (signature,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE analysis_cache SET last_used = ? WHERE signature = ?", (now, signature))
+            self.hits += 1
+
+        source = {key: _decode_value(value) for key, value in json.loads(row[0]).items()}
+        analysis = adapt_analysis(json.loads(row[1]), source, exception)
+        analysis['_cache_hit'] = True
+        return analysis
+
+    def put(self, exception: Dict[str, Any], analysis: Dict[str, Any]):
+        """Store an analysis with its source values and evict expired and least recently used entries"""
+        signature = exception_signature(exception)
+        now = time.time()
+        stored = {key: value for key, value in analysis.items() if key not in ('_trade_id', '_cache_hit')}
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """INSERT INTO analysis_cache (signature, source, analysis, created_at, last_used)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(signature) DO UPDATE SET
+                       source = excluded.source,
+                       analysis = excluded.analysis,
+                       created_at = excluded.created_at,
+                       last_used = excluded.last_used""",
+                (signature, json.dumps(source_values(exception)), json.dumps(stored, default=str), now, now)
+            )
+            conn.execute("DELETE FROM analysis_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                """DELETE FROM analysis_cache WHERE signature IN (
+                       SELECT signature FROM analysis_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                   )""",
+                (self.max_entries,)
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters since this cache was opened, plus stored entries"""
+        with self._lock, self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def clear(self):
+        """Drop every cached analysis"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM analysis_cache")
@@ -0,0 +1,224 @@
+"""
+TradeRecon Intelligence Engine - LLM backends
+The engine talks to a backend instead of a hard-wired client: Groq in
+production, or a local stand-in (in-process fake or HTTP server) for offline
+benchmarks and load tests
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Any, List
+
+import httpx
+from groq import Groq, APITimeoutError, RateLimitError, InternalServerError
+
+# Path of the chat completions endpoint served by benchmarks/llm_standin.py
+STANDIN_COMPLETIONS_PATH = '/openai/v1/chat/completions'
+
+
+class LLMBackend:
+    """
+    Chat completion backend interface
+
+    complete() returns an object shaped like the Groq SDK response:
+    completion.choices[0].message.content and completion.usage.prompt_tokens /
+    completion_tokens. Failures are raised as groq SDK exceptions so the
+    engine's retry and circuit breaker logic applies unchanged.
+    """
+
+    name = 'backend'
+
+    def complete(self, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                 temperature: float, timeout: float):
+        raise NotImplementedError
+
+
+class GroqBackend(LLMBackend):
+    """
+    Groq chat completions (or any Groq-compatible endpoint via base_url,
+    such as the local stand-in server)
+    """
+
+    name = 'groq'
+
+    def __init__(self, api_key: str, timeout: float = 60.0, base_url: str = None):
+        # Retries are handled by the engine (with shared rate-limit backoff), not in the SDK
+        self.client = Groq(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout)
+
+    def complete(self, model, messages, max_tokens, temperature, timeout):
+        return self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"},
+            timeout=timeout
+        )
+
+
+def _prompt_exceptions(content: str) -> List[Dict[str, Any]]:
+    """Recover the exceptions described in an engine prompt (any prompt mode)"""
+    exceptions = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line.startswith('{'):
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict) and ('trade_id' in record or 'id' in record):
+            exceptions.append({
+                'trade_id': str(record.get('trade_id', record.get('id'))),
+                'exception_type': record.get('exception_type', record.get('type', 'mismatch')),
+                'mismatched_fields': record.get('mismatched_fields', record.get('fields', ''))
+            })
+    if not exceptions:
+        # Verbose single-exception prompt
+        trade_id = re.search(r'- Trade ID: (.+)', content)
+        exception_type = re.search(r'- Exception Type: (.+)', content)
+        fields = re.search(r'- Discrepancy Fields: (.+)', content)
+        exceptions.append({
+            'trade_id': trade_id.group(1).strip() if trade_id else 'Unknown',
+            'exception_type': exception_type.group(1).strip() if exception_type else 'mismatch',
+            'mismatched_fields': fields.group(1).strip() if fields else ''
+        })
+    return exceptions
+
+
+def standin_analysis(exception: Dict[str, Any]) -> Dict[str, Any]:
+    """Deterministic, schema-valid analysis for one exception"""
+    trade_id = exception['trade_id']
+    exception_type = str(exception.get('exception_type', 'mismatch'))
+    fields = str(exception.get('mismatched_fields', ''))
+
+    if exception_type.startswith('missing'):
+        category, severity, action = 'Missing Data', 'High', 'ESCALATE'
+    elif 'trade_time' in fields and ',' not in fields:
+        category, severity, action = 'Timing Mismatch', 'Low', 'MANUAL_REVIEW'
+    elif any(field in fields for field in ('quantity', 'price', 'side', 'symbol')):
+        category, severity, action = 'Data Entry Error', 'High', 'SQL_UPDATE'
+    else:
+        category, severity, action = 'System Synchronization', 'Medium', 'MANUAL_REVIEW'
+
+    return {
+        'trade_id': trade_id,
+        'root_cause': {
+            'category': category,
+            'reason': f"Trade {trade_id} shows a {exception_type} affecting {fields or 'the trade record'}. "
+                      f"The pattern is consistent with a {category.lower()} between broker and exchange systems.",
+            'confidence_score': 0.8
+        },
+        'severity': severity,
+        'fix_suggestion': {
+            'action_type': action,
+            'suggested_fix': f"Compare trade {trade_id} against the exchange confirmation and correct the system of record.",
+            'estimated_time': '1 hour'
+        },
+        'risk_assessment': {
+            'financial_risk': 'Exposure limited to the affected trade until corrected.',
+            'operational_risk': 'Settlement may be delayed until the records agree.',
+            'compliance_risk': 'Exception is logged and requires documented resolution.',
+            'overall_risk_level': severity
+        },
+        'compliance_note': f"Trade {trade_id} logged for reconciliation review.",
+        'full_explanation': f"Trade {trade_id} was flagged as a {exception_type}. "
+                            f"Root cause is assessed as {category.lower()}. The reconciliation team should "
+                            f"confirm the correct values and update the affected record."
+    }
+
+
+def standin_response(messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Response body the stand-ins return for an engine request.
+
+    Batched prompts (asking for an "analyses" array) get one element per
+    exception keyed by trade_id; single prompts get one analysis object.
+
+    Returns:
+        Dictionary with 'content' (JSON string) and 'usage' token counts
+    """
+    content = messages[-1]['content']
+    exceptions = _prompt_exceptions(content)
+    if '"analyses"' in content:
+        body = {'analyses': [standin_analysis(exc) for exc in exceptions]}
+    else:
+        body = standin_analysis(exceptions[0])
+        body.pop('trade_id')
+    text = json.dumps(body)
+    prompt_chars = sum(len(message['content']) for message in messages)
+    return {
+        'content': text,
+        'usage': {'prompt_tokens': prompt_chars // 4 + 1, 'completion_tokens': len(text) // 4 + 1}
+    }
+
+
+def _completion(content: str, usage: Dict[str, int], model: str):
+    """Groq-SDK-shaped completion object"""
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(index=0, finish_reason='stop', message=SimpleNamespace(role='assistant', content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=usage['prompt_tokens'],
+            completion_tokens=usage['completion_tokens'],
+            total_tokens=usage['prompt_tokens'] + usage['completion_tokens']
+        )
+    )
+
+
+class FakeBackend(LLMBackend):
+    """
+    In-process stand-in returning schema-valid analyses
+
+    Simulates latency (latency_seconds plus uniform jitter), server errors
+    (error_rate) and rate-limit responses (rate_limit_rate, with a Retry-After
+    of retry_after seconds). A call whose latency exceeds its timeout waits
+    for the timeout and raises APITimeoutError, as the Groq client does. Rates can be set per model via model_overrides,
+    e.g. {'openai/gpt-oss-120b': {'error_rate': 1.0}} to take the primary down.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency_seconds: float = 0.0, jitter_seconds: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0, model_overrides: Dict[str, Dict] = None,
+                 seed: int = None):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.model_overrides = model_overrides or {}
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _setting(self, model: str, name: str) -> float:
+        return self.model_overrides.get(model, {}).get(name, getattr(self, name))
+
+    def complete(self, model, messages, max_tokens, temperature, timeout):
+        with self._lock:
+            self.calls += 1
+            jitter = self._random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0.0
+            roll = self._random.random()
+        latency = self._setting(model, 'latency_seconds') + jitter
+
+        request = httpx.Request('POST', f'http://fake-backend{STANDIN_COMPLETIONS_PATH}')
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise APITimeoutError(request=request)
+        time.sleep(latency)
+
+        rate_limit_rate = self._setting(model, 'rate_limit_rate')
+        if roll < rate_limit_rate:
+            response = httpx.Response(429, headers={'retry-after': str(self.retry_after)}, request=request)
+            raise RateLimitError('Rate limit reached (fake backend)', response=response, body=None)
+        if roll < rate_limit_rate + self._setting(model, 'error_rate'):
+            response = httpx.Response(503, request=request)
+            raise InternalServerError('Service unavailable (fake backend)', response=response, body=None)
+
+        result = standin_response(messages)
+        return _completion(result['content'], result['usage'], model)
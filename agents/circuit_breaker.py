@@ -0,0 +1,161 @@
+"""
+TradeRecon Intelligence Engine - Circuit breaker
+Tracks recent failures and latency per model so unhealthy models can be skipped
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Transitions kept for metrics
+MAX_TRANSITIONS = 200
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the model's circuit is open"""
+
+    def __init__(self, model: str):
+        super().__init__(f"Circuit open for model {model}")
+        self.model = model
+
+
+class CircuitBreaker:
+    """
+    Per-model circuit breaker shared by the engine's worker threads
+
+    A model's circuit opens after failure_threshold failures within
+    window_seconds (server errors, timeouts, or rate limits that outlast the
+    caller's retries, so a model that is down or throttled is routed around),
+    or when the average latency of its last latency_samples
+    successful calls exceeds slow_call_seconds. While open, allow() refuses
+    calls; after cooldown_seconds one probe call is let through (half-open).
+    A successful probe closes the circuit, a failed one reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, window_seconds: float = 60.0,
+                 cooldown_seconds: float = 30.0, slow_call_seconds: float = 30.0,
+                 latency_samples: int = 10):
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.latency_samples = latency_samples
+        self._models = {}
+        self._transitions = deque(maxlen=MAX_TRANSITIONS)
+        self._lock = threading.Lock()
+
+    def _model(self, model: str) -> Dict[str, Any]:
+        if model not in self._models:
+            self._models[model] = {
+                'state': CLOSED,
+                'failures': deque(),
+                'latencies': deque(maxlen=self.latency_samples),
+                'opened_at': None,
+                'probe_started': None,
+                'calls': 0,
+                'failed_calls': 0,
+                'times_opened': 0
+            }
+        return self._models[model]
+
+    def _transition(self, model: str, entry: Dict[str, Any], state: str, reason: str):
+        if entry['state'] == state:
+            return
+        self._transitions.append({
+            'model': model,
+            'from': entry['state'],
+            'to': state,
+            'reason': reason,
+            'at': datetime.now(timezone.utc).isoformat()
+        })
+        print(f"🔌 Circuit for {model}: {entry['state']} -> {state} ({reason})")
+        entry['state'] = state
+        if state == OPEN:
+            entry['opened_at'] = time.monotonic()
+            entry['times_opened'] += 1
+        if state != HALF_OPEN:
+            entry['probe_started'] = None
+
+    def allow(self, model: str) -> bool:
+        """
+        Whether a new call to model may start.
+
+        When the cooldown has elapsed this claims the single half-open probe,
+        so callers must follow up with record_success() or record_failure().
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._model(model)
+            if entry['state'] == CLOSED:
+                return True
+            if entry['state'] == OPEN:
+                if now - entry['opened_at'] < self.cooldown_seconds:
+                    return False
+                self._transition(model, entry, HALF_OPEN, 'cooldown elapsed')
+            # Half-open: one probe at a time (a stuck probe is replaced after a cooldown)
+            if entry['probe_started'] is not None and now - entry['probe_started'] < self.cooldown_seconds:
+                return False
+            entry['probe_started'] = now
+            return True
+
+    def is_open(self, model: str) -> bool:
+        """Whether model is currently refusing calls (no side effects)"""
+        with self._lock:
+            return self._model(model)['state'] == OPEN
+
+    def record_success(self, model: str, latency: float):
+        """Record a successful call and its latency"""
+        with self._lock:
+            entry = self._model(model)
+            entry['calls'] += 1
+            entry['latencies'].append(latency)
+            if entry['state'] == HALF_OPEN:
+                entry['failures'].clear()
+                entry['latencies'].clear()
+                entry['latencies'].append(latency)
+                self._transition(model, entry, CLOSED, 'probe succeeded')
+            elif (entry['state'] == CLOSED and self.slow_call_seconds
+                    and len(entry['latencies']) == entry['latencies'].maxlen
+                    and sum(entry['latencies']) / len(entry['latencies']) > self.slow_call_seconds):
+                self._transition(model, entry, OPEN, 'latency above threshold')
+
+    def record_failure(self, model: str, error: Exception = None):
+        """Record a failed call"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._model(model)
+            entry['calls'] += 1
+            entry['failed_calls'] += 1
+            failures = entry['failures']
+            failures.append(now)
+            while failures and now - failures[0] > self.window_seconds:
+                failures.popleft()
+            reason = type(error).__name__ if error is not None else 'failure'
+            if entry['state'] == HALF_OPEN:
+                self._transition(model, entry, OPEN, f'probe failed: {reason}')
+            elif entry['state'] == CLOSED and len(failures) >= self.failure_threshold:
+                self._transition(model, entry, OPEN, f'{len(failures)} failures in {self.window_seconds:.0f}s: {reason}')
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-model state, call counts and latency, plus recent state transitions"""
+        now = time.monotonic()
+        with self._lock:
+            models = {}
+            for model, entry in self._models.items():
+                latencies = entry['latencies']
+                models[model] = {
+                    'state': entry['state'],
+                    'calls': entry['calls'],
+                    'failed_calls': entry['failed_calls'],
+                    'recent_failures': sum(1 for t in entry['failures'] if now - t <= self.window_seconds),
+                    'avg_latency_seconds': round(sum(latencies) / len(latencies), 3) if latencies else None,
+                    'times_opened': entry['times_opened']
+                }
+            transitions: List[Dict[str, Any]] = list(self._transitions)
+        return {'models': models, 'transitions': transitions}
@@ -0,0 +1,79 @@
+"""
+TradeRecon Intelligence Engine - Exception clustering
+Groups near-identical exceptions so only one representative per cluster is analyzed
+"""
+
+from typing import Dict, Any, List
+
+from .analysis_cache import adapt_analysis, exception_signature
+
+
+def cluster_exceptions(exceptions: List[Dict[str, Any]]) -> List[List[int]]:
+    """
+    Group exceptions by exception_signature().
+
+    Members of a cluster share exception type, mismatched fields, symbol,
+    account and value-delta pattern (or notional size bucket for missing
+    trades), and differ only in trade-level details.
+
+    Args:
+        exceptions: Rendered exception records
+
+    Returns:
+        List of clusters (lists of exception indices), in order of first
+        appearance; the first index of each cluster is its representative
+    """
+    clusters = {}
+    for idx, exception in enumerate(exceptions):
+        clusters.setdefault(exception_signature(exception), []).append(idx)
+    return list(clusters.values())
+
+
+def fan_out_analysis(analysis: Dict[str, Any], representative: Dict[str, Any],
+                     member: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Adapt a representative's analysis to another member of its cluster.
+
+    Members share the value deltas but not the trade-level figures, so the
+    representative's quantities, prices, notionals and trade times are
+    replaced with the member's wherever the analysis text quotes them.
+
+    Args:
+        analysis: Engine analysis of the representative
+        representative: The representative exception record
+        member: The member exception record
+
+    Returns:
+        Copy of the analysis with the member's trade_id and values substituted in
+    """
+    return adapt_analysis(analysis, representative, member)
+
+
+def cluster_record(exc: Dict[str, Any]) -> Dict[str, Any]:
+    """Cluster description taken from one enriched member (see cluster_summary())"""
+    side = 'exchange' if exc.get('exception_type') == 'missing_in_broker' else 'broker'
+    return {
+        'cluster_id': exc.get('cluster_id'),
+        'size': exc.get('cluster_size', 1),
+        'exception_type': exc.get('exception_type', 'mismatch'),
+        'mismatched_fields': exc.get('mismatched_fields', 'N/A'),
+        'symbol': exc.get(f'symbol_{side}'),
+        'representative_trade_id': exc.get('trade_id', 'Unknown')
+    }
+
+
+def cluster_summary(analyzed_exceptions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Per-cluster sizes of enriched exceptions carrying cluster_id / cluster_size.
+
+    Returns:
+        List of cluster dicts (cluster_id, size, exception_type, mismatched_fields,
+        symbol, representative_trade_id), largest first
+    """
+    clusters = {}
+    for exc in analyzed_exceptions:
+        cluster_id = exc.get('cluster_id')
+        if cluster_id is None or cluster_id in clusters:
+            continue
+        clusters[cluster_id] = cluster_record(exc)
+    return sorted(clusters.values(), key=lambda cluster: (-cluster['size'], cluster['cluster_id']))
@@ -5,9 +5,103 @@ Enterprise-level trade reconciliation AI system
 
 import os
 import json
-from groq import Groq
-from typing import Dict, Any
-from datetime import datetime
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from groq import RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
+from typing import Dict, Any, List, Callable, Optional
+
+from .analysis_cache import AnalysisCache
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .backends import LLMBackend, GroqBackend
+from .scheduler import DeadlineExceeded, check_budget, time_left
+from .report_writer import iter_compliance_report, write_compliance_report
+
+# Transient API failures worth retrying with backoff
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+# JSON structure requested for every exception analysis
+ANALYSIS_SCHEMA = """{
+    "root_cause": {
+        "category": "One of: Data Entry Error | Timing Mismatch | System Synchronization | Rounding Discrepancy | Missing Data | Configuration Issue | Manual Override",
+        "reason": "Detailed, professional explanation of the root cause (2-3 sentences, suitable for audit documentation)",
+        "confidence_score": 0.0-1.0
+    },
+    "severity": "High | Medium | Low",
+    "fix_suggestion": {
+        "action_type": "SQL_UPDATE | API_CALL | MANUAL_REVIEW | ESCALATE",
+        "suggested_fix": "Specific, actionable resolution steps (professional language, audit-ready)",
+        "estimated_time": "Realistic time estimate (e.g., '30 minutes', '2 hours', '1 business day')"
+    },
+    "risk_assessment": {
+        "financial_risk": "Professional assessment of financial exposure and PnL impact",
+        "operational_risk": "Assessment of operational impact on settlement and reconciliation processes",
+        "compliance_risk": "Regulatory and audit implications of this exception",
+        "overall_risk_level": "Critical | High | Medium | Low"
+    },
+    "compliance_note": "Single professional sentence suitable for compliance audit logs",
+    "full_explanation": "Comprehensive analysis (3-4 sentences) explaining the exception, its business impact, and recommended resolution in professional language suitable for senior management review"
+}"""
+
+ANALYSIS_REQUIREMENTS = """Requirements:
+- Use professional financial services language
+- Provide specific, actionable recommendations
+- Never use "N/A", "Unknown", or empty values
+- All text must be audit-ready and compliance-suitable
+- Be precise and factual based on the data provided
+- Avoid special characters like ampersands that may break PDF rendering"""
+
+# Prompt modes: the original prose prompts, or a compact encoding of the same request
+PROMPT_MODES = ('verbose', 'compact')
+
+COMPACT_SYSTEM_PROMPT = (
+    "You are a senior trade reconciliation analyst. Reply with valid JSON only, in professional, "
+    "audit-ready language. Never use placeholders such as N/A or empty values, and avoid ampersands."
+)
+
+# Allowed values of the enumerated analysis fields
+ROOT_CAUSE_CATEGORIES = ('Data Entry Error', 'Timing Mismatch', 'System Synchronization', 'Rounding Discrepancy',
+                         'Missing Data', 'Configuration Issue', 'Manual Override')
+ACTION_TYPES = ('SQL_UPDATE', 'API_CALL', 'MANUAL_REVIEW', 'ESCALATE')
+RISK_LEVELS = ('Critical', 'High', 'Medium', 'Low')
+
+# Precomputed once: the analysis schema as a single compact JSON line
+COMPACT_SCHEMA = json.dumps({
+    "root_cause": {
+        "category": "|".join(ROOT_CAUSE_CATEGORIES),
+        "reason": "2-3 sentences",
+        "confidence_score": "0.0-1.0"
+    },
+    "severity": "High|Medium|Low",
+    "fix_suggestion": {
+        "action_type": "|".join(ACTION_TYPES),
+        "suggested_fix": "specific actionable steps",
+        "estimated_time": "e.g. 2 hours"
+    },
+    "risk_assessment": {
+        "financial_risk": "exposure and PnL impact",
+        "operational_risk": "settlement impact",
+        "compliance_risk": "regulatory impact",
+        "overall_risk_level": "|".join(RISK_LEVELS)
+    },
+    "compliance_note": "1 sentence for audit logs",
+    "full_explanation": "3-4 sentences for senior management"
+}, separators=(',', ':'))
+
+COMPACT_FIELD_LEGEND = "id=trade id, type=exception type, fields=mismatched fields, broker/exchange=values in each system"
+
+# Batched analysis sizing: estimated prompt + completion tokens per request
+BATCH_TOKEN_BUDGET = 12000
+BATCH_OUTPUT_TOKENS_PER_EXCEPTION = 700
+MAX_BATCH_SIZE = 20
+
+SEVERITY_LEVELS = ('High', 'Medium', 'Low')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token)"""
+    return len(text) // 4 + 1
 
 
 class TradeReconIntelligenceEngine:
@@ -15,14 +109,60 @@ class TradeReconIntelligenceEngine:
     Enterprise-grade Intelligence Engine for trade reconciliation
     """
     
-    def __init__(self, api_key: str = None):
-        """Initialize the Intelligence Engine with Groq API"""
+    def __init__(
+        self,
+        api_key: str = None,
+        max_concurrency: int = 8,
+        request_timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        batch_token_budget: int = BATCH_TOKEN_BUDGET,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        cache: Optional[AnalysisCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        prompt_mode: str = 'verbose',
+        backend: Optional[LLMBackend] = None
+    ):
+        """
+        Initialize the Intelligence Engine with Groq API
+        
+        backend replaces the Groq client (e.g. agents.backends.FakeBackend for
+        offline runs); no API key is needed then.
+        """
         self.api_key = api_key or os.getenv('GROQ_API_KEY')
         
-        if not self.api_key:
-            raise ValueError("❌ GROQ_API_KEY not found in environment")
+        if backend is None:
+            if not self.api_key:
+                raise ValueError("❌ GROQ_API_KEY not found in environment")
+            backend = GroqBackend(api_key=self.api_key, timeout=request_timeout)
+        self.backend = backend
+        
+        # Concurrency and retry policy
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._rate_limit_lock = threading.Lock()
+        self._rate_limited_until = 0.0
+        
+        # Batched analysis sizing
+        self.batch_token_budget = batch_token_budget
+        self.max_batch_size = max_batch_size
+        
+        # Optional persistent cache of analyses for recurring breaks
+        self.cache = cache
+        
+        # Per-model health; an unhealthy primary is skipped in favour of the fallback
+        self.breaker = breaker or CircuitBreaker()
         
-        self.client = Groq(api_key=self.api_key)
+        # Prompt style and per-call token/latency accounting
+        if prompt_mode not in PROMPT_MODES:
+            raise ValueError(f"prompt_mode must be one of {PROMPT_MODES}, got '{prompt_mode}'")
+        self.prompt_mode = prompt_mode
+        self.usage_log = []
+        self._usage_lock = threading.Lock()
         
         # Production models
         self.model = "openai/gpt-oss-120b"
@@ -31,9 +171,12 @@ class TradeReconIntelligenceEngine:
         print(f"✅ TradeRecon Intelligence Engine initialized")
         print(f"   Primary Model: {self.model}")
         print(f"   Fallback Model: {self.fallback_model}")
+        print(f"   Backend: {self.backend.name}")
     
     def _generate_system_prompt(self) -> str:
         """Generate professional system prompt"""
+        if self.prompt_mode == 'compact':
+            return COMPACT_SYSTEM_PROMPT
         return """You are a Senior Trade Reconciliation Analyst AI specializing in financial compliance and exception resolution.
 
 Your expertise includes:
@@ -48,6 +191,11 @@ Output must be valid JSON with complete, professional descriptions. Never use pl
 
     def _generate_user_prompt(self, trade_data: Dict[str, Any]) -> str:
         """Generate specific analysis request"""
+        if self.prompt_mode == 'compact':
+            return (f"Analyze this trade exception ({COMPACT_FIELD_LEGEND}):\n"
+                    f"{self._encode_exception(trade_data)}\n"
+                    f"Reply with this JSON structure: {COMPACT_SCHEMA}")
+        
         trade_id = trade_data.get('trade_id', 'Unknown')
         exception_type = trade_data.get('exception_type', 'mismatch')
         mismatched_fields = trade_data.get('mismatched_fields', 'Multiple fields')
@@ -65,52 +213,221 @@ TRADE EXCEPTION DETAILS:
 
 Provide a complete professional analysis in the following JSON structure:
 
-{{
-    "root_cause": {{
-        "category": "One of: Data Entry Error | Timing Mismatch | System Synchronization | Rounding Discrepancy | Missing Data | Configuration Issue | Manual Override",
-        "reason": "Detailed, professional explanation of the root cause (2-3 sentences, suitable for audit documentation)",
-        "confidence_score": 0.0-1.0
-    }},
-    "severity": "High | Medium | Low",
-    "fix_suggestion": {{
-        "action_type": "SQL_UPDATE | API_CALL | MANUAL_REVIEW | ESCALATE",
-        "suggested_fix": "Specific, actionable resolution steps (professional language, audit-ready)",
-        "estimated_time": "Realistic time estimate (e.g., '30 minutes', '2 hours', '1 business day')"
-    }},
-    "risk_assessment": {{
-        "financial_risk": "Professional assessment of financial exposure and PnL impact",
-        "operational_risk": "Assessment of operational impact on settlement and reconciliation processes",
-        "compliance_risk": "Regulatory and audit implications of this exception",
-        "overall_risk_level": "Critical | High | Medium | Low"
-    }},
-    "compliance_note": "Single professional sentence suitable for compliance audit logs",
-    "full_explanation": "Comprehensive analysis (3-4 sentences) explaining the exception, its business impact, and recommended resolution in professional language suitable for senior management review"
-}}
+{ANALYSIS_SCHEMA}
 
-Requirements:
-- Use professional financial services language
-- Provide specific, actionable recommendations
-- Never use "N/A", "Unknown", or empty values
-- All text must be audit-ready and compliance-suitable
-- Be precise and factual based on the data provided
-- Avoid special characters like ampersands that may break PDF rendering"""
+{ANALYSIS_REQUIREMENTS}"""
+
+    def _exception_details(self, trade_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Compact per-exception details for batched prompts"""
+        return {
+            'trade_id': str(trade_data.get('trade_id', 'Unknown')),
+            'exception_type': trade_data.get('exception_type', 'mismatch'),
+            'mismatched_fields': trade_data.get('mismatched_fields', 'Multiple fields'),
+            'broker_values': trade_data.get('broker_values', {}),
+            'exchange_values': trade_data.get('exchange_values', {})
+        }
+    
+    def _encode_exception(self, trade_data: Dict[str, Any]) -> str:
+        """One-line encoding of an exception for batched (and compact) prompts"""
+        details = self._exception_details(trade_data)
+        if self.prompt_mode == 'compact':
+            return json.dumps({
+                'id': details['trade_id'],
+                'type': details['exception_type'],
+                'fields': details['mismatched_fields'],
+                'broker': details['broker_values'],
+                'exchange': details['exchange_values']
+            }, separators=(',', ':'), default=str)
+        return json.dumps(details, default=str)
+    
+    def _generate_batch_prompt(self, batch: List[Dict[str, Any]]) -> str:
+        """Generate one analysis request covering several exceptions"""
+        details = "\n".join(self._encode_exception(exc) for exc in batch)
+        
+        if self.prompt_mode == 'compact':
+            return (f"Analyze each trade exception independently ({COMPACT_FIELD_LEGEND}), one per line:\n"
+                    f"{details}\n"
+                    f"Reply with JSON {{\"analyses\":[...]}}, one element per exception, each with \"trade_id\" "
+                    f"plus this structure: {COMPACT_SCHEMA}")
+        
+        return f"""Analyze each of the following {len(batch)} trade exceptions independently and provide a comprehensive professional assessment for every one.
 
-    def analyze_exception(self, exception_data: Dict[str, Any]) -> Dict[str, Any]:
+TRADE EXCEPTIONS (one JSON object per line):
+{details}
+
+Respond with a JSON object of the form {{"analyses": [...]}} containing exactly one element per trade exception. Each element must include a "trade_id" field with the exception's Trade ID, followed by the fields of this JSON structure:
+
+{ANALYSIS_SCHEMA}
+
+{ANALYSIS_REQUIREMENTS}"""
+    
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Delay before the next retry: Retry-After when given, else jittered exponential"""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+    
+    def _wait_for_rate_limit(self):
+        """Block while another worker's rate-limit backoff is in effect"""
+        with self._rate_limit_lock:
+            wait = self._rate_limited_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+    
+    def _record_usage(self, model: str, messages: List[Dict[str, str]], completion: Any,
+                      latency: float, exceptions: int):
+        """Log token usage and latency of one completion (estimated when the API omits usage)"""
+        usage = getattr(completion, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', None)
+        completion_tokens = getattr(usage, 'completion_tokens', None)
+        estimated = prompt_tokens is None or completion_tokens is None
+        if estimated:
+            prompt_tokens = sum(estimate_tokens(message['content']) for message in messages)
+            completion_tokens = estimate_tokens(completion.choices[0].message.content or '')
+        record = {
+            'model': model,
+            'prompt_mode': self.prompt_mode,
+            'exceptions': exceptions,
+            'prompt_tokens': int(prompt_tokens),
+            'completion_tokens': int(completion_tokens),
+            'total_tokens': int(prompt_tokens) + int(completion_tokens),
+            'latency_seconds': round(latency, 4),
+            'estimated': estimated
+        }
+        with self._usage_lock:
+            self.usage_log.append(record)
+    
+    def usage_summary(self, since: int = 0) -> Dict[str, Any]:
         """
-        Perform complete trade exception analysis
+        Token and latency totals over usage_log[since:]
+        
+        Pass len(engine.usage_log) taken before a run to get that run's totals.
         """
-        # Try primary model first, then fallback
-        for model in [self.model, self.fallback_model]:
+        with self._usage_lock:
+            records = list(self.usage_log[since:])
+        
+        def _totals(rows):
+            exceptions = sum(r['exceptions'] for r in rows)
+            total_tokens = sum(r['total_tokens'] for r in rows)
+            latency = sum(r['latency_seconds'] for r in rows)
+            return {
+                'calls': len(rows),
+                'exceptions': exceptions,
+                'prompt_tokens': sum(r['prompt_tokens'] for r in rows),
+                'completion_tokens': sum(r['completion_tokens'] for r in rows),
+                'total_tokens': total_tokens,
+                'tokens_per_exception': round(total_tokens / exceptions, 1) if exceptions else 0.0,
+                'latency_seconds': round(latency, 3),
+                'avg_latency_seconds': round(latency / len(rows), 3) if rows else 0.0
+            }
+        
+        summary = _totals(records)
+        summary['estimated_calls'] = sum(1 for r in records if r['estimated'])
+        summary['by_model'] = {
+            model: _totals([r for r in records if r['model'] == model])
+            for model in sorted({r['model'] for r in records})
+        }
+        return summary
+    
+    def _create_completion(self, model: str, messages: List[Dict[str, str]], max_tokens: int = 2500,
+                           exceptions: int = 1, deadline: Optional[float] = None):
+        """
+        Run one chat completion with per-request timeout and retry/backoff.
+        
+        A rate-limit response pauses every worker sharing this engine until the
+        backoff expires, so concurrent calls do not keep hammering the API.
+        Failed attempts are reported to the circuit breaker, except rate limits
+        that a retry gets past (a model still throttled after max_retries counts
+        as one failure); once the model's circuit opens, remaining attempts are
+        abandoned with CircuitOpenError.
+        With a deadline (time.monotonic()), the request timeout is capped at the
+        time left and DeadlineExceeded is raised instead of waiting past it.
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.breaker.is_open(model):
+                raise CircuitOpenError(model)
+            self._wait_for_rate_limit()
+            remaining = time_left(deadline)
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded(model)
+            started = time.perf_counter()
             try:
-                completion = self.client.chat.completions.create(
+                completion = self.backend.complete(
                     model=model,
-                    messages=[
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.2,
+                    timeout=self.request_timeout if remaining is None else min(self.request_timeout, remaining)
+                )
+                latency = time.perf_counter() - started
+                self.breaker.record_success(model, latency)
+                self._record_usage(model, messages, completion, latency, exceptions)
+                return completion
+            except RETRYABLE_ERRORS as e:
+                remaining = time_left(deadline)
+                if remaining is not None and remaining <= 0:
+                    # Cut short by the budget, not by the model
+                    raise DeadlineExceeded(model) from e
+                # A transient rate limit is handled by the shared pause; one that
+                # outlasts every retry means the model is throttled and counts
+                if not isinstance(e, RateLimitError) or attempt == self.max_retries:
+                    self.breaker.record_failure(model, e)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                if remaining is not None and delay >= remaining:
+                    raise DeadlineExceeded(model) from e
+                if isinstance(e, RateLimitError):
+                    with self._rate_limit_lock:
+                        self._rate_limited_until = max(self._rate_limited_until, time.monotonic() + delay)
+                print(f"⏳ {type(e).__name__} from {model}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+            except Exception as e:
+                self.breaker.record_failure(model, e)
+                raise
+    
+    def _route_model(self) -> str:
+        """Primary model while its circuit allows calls, otherwise the fallback"""
+        return self.model if self.breaker.allow(self.model) else self.fallback_model
+    
+    def _cache_store(self, exception_data: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Remember a successful analysis (fallback analyses are never cached)"""
+        if self.cache is not None and not analysis.get('_error'):
+            self.cache.put(exception_data, analysis)
+        return analysis
+    
+    def analyze_exception(self, exception_data: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Perform complete trade exception analysis
+        
+        Served from the analysis cache when an equivalent break was analyzed before.
+        Raises DeadlineExceeded when the deadline passes before the analysis finishes.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(exception_data)
+            if cached is not None:
+                return cached
+        return self._cache_store(exception_data, self._analyze_uncached(exception_data, deadline))
+    
+    def _analyze_uncached(self, exception_data: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze one exception with the models, primary first"""
+        # Try primary model first (unless its circuit is open), then fallback
+        models = [self.model, self.fallback_model] if self._route_model() == self.model else [self.fallback_model]
+        for model in models:
+            try:
+                completion = self._create_completion(
+                    model,
+                    [
                         {"role": "system", "content": self._generate_system_prompt()},
                         {"role": "user", "content": self._generate_user_prompt(exception_data)}
                     ],
-                    temperature=0.2,
-                    max_tokens=2500,
-                    response_format={"type": "json_object"}
+                    deadline=deadline
                 )
                 
                 # Parse the JSON response
@@ -130,6 +447,14 @@ Requirements:
                     continue
                 return self._generate_fallback_analysis(exception_data, f"JSON Error: {str(e)}")
                 
+            except CircuitOpenError:
+                if model == self.model:
+                    continue
+                return self._generate_fallback_analysis(exception_data, f"Circuit open for {model}")
+                
+            except DeadlineExceeded:
+                raise
+                
             except Exception as e:
                 print(f"❌ Analysis failed for trade {exception_data.get('trade_id')} with {model}: {e}")
                 if model == self.model:
@@ -140,6 +465,246 @@ Requirements:
         # If both models fail
         return self._generate_fallback_analysis(exception_data, "Both models failed")
     
+    def analyze_exceptions(
+        self,
+        exceptions: List[Dict[str, Any]],
+        max_concurrency: int = None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        deadline: Optional[float] = None,
+        stop: Optional[threading.Event] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze many exceptions concurrently on a bounded thread pool
+        
+        Results come back in the original order. on_result(index, analysis) is
+        called as each analysis completes (in completion order). Exceptions are
+        started in list order; with a deadline (time.monotonic()), those not
+        finished in time are left as None. Once stop is set, exceptions not yet
+        started are skipped (left as None) and no further requests are made.
+        """
+        return self._run_pool(lambda exc: self.analyze_exception(exc, deadline), exceptions,
+                              max_concurrency, on_result, deadline, stop)
+    
+    def _run_pool(
+        self,
+        analyze: Callable[[Dict[str, Any]], Dict[str, Any]],
+        exceptions: List[Dict[str, Any]],
+        max_concurrency: int = None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        deadline: Optional[float] = None,
+        stop: Optional[threading.Event] = None
+    ) -> List[Dict[str, Any]]:
+        """Apply analyze() to every exception on a bounded thread pool, keeping order"""
+        results = [None] * len(exceptions)
+        if not exceptions:
+            return results
+        
+        def _task(exc):
+            check_budget(deadline, stop)
+            return analyze(exc)
+        
+        deferred = 0
+        workers = max(1, min(max_concurrency or self.max_concurrency, len(exceptions)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='traderecon-llm') as pool:
+            futures = {pool.submit(_task, exc): idx for idx, exc in enumerate(exceptions)}
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    results[idx] = future.result()
+                except DeadlineExceeded:
+                    deferred += 1
+                    continue
+                except Exception as e:
+                    results[idx] = self._generate_fallback_analysis(exceptions[idx], str(e))
+                if on_result:
+                    on_result(idx, results[idx])
+        
+        if deferred:
+            if stop is not None and stop.is_set():
+                print(f"🛑 Analysis stopped: {deferred} exceptions skipped")
+            else:
+                print(f"⏰ Analysis budget exhausted: {deferred} exceptions deferred")
+        return results
+    
+    def _plan_batches(self, exceptions: List[Dict[str, Any]], indices: List[int]) -> List[List[int]]:
+        """
+        Group exception indices into batches that fit the token budget
+        
+        Each exception costs its estimated detail tokens plus a fixed completion
+        allowance; a trade_id appears at most once per batch so responses can be
+        matched back unambiguously.
+        """
+        overhead = estimate_tokens(self._generate_system_prompt()) + estimate_tokens(self._generate_batch_prompt([]))
+        batches = []
+        current, current_ids, current_tokens = [], set(), overhead
+        
+        for idx in indices:
+            details = self._exception_details(exceptions[idx])
+            cost = estimate_tokens(self._encode_exception(exceptions[idx])) + BATCH_OUTPUT_TOKENS_PER_EXCEPTION
+            if current and (len(current) >= self.max_batch_size
+                            or current_tokens + cost > self.batch_token_budget
+                            or details['trade_id'] in current_ids):
+                batches.append(current)
+                current, current_ids, current_tokens = [], set(), overhead
+            current.append(idx)
+            current_ids.add(details['trade_id'])
+            current_tokens += cost
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    @staticmethod
+    def _is_valid_analysis(analysis: Any) -> bool:
+        """Check one returned analysis has the fields the report relies on"""
+        return (
+            isinstance(analysis, dict)
+            and analysis.get('severity') in SEVERITY_LEVELS
+            and all(isinstance(analysis.get(key), dict) for key in ('root_cause', 'fix_suggestion', 'risk_assessment'))
+        )
+    
+    def _analyze_batch(self, exceptions: List[Dict[str, Any]], batch: List[int], model: str,
+                       deadline: Optional[float] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Analyze one batch in a single request
+        
+        Returns the valid analyses keyed by exception index; indices missing from
+        the result failed to parse or validate.
+        """
+        batch_exceptions = [exceptions[idx] for idx in batch]
+        completion = self._create_completion(
+            model,
+            [
+                {"role": "system", "content": self._generate_system_prompt()},
+                {"role": "user", "content": self._generate_batch_prompt(batch_exceptions)}
+            ],
+            max_tokens=len(batch) * BATCH_OUTPUT_TOKENS_PER_EXCEPTION,
+            exceptions=len(batch),
+            deadline=deadline
+        )
+        
+        try:
+            payload = json.loads(completion.choices[0].message.content)
+        except json.JSONDecodeError as e:
+            print(f"⚠️ JSON parsing error for a batch of {len(batch)} with {model}: {e}")
+            return {}
+        
+        elements = payload.get('analyses') if isinstance(payload, dict) else payload
+        if not isinstance(elements, list):
+            print(f"⚠️ Batch response from {model} has no 'analyses' array")
+            return {}
+        by_trade_id = {str(el.get('trade_id')): el for el in elements if isinstance(el, dict)}
+        
+        analyses = {}
+        for idx, exc in zip(batch, batch_exceptions):
+            trade_id = str(exc.get('trade_id', 'Unknown'))
+            analysis = by_trade_id.get(trade_id)
+            if not self._is_valid_analysis(analysis):
+                continue
+            analysis = {key: value for key, value in analysis.items() if key != 'trade_id'}
+            analysis['_engine_model'] = model
+            analysis['_trade_id'] = exc.get('trade_id', 'Unknown')
+            analysis['_batch_size'] = len(batch)
+            analyses[idx] = analysis
+        
+        print(f"✅ Batch of {len(batch)} analyzed using {model} ({len(analyses)} valid)")
+        return analyses
+    
+    def analyze_exceptions_batch(
+        self,
+        exceptions: List[Dict[str, Any]],
+        max_concurrency: int = None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        max_rounds: int = 2,
+        deadline: Optional[float] = None,
+        stop: Optional[threading.Event] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze many exceptions with several exceptions per request
+        
+        Exceptions are packed into batches sized to the token budget and sent
+        concurrently. Elements that fail to parse or validate are re-queued into
+        new batches (on the fallback model after the first round, or from the
+        start while the primary's circuit is open); whatever is
+        still missing after max_rounds goes through analyze_exception(). Results
+        come back in the original order. Batches are started in list order;
+        with a deadline (time.monotonic()), exceptions not finished in time are
+        left as None, as are those not started once stop is set.
+        """
+        results = [None] * len(exceptions)
+        pending = []
+        for idx, exc in enumerate(exceptions):
+            cached = self.cache.get(exc) if self.cache is not None else None
+            if cached is None:
+                pending.append(idx)
+                continue
+            results[idx] = cached
+            if on_result:
+                on_result(idx, cached)
+        
+        def _run_batch(batch, model):
+            check_budget(deadline, stop)
+            return self._analyze_batch(exceptions, batch, model, deadline)
+        
+        deferred = []
+        for round_no in range(max_rounds):
+            if not pending:
+                break
+            batches = self._plan_batches(exceptions, pending)
+            failed = []
+            
+            workers = max(1, min(max_concurrency or self.max_concurrency, len(batches)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='traderecon-llm') as pool:
+                futures = {}
+                for batch in batches:
+                    # First round goes to the primary while its circuit allows it
+                    model = self._route_model() if round_no == 0 else self.fallback_model
+                    futures[pool.submit(_run_batch, batch, model)] = (batch, model)
+                for future in as_completed(futures):
+                    batch, model = futures[future]
+                    try:
+                        analyses = future.result()
+                    except DeadlineExceeded:
+                        deferred.extend(batch)
+                        continue
+                    except CircuitOpenError:
+                        analyses = {}
+                    except Exception as e:
+                        print(f"❌ Batch of {len(batch)} failed with {model}: {e}")
+                        analyses = {}
+                    for idx in batch:
+                        if idx in analyses:
+                            results[idx] = self._cache_store(exceptions[idx], analyses[idx])
+                            if on_result:
+                                on_result(idx, analyses[idx])
+                        else:
+                            failed.append(idx)
+            
+            if failed:
+                print(f"⚠️ Re-queuing {len(failed)} exceptions that failed batch analysis")
+            pending = sorted(failed)
+        
+        if deferred:
+            if stop is not None and stop.is_set():
+                print(f"🛑 Analysis stopped: {len(deferred)} exceptions skipped")
+            else:
+                print(f"⏰ Analysis budget exhausted: {len(deferred)} exceptions deferred")
+        
+        # Remaining failures fall back to one request per exception
+        if pending:
+            singles = self._run_pool(
+                lambda exc: self._cache_store(exc, self._analyze_uncached(exc, deadline)),
+                [exceptions[idx] for idx in pending],
+                max_concurrency=max_concurrency,
+                on_result=(lambda j, analysis: on_result(pending[j], analysis)) if on_result else None,
+                deadline=deadline,
+                stop=stop
+            )
+            for idx, analysis in zip(pending, singles):
+                results[idx] = analysis
+        
+        return results
+    
     def _generate_fallback_analysis(self, trade_data: Dict[str, Any], error_msg: str) -> Dict[str, Any]:
         """Generate professional fallback response"""
         trade_id = trade_data.get('trade_id', 'Unknown')
@@ -169,155 +734,21 @@ Requirements:
             "_engine_model": "fallback"
         }
     
-    def generate_compliance_report(self, reconciliation_results: Dict[str, Any], analyzed_exceptions: list) -> str:
+    def generate_compliance_report(self, reconciliation_results: Dict[str, Any], analyzed_exceptions: list,
+                                   detail_limit: Optional[int] = None) -> str:
         """
         Generate professional compliance audit report
         NO MARKDOWN SYMBOLS - Plain professional text
-        """
-        report_date = datetime.now().strftime('%B %d, %Y at %H:%M:%S')
-        
-        total_trades = reconciliation_results.get('total_trades', 0)
-        matched = reconciliation_results.get('matched_count', 0)
-        mismatched = reconciliation_results.get('mismatch_count', 0)
-        missing = reconciliation_results.get('missing_count', 0)
-        match_rate = (matched / max(total_trades, 1)) * 100
         
-        high_count = sum(1 for e in analyzed_exceptions if e.get('severity') == 'High')
-        medium_count = sum(1 for e in analyzed_exceptions if e.get('severity') == 'Medium')
-        low_count = sum(1 for e in analyzed_exceptions if e.get('severity') == 'Low')
-        
-        # PROFESSIONAL REPORT - NO MARKDOWN SYMBOLS
-        report = f"""TRADE RECONCILIATION COMPLIANCE AUDIT REPORT
-
-Report Generated: {report_date}
-Analysis Engine: TradeRecon AI Intelligence Engine v2.0
-AI Model: {self.model}
-
-================================================================================
-
-EXECUTIVE SUMMARY
-
-This compliance audit report summarizes the results of automated trade reconciliation between broker and exchange systems. The analysis identified discrepancies requiring attention and provides actionable recommendations for resolution.
-
-RECONCILIATION METRICS
-
-Total Trades Processed: {total_trades}
-Successfully Matched: {matched} ({match_rate:.1f}%)
-Exceptions Detected: {len(analyzed_exceptions)}
-  - Data Mismatches: {mismatched}
-  - Missing Trades: {missing}
-
-EXCEPTION SEVERITY DISTRIBUTION
-
-High Severity: {high_count} exceptions (immediate action required)
-Medium Severity: {medium_count} exceptions (review within 24 hours)
-Low Severity: {low_count} exceptions (standard review cycle)
-
-================================================================================
-
-RISK ASSESSMENT
-
-Financial Risk: {'HIGH - Immediate review required' if high_count > 0 else 'MODERATE - Monitor closely' if medium_count > 0 else 'LOW - Standard controls adequate'}
-Operational Risk: {'Requires immediate attention' if high_count > 0 else 'Within acceptable thresholds'}
-Compliance Status: {'ATTENTION REQUIRED' if high_count > 0 else 'ACCEPTABLE WITH MONITORING'}
-
-Overall Assessment: {'Critical exceptions detected. Immediate action plan required.' if high_count > 0 else 'All exceptions within manageable risk parameters. Continue monitoring.'}
-
-================================================================================
-
-DETAILED EXCEPTION ANALYSIS
-
-"""
-        
-        # Professional exception details - NO EMOJIS, CLEAN TEXT FOR PDF
-        for idx, exc in enumerate(analyzed_exceptions, 1):
-            severity = exc.get('severity', 'Medium')
-            trade_id = exc.get('trade_id', 'Unknown')  # ✅ FIXED - uses trade_id not _trade_id
-            root_cause = exc.get('root_cause', {})
-            fix = exc.get('fix_suggestion', {})
-            risk = exc.get('risk_assessment', {})
-            
-            # Clean text for PDF rendering - remove special characters that break reportlab
-            root_reason = root_cause.get('reason', 'Requires manual investigation').replace('&', 'and').replace('P&L', 'PnL')
-            fix_steps = fix.get('suggested_fix', 'Escalate to reconciliation team for investigation').replace('&', 'and')
-            financial_risk = risk.get('financial_risk', 'To be assessed during review').replace('&', 'and').replace('P&L', 'PnL')
-            operational_risk = risk.get('operational_risk', 'Standard review procedures apply').replace('&', 'and')
-            compliance_risk = risk.get('compliance_risk', 'Exception logged for audit trail').replace('&', 'and')
-            compliance_note = exc.get('compliance_summary') or exc.get('compliance_note', f'Trade {trade_id} requires resolution and documentation for regulatory compliance.')
-            compliance_note = compliance_note.replace('&', 'and')
-            
-            report += f"""EXCEPTION {idx}: Trade ID {trade_id}
-
-Severity Level: {severity}
-Root Cause Category: {root_cause.get('category', 'System Synchronization')}
-Confidence Score: {root_cause.get('confidence_score', 0.5):.0%}
-
-Root Cause Analysis:
-{root_reason}
-
-Risk Impact:
-- Financial: {financial_risk}
-- Operational: {operational_risk}
-- Compliance: {compliance_risk}
-
-Recommended Resolution:
-Action Type: {fix.get('action_type', 'MANUAL_REVIEW')}
-Resolution Steps: {fix_steps}
-Estimated Time: {fix.get('estimated_time', '2-4 hours')}
-
-Compliance Note:
-{compliance_note}
-
---------------------------------------------------------------------------------
-
-"""
-        
-        report += f"""
-================================================================================
-
-RECOMMENDED ACTIONS
-
-IMMEDIATE (0-24 hours):
-{'- Prioritize and resolve ' + str(high_count) + ' high-severity exceptions' if high_count > 0 else '- No immediate critical actions required'}
-- Document all investigation findings
-- Verify high-value trade details with counterparties
-- Escalate unresolved issues to senior management
-
-SHORT-TERM (1-7 days):
-- Complete resolution of all {len(analyzed_exceptions)} exceptions
-- Conduct root cause analysis for systemic issues
-- Update reconciliation procedures and controls
-- Provide resolution summary to compliance team
-
-LONG-TERM (Ongoing):
-- Implement preventive controls to reduce exception rates
-- Enhance automated validation rules
-- Conduct periodic reconciliation quality reviews
-- Maintain comprehensive audit documentation
-
-================================================================================
-
-REGULATORY COMPLIANCE STATEMENT
-
-All identified exceptions have been documented in accordance with internal control frameworks and regulatory requirements. {'High-severity exceptions require immediate attention and must be resolved within prescribed regulatory timeframes. Detailed resolution documentation is mandatory for audit purposes.' if high_count > 0 else 'All exceptions are within acceptable risk thresholds and standard review procedures apply.'}
-
-This report complies with trade reconciliation standards and provides audit-ready documentation for regulatory review.
-
-================================================================================
-
-REPORT CERTIFICATION
-
-Analysis Methodology: Automated AI-powered exception analysis with manual review workflows
-AI Model: {self.model}
-Exceptions Analyzed: {len(analyzed_exceptions)}
-Report Classification: Internal Use - Compliance Sensitive
-Prepared By: TradeRecon AI Intelligence Engine
-Review Required By: Compliance Officer / Operations Manager
-
-This report is generated automatically and should be reviewed by qualified compliance personnel before regulatory submission.
-
-================================================================================
-
-END OF REPORT
-"""
-        return report
+        detail_limit gives per-exception detail for the most severe
+        detail_limit exceptions only (see agents/report_writer.py).
+        """
+        return ''.join(iter_compliance_report(reconciliation_results, analyzed_exceptions, self.model, detail_limit))
+    
+    def write_compliance_report(self, out: Any, reconciliation_results: Dict[str, Any], analyzed_exceptions: list,
+                                detail_limit: Optional[int] = None) -> int:
+        """
+        Stream the compliance report to a file path or file object without
+        building it in memory; returns the number of characters written
+        """
+        return write_compliance_report(out, reconciliation_results, analyzed_exceptions, self.model, detail_limit)
@@ -0,0 +1,138 @@
+"""
+TradeRecon Intelligence Engine - Priority scheduler
+Orders exceptions by preliminary severity and notional at risk, and defers
+whatever cannot be analyzed within a wall-clock budget
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from matching import FIELD_BITS
+
+# Preliminary (rules-based) severity, most urgent first
+SEVERITY_RANK = {'High': 3, 'Medium': 2, 'Low': 1}
+
+# Mismatches on these fields put the whole notional at risk, not just the difference
+FULL_NOTIONAL_BITS = FIELD_BITS['symbol'] | FIELD_BITS['side'] | FIELD_BITS['account_id']
+
+DEFERRED_ENGINE = 'deferred'
+
+
+class DeadlineExceeded(Exception):
+    """The analysis time budget ran out before this work could finish"""
+
+
+class AnalysisCancelled(DeadlineExceeded):
+    """The caller stopped the analysis (e.g. abandoned the result stream) before this work started"""
+
+
+def deadline_from_budget(budget_seconds: Optional[float]) -> Optional[float]:
+    """time.monotonic() deadline for a budget in seconds (None = no deadline)"""
+    return time.monotonic() + budget_seconds if budget_seconds is not None else None
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until the deadline (None when there is no deadline)"""
+    return deadline - time.monotonic() if deadline is not None else None
+
+
+def check_budget(deadline: Optional[float], stop: Optional[threading.Event] = None):
+    """Raise AnalysisCancelled once stop is set, or DeadlineExceeded past the deadline"""
+    if stop is not None and stop.is_set():
+        raise AnalysisCancelled()
+    remaining = time_left(deadline)
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded()
+
+
+def notional_at_risk(exceptions_df: pd.DataFrame) -> np.ndarray:
+    """
+    Notional at risk per exception.
+
+    For quantity and price breaks this is the difference between the broker
+    and exchange notionals (quantity x price delta). Missing trades and
+    symbol, side or account breaks put the full notional at risk.
+
+    Args:
+        exceptions_df: Structured exceptions from reconcile_trades()
+
+    Returns:
+        Float numpy array, 0 where values are unavailable
+    """
+    if len(exceptions_df) == 0:
+        return np.array([], dtype=float)
+
+    exc = exceptions_df
+    broker = (pd.to_numeric(exc['quantity_broker'], errors='coerce')
+              * pd.to_numeric(exc['price_broker'], errors='coerce')).abs().to_numpy(dtype=float)
+    exchange = (pd.to_numeric(exc['quantity_exchange'], errors='coerce')
+                * pd.to_numeric(exc['price_exchange'], errors='coerce')).abs().to_numpy(dtype=float)
+    broker = np.nan_to_num(broker)
+    exchange = np.nan_to_num(exchange)
+
+    full = (
+        (exc['exception_type'] != 'mismatch').to_numpy()
+        | ((exc['mismatch_mask'].to_numpy(dtype=np.int64) & FULL_NOTIONAL_BITS) != 0)
+    )
+    return np.where(full, np.maximum(broker, exchange), np.abs(broker - exchange))
+
+
+def priority_order(exceptions_df: pd.DataFrame) -> np.ndarray:
+    """
+    Exception indices in analysis order: preliminary severity first, then
+    notional at risk (largest first); ties keep DataFrame order.
+
+    Args:
+        exceptions_df: Structured exceptions from reconcile_trades()
+
+    Returns:
+        Integer numpy array of row positions
+    """
+    if len(exceptions_df) == 0:
+        return np.array([], dtype=np.int64)
+    severity = exceptions_df['severity'].map(SEVERITY_RANK).fillna(0).to_numpy(dtype=np.int64)
+    notional = notional_at_risk(exceptions_df)
+    # lexsort sorts by the last key first; negate for descending order
+    return np.lexsort((np.arange(len(exceptions_df)), -notional, -severity))
+
+
+def deferred_analysis(exception: Dict[str, Any], budget_seconds: float) -> Dict[str, Any]:
+    """
+    Build the engine's analysis structure for an exception that was not
+    analyzed within the time budget.
+
+    Args:
+        exception: Rendered exception record (its preliminary severity is kept)
+        budget_seconds: The analysis budget that ran out
+
+    Returns:
+        Dictionary with root_cause, severity, fix_suggestion, risk_assessment,
+        compliance_note and full_explanation, like analyze_exception()
+    """
+    trade_id = exception.get('trade_id', 'Unknown')
+    severity = exception.get('severity') if exception.get('severity') in SEVERITY_RANK else 'Medium'
+    reason = (f"Trade {trade_id} was not analyzed within the {budget_seconds:g} second analysis budget. "
+              f"Root cause analysis is pending; the preliminary {severity.lower()} severity comes from the "
+              f"reconciliation rules.")
+    fix = (f"Review trade {trade_id} manually before settlement, or include it in the next analysis run.")
+    return {
+        'root_cause': {'category': 'Pending Analysis', 'reason': reason, 'confidence_score': 0.0},
+        'severity': severity,
+        'fix_suggestion': {'action_type': 'MANUAL_REVIEW', 'suggested_fix': fix, 'estimated_time': 'Pending analysis'},
+        'risk_assessment': {
+            'financial_risk': 'Not yet assessed; see the notional at risk for the exposure.',
+            'operational_risk': 'Settlement may be affected until the exception is reviewed.',
+            'compliance_risk': 'Exception is logged as deferred and requires documented resolution.',
+            'overall_risk_level': severity
+        },
+        'compliance_note': f"Trade {trade_id} deferred: not analyzed within the analysis budget and logged for follow-up.",
+        'full_explanation': f"{reason} {fix}",
+        '_engine_model': DEFERRED_ENGINE,
+        '_trade_id': trade_id,
+        '_deferred': True
+    }
+
@@ -1,9 +1,10 @@
 import os
-from main import run_full_reconciliation
+import time
+from collections import deque
+from main import TradeReconOrchestrator
 import json
 from pathlib import Path
 from dotenv import load_dotenv
-from io import BytesIO
 import pandas as pd
 
 # CRITICAL: Load .env file BEFORE any other imports
@@ -15,7 +16,10 @@ else:
     print(f"⚠️ .env not found at: {env_file}")
 
 import streamlit as st
-from matching import reconcile_trades
+from matching import reconcile_trades, render_exceptions
+from loader import load_trades, SUPPORTED_SUFFIXES
+from result_cache import result_cache, content_digest
+from exports import pdf_exporter, content_key, write_excel, write_bulk, BULK_FORMATS, XLSX_MIME, EXCEL_MAX_ROWS
 from datetime import datetime
 
 # Page Configuration
@@ -28,60 +32,9 @@ st.set_page_config(
 
 # HELPER: Convert markdown to PDF (requires reportlab)
 def markdown_to_pdf(markdown_text: str, filename: str) -> bytes:
-    """Convert text report to PDF with clean formatting"""
+    """Convert text report to PDF (canvas renderer, cached by report content)"""
     try:
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-        from reportlab.lib.enums import TA_LEFT, TA_CENTER
-        from io import BytesIO
-        
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=letter,
-            rightMargin=50,
-            leftMargin=50,
-            topMargin=50,
-            bottomMargin=40
-        )
-        
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Custom monospace style for compliance reports
-        mono_style = ParagraphStyle(
-            'MonoStyle',
-            parent=styles['Normal'],
-            fontName='Courier',
-            fontSize=9,
-            leading=11,
-            leftIndent=0,
-            rightIndent=0,
-            alignment=TA_LEFT,
-            spaceAfter=6
-        )
-        
-        # Clean text for PDF - remove problematic characters
-        clean_text = markdown_text.replace('&', 'and').replace('<', '(').replace('>', ')')
-        
-        # Split by lines and render
-        for line in clean_text.split('\n'):
-            if line.strip():
-                # Escape special XML characters
-                safe_line = line.replace('&', '&amp;')
-                try:
-                    story.append(Paragraph(safe_line, mono_style))
-                except:
-                    # Fallback for problematic lines
-                    story.append(Spacer(1, 0.1*inch))
-            else:
-                story.append(Spacer(1, 0.1*inch))
-        
-        doc.build(story)
-        buffer.seek(0)
-        return buffer.getvalue()
+        return pdf_exporter.render(markdown_text)
         
     except ImportError:
         st.warning("⚠️ PDF generation requires 'reportlab'. Install with: pip install reportlab")
@@ -92,13 +45,171 @@ def markdown_to_pdf(markdown_text: str, filename: str) -> bytes:
 
 # HELPER: Create XLSX from DataFrame
 def create_excel_buffer(dataframes_dict: dict) -> bytes:
-    """Create multi-sheet Excel file"""
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        for sheet_name, df in dataframes_dict.items():
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-    buffer.seek(0)
-    return buffer.getvalue()
+    """Create multi-sheet Excel file (streamed row by row; long tables split across sheets)"""
+    return write_excel(dataframes_dict)
+
+# HELPER: Export a trade table as Excel, CSV.gz or Parquet
+TABLE_EXPORT_FORMATS = ['Excel', 'CSV.gz', 'Parquet']
+
+def table_file(stem: str, fmt: str):
+    """Return (file_name, mime) for a table in the chosen export format"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    suffix, mime = ('.xlsx', XLSX_MIME) if fmt == 'Excel' else BULK_FORMATS[fmt.lower()]
+    return f"{stem}_{timestamp}{suffix}", mime
+
+def export_table(df: pd.DataFrame, stem: str, fmt: str):
+    """Return (data, file_name, mime) for a table in the chosen export format"""
+    if fmt == 'Excel':
+        data = write_excel({stem.replace('_', ' ').title(): df})
+    else:
+        data = write_bulk(df, fmt.lower())
+    return (data, *table_file(stem, fmt))
+
+def default_table_format(df: pd.DataFrame) -> int:
+    """Index into TABLE_EXPORT_FORMATS: Excel unless the table needs more than one sheet"""
+    return 1 if len(df) >= EXCEL_MAX_ROWS else 0
+
+# HELPER: Download artifacts are built only on request and memoized by their inputs
+ARTIFACT_CACHE_ENTRIES = 16
+
+# Leading-underscore arguments are not hashed by st.cache_data: tables are keyed by
+# the upload they came from (dataset_key) and runs by run_key, which is much cheaper
+# than hashing millions of rows on every rerun.
+@st.cache_data(max_entries=ARTIFACT_CACHE_ENTRIES, show_spinner=False)
+def build_table_export(dataset_key: str, stem: str, fmt: str, _df: pd.DataFrame) -> bytes:
+    """Cached export_table() data for a table derived from the uploaded files"""
+    return export_table(_df, stem, fmt)[0]
+
+@st.cache_data(max_entries=ARTIFACT_CACHE_ENTRIES, show_spinner=False)
+def build_csv(dataset_key: str, stem: str, _df: pd.DataFrame) -> bytes:
+    """Cached CSV export of a table derived from the uploaded files"""
+    return _df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(max_entries=ARTIFACT_CACHE_ENTRIES, show_spinner=False)
+def build_results_json(run_key: str, _results: dict) -> str:
+    """Cached JSON export of an intelligent run"""
+    return json.dumps(_results, indent=2, default=str)
+
+@st.cache_data(max_entries=ARTIFACT_CACHE_ENTRIES, show_spinner=False)
+def build_results_excel(run_key: str, _results: dict) -> bytes:
+    """Cached Excel export of an intelligent run"""
+    return create_excel_buffer({
+        'Summary': pd.DataFrame([_results.get("summary", {})]),
+        'Exceptions': _results.get('exceptions', []) if isinstance(_results.get('exceptions'), list) else pd.DataFrame()
+    })
+
+def on_demand_download(label: str, key: str, build, file_name: str, mime: str):
+    """
+    Show a Prepare button; once clicked, build the artifact and offer the download
+    
+    key identifies the artifact and its inputs: a new dataset or run gets a new
+    key and has to be prepared again, so nothing is built on reruns unless asked.
+    """
+    prepared = st.session_state.setdefault("prepared_downloads", set())
+    if key not in prepared:
+        if not st.button(f"⚙️ Prepare {label}", key=f"prepare_{key}", use_container_width=True):
+            return
+        prepared.add(key)
+    with st.spinner(f"Preparing {label}..."):
+        data = build()
+    st.download_button(
+        label=label,
+        data=data,
+        file_name=file_name,
+        mime=mime,
+        use_container_width=True,
+        key=f"download_{key}"
+    )
+
+# HELPER: Parsed uploads and reconciliation results are shared across reruns and sessions,
+# keyed by a SHA-256 of the uploaded bytes (see result_cache.py)
+def upload_digest(upload) -> str:
+    """SHA-256 of an uploaded file, hashed once per upload in this session"""
+    digests = st.session_state.setdefault("upload_digests", {})
+    upload_id = getattr(upload, "file_id", None) or f"{upload.name}-{upload.size}"
+    if upload_id not in digests:
+        digests[upload_id] = content_digest(upload.getvalue())
+    return digests[upload_id]
+
+def load_upload(upload, label: str) -> pd.DataFrame:
+    """Typed trades DataFrame for an upload (read-only: shared through the result cache)"""
+    suffix = Path(upload.name).suffix.lower()
+    return result_cache.get_or_compute(("trades", suffix, upload_digest(upload)),
+                                       lambda: load_trades(upload, label=label))
+
+def reconcile_uploads(broker_file, exchange_file, broker_df: pd.DataFrame, exchange_df: pd.DataFrame) -> dict:
+    """reconcile_trades() results for a pair of uploads (read-only: shared through the result cache)"""
+    key = ("reconcile", upload_digest(broker_file), upload_digest(exchange_file))
+    return result_cache.get_or_compute(key, lambda: reconcile_trades(broker_df, exchange_df))
+
+@st.cache_resource(show_spinner=False)
+def get_cached_orchestrator() -> TradeReconOrchestrator:
+    """One orchestrator (and Intelligence Engine) per process, shared by all sessions"""
+    return TradeReconOrchestrator()
+
+# HELPER: Run the intelligent workflow from its event stream, showing results as they arrive
+LIVE_FEED_LINES = 8
+LIVE_REFRESH_SECONDS = 0.25
+
+def stream_intelligent_reconciliation(orchestrator: TradeReconOrchestrator, broker_df: pd.DataFrame,
+                                      exchange_df: pd.DataFrame) -> dict:
+    """
+    Drive iter_full_reconciliation(): matching counts first, then each analyzed
+    exception as it completes, then the compliance report
+    
+    Returns the same dictionary as run_full_reconciliation(). If Streamlit stops
+    the script mid-run (the user interacts), the generator is closed and the
+    engine stops sending new requests.
+    """
+    status = st.status("🤖 Matching trades...", expanded=True)
+    matching_area = status.empty()
+    progress = status.empty()
+    feed = status.empty()
+    recent = deque(maxlen=LIVE_FEED_LINES)
+    results = {'summary': {}, 'enriched_exceptions': []}
+    last_refresh = 0.0
+    
+    events = orchestrator.iter_full_reconciliation(broker_df, exchange_df)
+    try:
+        for event in events:
+            kind = event['event']
+            if kind == 'error':
+                status.update(label="❌ Intelligence Engine unavailable", state="error")
+                return {'error': event['error'], 'summary': {}, 'enriched_exceptions': []}
+            if kind == 'matching':
+                results['exceptions'] = event['exceptions']
+                results['enriched_exceptions'] = [None] * len(event['exceptions'])
+                with matching_area.container():
+                    m1, m2, m3, m4 = st.columns(4)
+                    m1.metric("📊 Total Trades", event['total_trades'])
+                    m2.metric("✅ Matched", event['matched_count'])
+                    m3.metric("⚠️ Mismatches", event['mismatch_count'])
+                    m4.metric("❌ Missing", event['missing_count'])
+                status.update(label=f"🤖 Analyzing {len(event['exceptions'])} exceptions...")
+                progress.progress(0.0 if len(event['exceptions']) else 1.0)
+            elif kind == 'exception':
+                ex = event['exception']
+                results['enriched_exceptions'][event['index']] = ex
+                sev = ex.get("severity_classification", {}).get("severity", "Low")
+                recent.appendleft(f"- ✅ Trade {ex.get('trade_id', 'Unknown')} | {sev} | {ex.get('exception_type', 'Exception')}")
+                # Throttle redraws so large runs do not flood the browser
+                now = time.monotonic()
+                if now - last_refresh >= LIVE_REFRESH_SECONDS or event['completed'] == event['total']:
+                    last_refresh = now
+                    progress.progress(event['completed'] / event['total'],
+                                      text=f"{event['completed']}/{event['total']} exceptions analyzed")
+                    feed.markdown("\n".join(recent))
+            elif kind == 'report':
+                status.update(label="📄 Compliance report ready", state="complete", expanded=False)
+                results.update(
+                    summary=event['summary'],
+                    final_compliance_report=event['final_compliance_report'],
+                    circuit_breaker=event['circuit_breaker'],
+                    profile=event['profile']
+                )
+    finally:
+        events.close()
+    return results
 
 # HELPER: Generate markdown file with proper formatting
 def generate_markdown_report(report_text: str) -> str:
@@ -223,8 +334,9 @@ with st.sidebar:
     st.title("📁 Upload Trade Files")
     st.markdown("---")
 
-    broker_file = st.file_uploader("**Broker Trades CSV**", type=['csv'])
-    exchange_file = st.file_uploader("**Exchange Trades CSV**", type=['csv'])
+    upload_types = [suffix.lstrip('.') for suffix in SUPPORTED_SUFFIXES]
+    broker_file = st.file_uploader("**Broker Trades (CSV / Parquet / Arrow)**", type=upload_types)
+    exchange_file = st.file_uploader("**Exchange Trades (CSV / Parquet / Arrow)**", type=upload_types)
 
     st.markdown("---")
     st.checkbox("Show All Trades", value=False)
@@ -244,14 +356,20 @@ if broker_file and exchange_file:
     try:
         # Load data
         with st.spinner("🔄 Loading trade data..."):
-            broker_df = pd.read_csv(broker_file)
-            exchange_df = pd.read_csv(exchange_file)
+            broker_df = load_upload(broker_file, 'broker trades')
+            exchange_df = load_upload(exchange_file, 'exchange trades')
 
         st.success("✅ Files loaded successfully!")
+        dataset_key = f"{upload_digest(broker_file)}:{upload_digest(exchange_file)}"
+        if st.session_state.get("download_dataset_key") != dataset_key:
+            # New uploads: previously prepared downloads no longer apply
+            st.session_state.download_dataset_key = dataset_key
+            st.session_state.prepared_downloads = set()
+            st.session_state.basic_report_generated = {}
 
         # Reconcile
         with st.spinner("🔍 Reconciling trades..."):
-            results = reconcile_trades(broker_df, exchange_df)
+            results = reconcile_uploads(broker_file, exchange_file, broker_df, exchange_df)
 
         # Dashboard
         st.markdown("## 📊 Reconciliation Dashboard")
@@ -308,7 +426,8 @@ if broker_file and exchange_file:
             st.markdown("### 🚨 Trade Exceptions")
 
             if len(results['exceptions']) > 0:
-                exceptions_df = results['exceptions']
+                exceptions_df = result_cache.get_or_compute(("exceptions", dataset_key),
+                                                            lambda: render_exceptions(results['exceptions']))
 
                 def highlight_exception_type(row):
                     if row['exception_type'] == 'mismatch':
@@ -326,23 +445,19 @@ if broker_file and exchange_file:
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    excel_buffer = create_excel_buffer({'Exceptions': exceptions_df})
-                    st.download_button(
-                        label="📊 Download as Excel (.xlsx)",
-                        data=excel_buffer,
+                    on_demand_download(
+                        "📊 Download as Excel (.xlsx)", f"exceptions_xlsx_{dataset_key}",
+                        lambda: build_table_export(dataset_key, "exceptions", "Excel", exceptions_df),
                         file_name=f"exceptions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
+                        mime=XLSX_MIME
                     )
                 
                 with col2:
-                    csv_data = exceptions_df.to_csv(index=False)
-                    st.download_button(
-                        label="📄 Download as CSV",
-                        data=csv_data,
+                    on_demand_download(
+                        "📄 Download as CSV", f"exceptions_csv_{dataset_key}",
+                        lambda: build_csv(dataset_key, "exceptions", exceptions_df),
                         file_name=f"exceptions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        use_container_width=True
+                        mime="text/csv"
                     )
 
                 st.markdown("---")
@@ -374,13 +489,20 @@ if broker_file and exchange_file:
 
             if ai_report:
                 report = ai_report
+                report_id = f"ai_{st.session_state.get('intelligent_run_key', '')}"
                 st.success("✅ Showing AI-Generated Compliance Report")
             else:
                 st.warning("⚠️ Basic report shown. Run 'Intelligent Reconciliation' tab for full AI analysis.")
+                # Generation time is fixed per dataset so reruns reproduce the same report
+                # (and its prepared downloads) instead of a new one every second
+                generated_at = st.session_state.setdefault("basic_report_generated", {}).setdefault(
+                    dataset_key, datetime.now()
+                )
+                report_id = f"basic_{dataset_key}"
                 # Enhanced default report
                 report = f"""TRADE RECONCILIATION COMPLIANCE REPORT
 
-Generated: {datetime.now().strftime('%B %d, %Y at %H:%M:%S')}
+Generated: {generated_at.strftime('%B %d, %Y at %H:%M:%S')}
 Report Type: Basic Reconciliation Summary
 
 ================================================================================
@@ -467,34 +589,30 @@ END OF REPORT
 
             col1, col2, col3 = st.columns(3)
 
+            # Downloads are keyed by which report this is (dataset or AI run), not by its text
             with col1:
-                md_data = format_report_for_export(report)
-                st.download_button(
-                    label="📄 Download as Markdown (.md)",
-                    data=md_data,
+                on_demand_download(
+                    "📄 Download as Markdown (.md)", f"report_md_{report_id}",
+                    lambda: format_report_for_export(report),
                     file_name=f"compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md",
-                    mime="text/markdown",
-                    use_container_width=True
+                    mime="text/markdown"
                 )
 
             with col2:
-                pdf_data = markdown_to_pdf(report, "compliance_report")
-                st.download_button(
-                    label="📕 Download as PDF (.pdf)",
-                    data=pdf_data,
+                # Rendered PDFs are cached by report content in pdf_exporter
+                on_demand_download(
+                    "📕 Download as PDF (.pdf)", f"report_pdf_{report_id}",
+                    lambda: markdown_to_pdf(report, "compliance_report"),
                     file_name=f"compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                    mime="application/pdf",
-                    use_container_width=True
+                    mime="application/pdf"
                 )
 
             with col3:
-                txt_data = report.encode('utf-8')
-                st.download_button(
-                    label="📃 Download as Text (.txt)",
-                    data=txt_data,
+                on_demand_download(
+                    "📃 Download as Text (.txt)", f"report_txt_{report_id}",
+                    lambda: report.encode('utf-8'),
                     file_name=f"compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                    mime="text/plain",
-                    use_container_width=True
+                    mime="text/plain"
                 )
 
         # ============ TAB 3: ALL TRADES ============
@@ -505,25 +623,23 @@ END OF REPORT
             with col1:
                 st.markdown("#### Broker Trades")
                 st.dataframe(broker_df, use_container_width=True, height=400)
-                broker_excel = create_excel_buffer({'Broker Trades': broker_df})
-                st.download_button(
-                    label="📊 Download Broker Trades (Excel)",
-                    data=broker_excel,
-                    file_name=f"broker_trades_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True
+                broker_format = st.radio("Broker export format", TABLE_EXPORT_FORMATS, horizontal=True,
+                                         index=default_table_format(broker_df), key="broker_export_format")
+                on_demand_download(
+                    f"📊 Download Broker Trades ({broker_format})", f"broker_{broker_format}_{dataset_key}",
+                    lambda: build_table_export(dataset_key, "broker_trades", broker_format, broker_df),
+                    *table_file("broker_trades", broker_format)
                 )
 
             with col2:
                 st.markdown("#### Exchange Trades")
                 st.dataframe(exchange_df, use_container_width=True, height=400)
-                exchange_excel = create_excel_buffer({'Exchange Trades': exchange_df})
-                st.download_button(
-                    label="📊 Download Exchange Trades (Excel)",
-                    data=exchange_excel,
-                    file_name=f"exchange_trades_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True
+                exchange_format = st.radio("Exchange export format", TABLE_EXPORT_FORMATS, horizontal=True,
+                                           index=default_table_format(exchange_df), key="exchange_export_format")
+                on_demand_download(
+                    f"📊 Download Exchange Trades ({exchange_format})", f"exchange_{exchange_format}_{dataset_key}",
+                    lambda: build_table_export(dataset_key, "exchange_trades", exchange_format, exchange_df),
+                    *table_file("exchange_trades", exchange_format)
                 )
 
         # ============ TAB 4: INTELLIGENT RECONCILIATION ============
@@ -557,14 +673,27 @@ All in **ONE optimized call** for maximum speed and consistency!
                 )
 
             if run_intelligent:
-                with st.spinner("🤖 Running AI agents... This may take a minute..."):
-                    try:
-                        intelligent_results = run_full_reconciliation(broker_df, exchange_df)
-                        st.session_state.intelligent_results = intelligent_results
+                try:
+                    orchestrator = get_cached_orchestrator()
+                    if not orchestrator.agents_initialized:
+                        # Don't keep a failed engine; the next run retries initialization
+                        get_cached_orchestrator.clear()
+                    intelligent_results = stream_intelligent_reconciliation(orchestrator, broker_df, exchange_df)
+                    st.session_state.intelligent_results = intelligent_results
+                    # Identifies this run's download artifacts
+                    st.session_state.intelligent_run_key = content_key(
+                        intelligent_results.get("final_compliance_report") or datetime.now().isoformat()
+                    )
+                    # Start the PDF export in the background while the results render
+                    if intelligent_results.get("final_compliance_report"):
+                        pdf_exporter.submit(intelligent_results["final_compliance_report"])
+                    if intelligent_results.get("error"):
+                        st.error(f"❌ {intelligent_results['error']}")
+                    else:
                         st.success("✅ Intelligent Reconciliation Complete!")
-                    except Exception as e:
-                        st.error(f"❌ Error during intelligent reconciliation: {str(e)}")
-                        st.exception(e)
+                except Exception as e:
+                    st.error(f"❌ Error during intelligent reconciliation: {str(e)}")
+                    st.exception(e)
 
             if "intelligent_results" in st.session_state:
                 i_results = st.session_state.intelligent_results
@@ -588,45 +717,38 @@ All in **ONE optimized call** for maximum speed and consistency!
                 
                 final_report = i_results.get("final_compliance_report", "No report generated.")
                 
+                run_key = st.session_state.get("intelligent_run_key", "")
+                
                 with d_col1:
-                    st.download_button(
-                        "📄 Markdown",
-                        data=final_report,
+                    on_demand_download(
+                        "📄 Markdown", f"ai_md_{run_key}",
+                        lambda: final_report,
                         file_name=f"ai_compliance_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md",
-                        mime="text/markdown",
-                        use_container_width=True,
+                        mime="text/markdown"
                     )
                 
                 with d_col2:
-                    pdf_report = markdown_to_pdf(final_report, "ai_compliance")
-                    st.download_button(
-                        "📕 PDF",
-                        data=pdf_report,
+                    on_demand_download(
+                        "📕 PDF", f"ai_pdf_{run_key}",
+                        lambda: markdown_to_pdf(final_report, "ai_compliance"),
                         file_name=f"ai_compliance_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                        mime="application/pdf",
-                        use_container_width=True,
+                        mime="application/pdf"
                     )
                 
                 with d_col3:
-                    st.download_button(
-                        "📊 JSON",
-                        data=json.dumps(i_results, indent=2, default=str),
+                    on_demand_download(
+                        "📊 JSON", f"ai_json_{run_key}",
+                        lambda: build_results_json(run_key, i_results),
                         file_name=f"reconciliation_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                        mime="application/json",
-                        use_container_width=True,
+                        mime="application/json"
                     )
                 
                 with d_col4:
-                    excel_data = create_excel_buffer({
-                        'Summary': pd.DataFrame([summary]),
-                        'Exceptions': i_results.get('exceptions', []) if isinstance(i_results.get('exceptions'), list) else pd.DataFrame()
-                    })
-                    st.download_button(
-                        "📊 Excel",
-                        data=excel_data,
+                    on_demand_download(
+                        "📊 Excel", f"ai_xlsx_{run_key}",
+                        lambda: build_results_excel(run_key, i_results),
                         file_name=f"reconciliation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True,
+                        mime=XLSX_MIME
                     )
 
                 st.markdown("---")
@@ -0,0 +1,4 @@
+"""
+TradeRecon AI - Benchmarks
+Synthetic trade-file generator and performance harnesses
+"""
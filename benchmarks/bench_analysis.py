@@ -0,0 +1,125 @@
+"""
+TradeRecon AI - Analysis pipeline load test
+Runs the full orchestrator against a local LLM stand-in (in-process fake or the
+HTTP stand-in server) and records throughput under injected latency, errors
+and rate limits; no network access or API key needed
+
+Usage:
+    python -m benchmarks.bench_analysis --rows 20000 --latency 0.3 --error-rate 0.05 --rate-limit-rate 0.02
+    python -m benchmarks.bench_analysis --backend http --max-concurrency 16 --no-batch
+    python -m benchmarks.bench_analysis --primary-down --output analysis_bench.json
+    python -m benchmarks.bench_analysis --latency 1.0 --no-batch --time-budget 5
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import TradeReconOrchestrator  # noqa: E402
+from agents.backends import FakeBackend, GroqBackend  # noqa: E402
+from benchmarks.llm_standin import start_standin_server  # noqa: E402
+from benchmarks.synthetic_trades import generate_trade_pair  # noqa: E402
+
+PRIMARY_MODEL = 'openai/gpt-oss-120b'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the exception analysis pipeline offline')
+    parser.add_argument('--rows', type=int, default=10_000, help='broker trades to generate')
+    parser.add_argument('--mismatch-rate', type=float, default=0.02)
+    parser.add_argument('--missing-rate', type=float, default=0.01)
+    parser.add_argument('--backend', choices=['fake', 'http'], default='fake',
+                        help='in-process fake or the local HTTP stand-in server')
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds per completion')
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=float, default=0.5)
+    parser.add_argument('--primary-down', action='store_true',
+                        help='fail every primary-model call (fake backend only)')
+    parser.add_argument('--max-concurrency', type=int, default=8)
+    parser.add_argument('--no-batch', action='store_true')
+    parser.add_argument('--no-cluster', action='store_true')
+    parser.add_argument('--no-triage', action='store_true')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='wall-clock budget in seconds; later exceptions are deferred')
+    parser.add_argument('--no-prioritize', action='store_true')
+    parser.add_argument('--prompt-mode', choices=['verbose', 'compact'], default='verbose')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='analysis_bench.json')
+    args = parser.parse_args()
+
+    failure_settings = {
+        'latency_seconds': args.latency,
+        'jitter_seconds': args.jitter,
+        'error_rate': args.error_rate,
+        'rate_limit_rate': args.rate_limit_rate,
+        'retry_after': args.retry_after,
+        'seed': args.seed,
+    }
+    server = None
+    if args.backend == 'http':
+        server, base_url = start_standin_server(**failure_settings)
+        backend = GroqBackend(api_key='standin', base_url=base_url)
+        print(f"✅ Stand-in server on {base_url}")
+    else:
+        overrides = {PRIMARY_MODEL: {'error_rate': 1.0}} if args.primary_down else None
+        backend = FakeBackend(model_overrides=overrides, **failure_settings)
+
+    broker_df, exchange_df = generate_trade_pair(
+        args.rows, mismatch_rate=args.mismatch_rate, missing_rate=args.missing_rate, seed=args.seed
+    )
+    orchestrator = TradeReconOrchestrator(cache_path=None, prompt_mode=args.prompt_mode, backend=backend)
+
+    start = time.perf_counter()
+    results = orchestrator.run_full_reconciliation(
+        broker_df, exchange_df,
+        max_concurrency=args.max_concurrency,
+        batch_analysis=not args.no_batch,
+        cluster_analysis=not args.no_cluster,
+        triage=not args.no_triage,
+        prioritize=not args.no_prioritize,
+        time_budget_seconds=args.time_budget
+    )
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.shutdown()
+
+    summary = results['summary']
+    stages = {stage['stage']: stage['wall_seconds'] for stage in results['profile']['stages']}
+    analysis_seconds = stages.get('llm_analysis', 0.0)
+    exceptions = summary['exceptions_processed']
+    fallbacks = sum(1 for exc in results['enriched_exceptions']
+                    if exc.get('root_cause', {}).get('category') == 'System Synchronization'
+                    and 'Automated analysis was unable' in exc.get('root_cause', {}).get('reason', ''))
+
+    document = {
+        'benchmark': 'analysis',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'settings': vars(args),
+        'exceptions': exceptions,
+        'total_seconds': round(elapsed, 3),
+        'analysis_seconds': analysis_seconds,
+        'exceptions_per_second': round(exceptions / analysis_seconds, 1) if analysis_seconds else None,
+        'fallback_analyses': fallbacks,
+        'summary': summary,
+        'circuit_breaker': results['circuit_breaker'],
+        'stages': stages,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, default=str)
+
+    usage = summary['token_usage']
+    print(f"📊 {exceptions:,} exceptions in {analysis_seconds:.2f}s of analysis "
+          f"({document['exceptions_per_second']} exceptions/s), {usage['calls']} completions, "
+          f"{usage['total_tokens']:,} tokens, {fallbacks} fallback analyses, {summary['deferred_count']} deferred")
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+TradeRecon AI - Matching benchmark harness
+Times the matching path at several input sizes and records the results as JSON
+
+Usage:
+    python -m benchmarks.bench_matching --sizes 10000 100000 1000000 --output bench_results.json
+    python -m benchmarks.bench_matching --baseline bench_results.json --max-regression 0.2
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from matching import (  # noqa: E402
+    reconcile_trades,
+    generate_summary_statistics,
+    get_high_priority_exceptions,
+)
+from loader import apply_trade_schema  # noqa: E402
+from instrumentation import peak_rss_mb  # noqa: E402
+from benchmarks.synthetic_trades import generate_trade_pair  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=Path(__file__).resolve().parent, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def time_call(func, *args, repeat=1, trace_memory=False, **kwargs):
+    """
+    Time a call, optionally tracking its peak Python heap allocation.
+
+    Args:
+        func: Callable to time
+        repeat: Number of runs; the fastest is reported
+        trace_memory: Measure peak allocation with tracemalloc (slows the call)
+
+    Returns:
+        Tuple of (last result, stats dict)
+    """
+    best = float('inf')
+    peak_mb = None
+    result = None
+    for _ in range(repeat):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_mb = max(peak_mb or 0.0, peak / (1024 * 1024))
+        best = min(best, elapsed)
+    return result, {'seconds': round(best, 6), 'peak_alloc_mb': None if peak_mb is None else round(peak_mb, 2)}
+
+
+def run_size(rows, repeat=1, trace_memory=False, typed=True, seed=0, **generator_kwargs):
+    """
+    Benchmark the matching path on one generated input size.
+
+    Args:
+        rows: Broker rows to generate
+        repeat: Runs per stage (fastest reported)
+        trace_memory: Record peak allocation per stage with tracemalloc
+        typed: Apply the loader schema (categoricals etc.) before matching
+        seed: Generator seed
+        **generator_kwargs: Passed to generate_trade_pair()
+
+    Returns:
+        Dictionary of per-stage timings, throughput and memory
+    """
+    broker_df, exchange_df = generate_trade_pair(rows, seed=seed, **generator_kwargs)
+    if typed:
+        broker_df = apply_trade_schema(broker_df)
+        exchange_df = apply_trade_schema(exchange_df)
+    input_rows = len(broker_df) + len(exchange_df)
+
+    results, recon = time_call(reconcile_trades, broker_df, exchange_df,
+                               repeat=repeat, trace_memory=trace_memory)
+    _, summary = time_call(generate_summary_statistics, results,
+                           repeat=repeat, trace_memory=trace_memory)
+    _, high_priority = time_call(get_high_priority_exceptions, results['exceptions'],
+                                 repeat=repeat, trace_memory=trace_memory)
+
+    recon['rows_per_second'] = round(input_rows / recon['seconds']) if recon['seconds'] else None
+    max_rss = peak_rss_mb()
+
+    return {
+        'rows': rows,
+        'input_rows': input_rows,
+        'exceptions': len(results['exceptions']),
+        'stages': {
+            'reconcile_trades': recon,
+            'generate_summary_statistics': summary,
+            'get_high_priority_exceptions': high_priority,
+        },
+        'max_rss_mb': None if max_rss is None else round(max_rss, 1),
+    }
+
+
+def compare_to_baseline(current, baseline, max_regression):
+    """
+    List reconcile_trades throughput regressions beyond max_regression.
+
+    Args:
+        current: Results document from this run
+        baseline: Results document from a previous run
+        max_regression: Allowed fractional throughput drop (0.2 = 20%)
+
+    Returns:
+        List of human-readable regression messages
+    """
+    previous = {run['rows']: run for run in baseline.get('runs', [])}
+    regressions = []
+    for run in current['runs']:
+        before = previous.get(run['rows'])
+        if not before:
+            continue
+        old = before['stages']['reconcile_trades'].get('rows_per_second')
+        new = run['stages']['reconcile_trades'].get('rows_per_second')
+        if old and new and new < old * (1 - max_regression):
+            regressions.append(
+                f"{run['rows']} rows: {new:,} rows/s vs baseline {old:,} rows/s "
+                f"({(1 - new / old) * 100:.1f}% slower)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the TradeRecon matching path')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='record peak allocation per stage with tracemalloc (slower)')
+    parser.add_argument('--untyped', action='store_true', help='skip the loader schema (object columns)')
+    parser.add_argument('--mismatch-rate', type=float, default=0.02)
+    parser.add_argument('--missing-rate', type=float, default=0.01)
+    parser.add_argument('--duplicate-rate', type=float, default=0.0)
+    parser.add_argument('--time-skew-rate', type=float, default=0.01)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help='previous results file to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    args = parser.parse_args()
+
+    document = {
+        'benchmark': 'matching',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'typed_input': not args.untyped,
+        'rates': {
+            'mismatch': args.mismatch_rate,
+            'missing': args.missing_rate,
+            'duplicate': args.duplicate_rate,
+            'time_skew': args.time_skew_rate,
+        },
+        'runs': [],
+    }
+
+    for rows in args.sizes:
+        print(f"⏱️  {rows:,} rows...")
+        run = run_size(
+            rows,
+            repeat=args.repeat,
+            trace_memory=args.trace_memory,
+            typed=not args.untyped,
+            mismatch_rate=args.mismatch_rate,
+            missing_rate=args.missing_rate,
+            duplicate_rate=args.duplicate_rate,
+            time_skew_rate=args.time_skew_rate,
+        )
+        recon = run['stages']['reconcile_trades']
+        print(f"   reconcile_trades: {recon['seconds']:.3f}s ({recon['rows_per_second']:,} rows/s), "
+              f"{run['exceptions']:,} exceptions, peak RSS {run['max_rss_mb']} MB")
+        document['runs'].append(run)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(document, baseline, args.max_regression)
+        if regressions:
+            print("❌ Throughput regressions detected:")
+            for message in regressions:
+                print(f"   {message}")
+            sys.exit(1)
+        print("✅ No throughput regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+TradeRecon AI - Prompt mode benchmark
+Compares the verbose and compact prompt modes of the Intelligence Engine on cost
+(prompt/completion tokens, latency) and on the quality fields of the analyses
+
+Without --live only prompt sizes are estimated (no API calls). With --live the
+exceptions are analyzed in both modes with GROQ_API_KEY and the recorded token
+usage and analysis quality are compared.
+
+Usage:
+    python -m benchmarks.bench_prompts --exceptions 50
+    python -m benchmarks.bench_prompts --exceptions 20 --live --batch --output prompt_bench.json
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from matching import reconcile_trades, render_exception  # noqa: E402
+from agents.intelligence_engine import (  # noqa: E402
+    ACTION_TYPES,
+    PROMPT_MODES,
+    RISK_LEVELS,
+    ROOT_CAUSE_CATEGORIES,
+    SEVERITY_LEVELS,
+    TradeReconIntelligenceEngine,
+    estimate_tokens,
+)
+from agents.backends import FakeBackend  # noqa: E402
+from benchmarks.synthetic_trades import generate_trade_pair  # noqa: E402
+
+PLACEHOLDERS = {'', 'n/a', 'na', 'unknown', 'none', 'null'}
+
+
+def sample_exceptions(count, seed=0):
+    """Rendered exceptions from a synthetic trade pair, as sent to the engine"""
+    rows = max(count * 20, 1000)
+    broker_df, exchange_df = generate_trade_pair(rows, mismatch_rate=0.03, missing_rate=0.01, seed=seed)
+    exceptions_df = reconcile_trades(broker_df, exchange_df)['exceptions'].head(count)
+    return [render_exception(row) for row in exceptions_df.to_dict('records')]
+
+
+def _text(value):
+    return isinstance(value, str) and value.strip().lower() not in PLACEHOLDERS
+
+
+def analysis_quality(analysis):
+    """
+    Score the quality fields of one analysis.
+
+    Args:
+        analysis: Analysis dict returned by the engine
+
+    Returns:
+        Tuple of (score between 0 and 1, list of failed checks)
+    """
+    root_cause = analysis.get('root_cause') or {}
+    fix = analysis.get('fix_suggestion') or {}
+    risk = analysis.get('risk_assessment') or {}
+    confidence = root_cause.get('confidence_score')
+
+    checks = {
+        'root_cause.category': root_cause.get('category') in ROOT_CAUSE_CATEGORIES,
+        'root_cause.reason': _text(root_cause.get('reason')),
+        'root_cause.confidence_score': isinstance(confidence, (int, float)) and 0 <= confidence <= 1,
+        'severity': analysis.get('severity') in SEVERITY_LEVELS,
+        'fix_suggestion.action_type': fix.get('action_type') in ACTION_TYPES,
+        'fix_suggestion.suggested_fix': _text(fix.get('suggested_fix')),
+        'fix_suggestion.estimated_time': _text(fix.get('estimated_time')),
+        'risk_assessment.financial_risk': _text(risk.get('financial_risk')),
+        'risk_assessment.operational_risk': _text(risk.get('operational_risk')),
+        'risk_assessment.compliance_risk': _text(risk.get('compliance_risk')),
+        'risk_assessment.overall_risk_level': risk.get('overall_risk_level') in RISK_LEVELS,
+        'compliance_note': _text(analysis.get('compliance_note')),
+        'full_explanation': _text(analysis.get('full_explanation')),
+        'no_fallback': not analysis.get('_error'),
+    }
+    failed = [name for name, passed in checks.items() if not passed]
+    return round(1 - len(failed) / len(checks), 4), failed
+
+
+def estimate_prompt_sizes(engine, exceptions):
+    """
+    Estimated prompt tokens per exception for single and batched requests.
+
+    Args:
+        engine: Engine whose prompt_mode is being measured
+        exceptions: Rendered exceptions
+
+    Returns:
+        Dictionary of estimated token counts
+    """
+    system_tokens = estimate_tokens(engine._generate_system_prompt())
+    single = [system_tokens + estimate_tokens(engine._generate_user_prompt(exc)) for exc in exceptions]
+    batches = engine._plan_batches(exceptions, list(range(len(exceptions))))
+    batched = sum(
+        system_tokens + estimate_tokens(engine._generate_batch_prompt([exceptions[idx] for idx in batch]))
+        for batch in batches
+    )
+    return {
+        'system_prompt_tokens': system_tokens,
+        'single_prompt_tokens_per_exception': round(sum(single) / len(single), 1) if single else 0.0,
+        'batches': len(batches),
+        'batched_prompt_tokens_per_exception': round(batched / len(exceptions), 1) if exceptions else 0.0,
+    }
+
+
+def run_live(engine, exceptions, batch=False, max_concurrency=None):
+    """
+    Analyze exceptions for real and summarize usage and quality.
+
+    Returns:
+        Dictionary with the engine's usage summary and quality scores
+    """
+    mark = len(engine.usage_log)
+    analyze = engine.analyze_exceptions_batch if batch else engine.analyze_exceptions
+    analyses = analyze(exceptions, max_concurrency=max_concurrency)
+
+    scores, failures = [], {}
+    for analysis in analyses:
+        score, failed = analysis_quality(analysis)
+        scores.append(score)
+        for name in failed:
+            failures[name] = failures.get(name, 0) + 1
+
+    return {
+        'usage': engine.usage_summary(since=mark),
+        'quality': {
+            'mean_score': round(sum(scores) / len(scores), 4) if scores else None,
+            'fully_valid_share': round(sum(1 for s in scores if s == 1.0) / len(scores), 4) if scores else None,
+            'failed_checks': failures,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare verbose and compact prompt modes')
+    parser.add_argument('--exceptions', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--live', action='store_true', help='call the API (needs GROQ_API_KEY)')
+    parser.add_argument('--batch', action='store_true', help='use batched requests in live mode')
+    parser.add_argument('--max-concurrency', type=int, default=None)
+    parser.add_argument('--output', default='prompt_bench.json')
+    args = parser.parse_args()
+
+    exceptions = sample_exceptions(args.exceptions, seed=args.seed)
+    document = {
+        'benchmark': 'prompts',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'exceptions': len(exceptions),
+        'live': args.live,
+        'batch': args.batch,
+        'modes': {},
+    }
+
+    for mode in PROMPT_MODES:
+        # Offline runs never call the backend; the fake one just avoids needing a key
+        backend = None if args.live else FakeBackend()
+        engine = TradeReconIntelligenceEngine(prompt_mode=mode, backend=backend)
+        result = {'estimate': estimate_prompt_sizes(engine, exceptions)}
+        print(f"📏 {mode}: ~{result['estimate']['single_prompt_tokens_per_exception']:,} prompt tokens per "
+              f"single request, ~{result['estimate']['batched_prompt_tokens_per_exception']:,} per exception batched")
+        if args.live:
+            result.update(run_live(engine, exceptions, batch=args.batch, max_concurrency=args.max_concurrency))
+            usage, quality = result['usage'], result['quality']
+            print(f"   {usage['total_tokens']:,} tokens ({usage['tokens_per_exception']:,} per exception), "
+                  f"avg latency {usage['avg_latency_seconds']}s, quality {quality['mean_score']}")
+        document['modes'][mode] = result
+
+    verbose, compact = document['modes']['verbose'], document['modes']['compact']
+    key = 'batched_prompt_tokens_per_exception' if args.batch else 'single_prompt_tokens_per_exception'
+    if verbose['estimate'][key]:
+        document['estimated_prompt_savings'] = round(1 - compact['estimate'][key] / verbose['estimate'][key], 4)
+        print(f"💰 Compact prompts are ~{document['estimated_prompt_savings']:.0%} smaller")
+    if args.live and verbose['usage']['tokens_per_exception']:
+        document['measured_token_savings'] = round(
+            1 - compact['usage']['tokens_per_exception'] / verbose['usage']['tokens_per_exception'], 4
+        )
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+TradeRecon AI - Local LLM stand-in server
+A small Groq/OpenAI-compatible chat completions server that returns schema-valid
+analyses with configurable latency, error rate and rate-limit responses, for
+offline load tests of the analysis pipeline
+
+Point the engine at it with GroqBackend(api_key='standin', base_url=server_url).
+
+Usage:
+    python -m benchmarks.llm_standin --port 8765 --latency 0.5 --error-rate 0.05 --rate-limit-rate 0.02
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.backends import STANDIN_COMPLETIONS_PATH, standin_response  # noqa: E402
+
+
+class StandinConfig:
+    """Failure and latency settings shared by the server's handler threads"""
+
+    def __init__(self, latency_seconds=0.0, jitter_seconds=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=1.0, seed=None):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self.responses = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Count a request and draw its (delay, roll)"""
+        with self._lock:
+            self.requests += 1
+            jitter = self._random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0.0
+            return self.latency_seconds + jitter, self._random.random()
+
+    def count(self, status):
+        with self._lock:
+            self.responses[status] = self.responses.get(status, 0) + 1
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Serves POST /openai/v1/chat/completions"""
+
+    config = StandinConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.config.count(status)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != STANDIN_COMPLETIONS_PATH:
+            self._send_json(404, {'error': {'message': f'Unknown path {self.path}', 'type': 'not_found'}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        delay, roll = self.config.draw()
+        time.sleep(delay)
+
+        if roll < self.config.rate_limit_rate:
+            self._send_json(429, {'error': {'message': 'Rate limit reached (stand-in)', 'type': 'rate_limit_exceeded'}},
+                            headers={'Retry-After': str(self.config.retry_after)})
+            return
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self._send_json(503, {'error': {'message': 'Service unavailable (stand-in)', 'type': 'server_error'}})
+            return
+
+        result = standin_response(request.get('messages', [{'content': ''}]))
+        usage = result['usage']
+        self._send_json(200, {
+            'id': f'chatcmpl-{uuid.uuid4().hex}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'standin'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': result['content']},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': usage['prompt_tokens'],
+                'completion_tokens': usage['completion_tokens'],
+                'total_tokens': usage['prompt_tokens'] + usage['completion_tokens']
+            }
+        })
+
+
+def start_standin_server(host='127.0.0.1', port=0, **config):
+    """
+    Start the stand-in server on a background thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        **config: StandinConfig settings (latency_seconds, error_rate, ...)
+
+    Returns:
+        Tuple of (server, base_url); call server.shutdown() to stop it
+    """
+    handler = type('ConfiguredStandinHandler', (StandinHandler,), {'config': StandinConfig(**config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='llm-standin', daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local LLM stand-in server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra uniform random latency, seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 503 responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='share of 429 responses')
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    handler = type('ConfiguredStandinHandler', (StandinHandler,), {'config': StandinConfig(
+        latency_seconds=args.latency, jitter_seconds=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after, seed=args.seed
+    )})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"✅ LLM stand-in listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 Requests: {handler.config.requests}, responses: {handler.config.responses}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+TradeRecon AI - Synthetic trade-file generator
+Produces broker/exchange pairs with controllable break rates for benchmarking
+
+Usage:
+    python -m benchmarks.synthetic_trades --rows 1000000 --out-dir /tmp/trades
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SYMBOLS = np.array([
+    'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'NVDA', 'META', 'NFLX', 'AMD', 'INTC',
+    'IBM', 'ORCL', 'CRM', 'ADBE', 'CSCO', 'QCOM', 'TXN', 'AVGO', 'PYPL', 'BA',
+    'JPM', 'GS', 'MS', 'BAC', 'C', 'WFC', 'V', 'MA', 'KO', 'PEP'
+])
+SIDES = np.array(['BUY', 'SELL'])
+CURRENCIES = np.array(['USD', 'EUR', 'GBP', 'JPY'])
+CURRENCY_WEIGHTS = np.array([0.85, 0.07, 0.05, 0.03])
+
+
+def generate_trade_pair(rows, mismatch_rate=0.02, missing_rate=0.01, duplicate_rate=0.0,
+                        time_skew_rate=0.01, max_skew_seconds=30, accounts=500,
+                        start='2024-03-15 09:30:00', seed=0):
+    """
+    Generate a broker/exchange trade pair with injected breaks.
+
+    Args:
+        rows: Number of broker trades
+        mismatch_rate: Share of trades with a field break on the exchange side
+            (quantity, price, side, symbol, currency or account_id)
+        missing_rate: Share of trades dropped from each side
+        duplicate_rate: Share of exchange trades duplicated under the same trade_id
+        time_skew_rate: Share of exchange trades whose trade_time is skewed
+        max_skew_seconds: Upper bound of the injected time skew
+        accounts: Number of distinct account_ids
+        start: Timestamp of the first trade
+        seed: Random seed
+
+    Returns:
+        Tuple of (broker_df, exchange_df)
+    """
+    rng = np.random.default_rng(seed)
+
+    trade_ids = pd.Series(np.arange(rows)).map('TRD{:09d}'.format)
+    account_ids = np.char.add('ACC', np.char.zfill(np.arange(accounts).astype(str), 5))
+    trade_time = pd.Timestamp(start) + pd.to_timedelta(np.sort(rng.integers(0, 6 * 3600, rows)), unit='s')
+
+    broker = pd.DataFrame({
+        'trade_id': trade_ids.to_numpy(),
+        'symbol': rng.choice(SYMBOLS, rows),
+        'side': rng.choice(SIDES, rows),
+        'quantity': rng.integers(1, 100, rows) * 10,
+        'price': np.round(rng.uniform(5, 900, rows), 2),
+        'currency': rng.choice(CURRENCIES, rows, p=CURRENCY_WEIGHTS),
+        'trade_time': trade_time,
+        'account_id': rng.choice(account_ids, rows),
+    })
+    exchange = broker.copy()
+
+    # Field breaks: each broken trade gets one field changed
+    broken = np.flatnonzero(rng.random(rows) < mismatch_rate)
+    field_choice = rng.integers(0, 6, len(broken))
+    for field_no, field in enumerate(['quantity', 'price', 'side', 'symbol', 'currency', 'account_id']):
+        idx = broken[field_choice == field_no]
+        if len(idx) == 0:
+            continue
+        col = exchange.columns.get_loc(field)
+        if field == 'quantity':
+            exchange.iloc[idx, col] = exchange.iloc[idx, col] + rng.integers(1, 10, len(idx))
+        elif field == 'price':
+            exchange.iloc[idx, col] = np.round(exchange.iloc[idx, col] + rng.choice([0.05, 0.5, 1.25], len(idx)), 2)
+        elif field == 'side':
+            exchange.iloc[idx, col] = np.where(exchange.iloc[idx, col] == 'BUY', 'SELL', 'BUY')
+        elif field == 'symbol':
+            exchange.iloc[idx, col] = rng.choice(SYMBOLS, len(idx))
+        elif field == 'currency':
+            exchange.iloc[idx, col] = rng.choice(CURRENCIES, len(idx))
+        else:
+            exchange.iloc[idx, col] = rng.choice(account_ids, len(idx))
+
+    # Time skew
+    skewed = np.flatnonzero(rng.random(rows) < time_skew_rate)
+    if len(skewed):
+        skew = pd.to_timedelta(rng.integers(1, max_skew_seconds + 1, len(skewed)), unit='s').to_numpy()
+        col = exchange.columns.get_loc('trade_time')
+        exchange.iloc[skewed, col] = exchange['trade_time'].to_numpy()[skewed] + skew
+
+    # Missing trades on either side
+    broker_keep = rng.random(rows) >= missing_rate
+    exchange_keep = rng.random(rows) >= missing_rate
+    broker = broker[broker_keep]
+    exchange = exchange[exchange_keep]
+
+    # Duplicated exchange fills
+    if duplicate_rate > 0:
+        dups = exchange[rng.random(len(exchange)) < duplicate_rate]
+        exchange = pd.concat([exchange, dups])
+
+    return broker.reset_index(drop=True), exchange.reset_index(drop=True)
+
+
+def write_trade_pair(broker_df, exchange_df, out_dir, fmt='csv'):
+    """
+    Write a generated pair as broker/exchange files.
+
+    Args:
+        broker_df: Broker trades
+        exchange_df: Exchange trades
+        out_dir: Output directory
+        fmt: 'csv' or 'parquet'
+
+    Returns:
+        Tuple of (broker_path, exchange_path)
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, df in (('broker', broker_df), ('exchange', exchange_df)):
+        path = out_dir / f'{name}.{fmt}'
+        if fmt == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        paths.append(path)
+    return tuple(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic broker/exchange trade files')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--mismatch-rate', type=float, default=0.02)
+    parser.add_argument('--missing-rate', type=float, default=0.01)
+    parser.add_argument('--duplicate-rate', type=float, default=0.0)
+    parser.add_argument('--time-skew-rate', type=float, default=0.01)
+    parser.add_argument('--max-skew-seconds', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--out-dir', default='synthetic_trades')
+    args = parser.parse_args()
+
+    broker_df, exchange_df = generate_trade_pair(
+        args.rows,
+        mismatch_rate=args.mismatch_rate,
+        missing_rate=args.missing_rate,
+        duplicate_rate=args.duplicate_rate,
+        time_skew_rate=args.time_skew_rate,
+        max_skew_seconds=args.max_skew_seconds,
+        seed=args.seed
+    )
+    broker_path, exchange_path = write_trade_pair(broker_df, exchange_df, args.out_dir, args.format)
+    print(f"✅ Wrote {len(broker_df)} broker trades to {broker_path}")
+    print(f"✅ Wrote {len(exchange_df)} exchange trades to {exchange_path}")
+
+
+if __name__ == '__main__':
+    main()
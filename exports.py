@@ -0,0 +1,299 @@
+"""
+TradeRecon AI - Report and data exports
+Fast PDF rendering of plain-text compliance reports: lines are drawn straight
+onto canvas pages (no per-line Paragraph objects or in-memory story), rendering
+can run on a background thread, and output is cached by a hash of the report.
+DataFrames are exported with a streaming (write-only) xlsx writer that splits
+sheets at Excel's row limit, or as CSV.gz / Parquet for bulk trade tables.
+"""
+
+import hashlib
+import json
+import textwrap
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+import pandas as pd
+
+# Page layout (points) - US letter, as the previous Paragraph-based export
+PAGE_MARGIN_LEFT = 50
+PAGE_MARGIN_RIGHT = 50
+PAGE_MARGIN_TOP = 50
+PAGE_MARGIN_BOTTOM = 40
+FONT_NAME = 'Courier'
+FONT_SIZE = 9
+LEADING = 11
+
+# Courier glyphs are 0.6 em wide
+CHAR_WIDTH = 0.6 * FONT_SIZE
+
+# Rendered PDFs kept by the default exporter
+PDF_CACHE_ENTRIES = 8
+
+# Rows per worksheet in Excel, including the header row
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_SHEET_NAME_LENGTH = 31
+
+# Rows converted per step by the streaming xlsx writer
+EXCEL_CHUNK_ROWS = 50_000
+
+# Bulk formats for large trade tables: file suffix and MIME type
+BULK_FORMATS = {
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _iter_lines(text: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Lines of a string, or of a stream of text chunks (e.g. iter_compliance_report())"""
+    if isinstance(text, str):
+        yield from text.split('\n')
+        return
+    pending = ''
+    for chunk in text:
+        pending += chunk
+        *lines, pending = pending.split('\n')
+        yield from lines
+    yield pending
+
+
+def _wrap(line: str, width: int) -> Iterator[str]:
+    """Fit one line to the page width (short lines pass through untouched)"""
+    if len(line) <= width:
+        yield line
+        return
+    indent = line[:len(line) - len(line.lstrip())]
+    yield from textwrap.wrap(line, width, subsequent_indent=indent, break_on_hyphens=False) or ['']
+
+
+def text_to_pdf(text: Union[str, Iterable[str]], out: Any = None) -> Optional[bytes]:
+    """
+    Render plain text to a paginated PDF.
+
+    Lines are wrapped to the page width and drawn with one text object per
+    page, so work per line is a few string operations and memory grows with
+    the finished page streams only. Passing chunks (iter_compliance_report())
+    avoids holding the report text itself.
+
+    Args:
+        text: Report text, or an iterable of text chunks
+        out: Optional path or binary file object to write to
+
+    Returns:
+        PDF bytes, or None when written to out
+    """
+    from reportlab import rl_config
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    page_width, page_height = letter
+    width = int((page_width - PAGE_MARGIN_LEFT - PAGE_MARGIN_RIGHT) / CHAR_WIDTH)
+    lines_per_page = int((page_height - PAGE_MARGIN_TOP - PAGE_MARGIN_BOTTOM) / LEADING)
+
+    target = BytesIO() if out is None else out
+    pdf = canvas.Canvas(target, pagesize=letter, pageCompression=1, invariant=1)
+    pdf.setTitle('TradeRecon Compliance Report')
+
+    page_no = 0
+    page = None
+    used = lines_per_page
+
+    def _finish_page():
+        pdf.drawText(page)
+        pdf.setFont('Helvetica', 7)
+        pdf.drawRightString(page_width - PAGE_MARGIN_RIGHT, PAGE_MARGIN_BOTTOM / 2, f"Page {page_no}")
+        pdf.showPage()
+
+    for line in _iter_lines(text):
+        # Standard PDF fonts cover Latin-1 only; anything else (emoji) becomes '?'
+        line = line.rstrip().encode('latin-1', 'replace').decode('latin-1')
+        for segment in _wrap(line, width):
+            if used == lines_per_page:
+                if page is not None:
+                    _finish_page()
+                page_no += 1
+                page = pdf.beginText(PAGE_MARGIN_LEFT, page_height - PAGE_MARGIN_TOP - FONT_SIZE)
+                page.setFont(FONT_NAME, FONT_SIZE, LEADING)
+                used = 0
+            page.textLine(segment)
+            used += 1
+
+    if page is not None:
+        _finish_page()
+    # Binary compressed streams; ASCII85 armouring is pure Python and slow
+    use_a85, rl_config.useA85 = rl_config.useA85, 0
+    try:
+        pdf.save()
+    finally:
+        rl_config.useA85 = use_a85
+
+    if out is None:
+        return target.getvalue()
+    return None
+
+
+def content_key(text: str) -> str:
+    """Cache key for a report: SHA-256 of its content"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class PDFExporter:
+    """
+    Renders reports to PDF on a background thread and keeps the most recent
+    max_entries results, keyed by a hash of the report content
+
+    Submitting a report that is already rendered or in progress returns the
+    existing result, so Streamlit reruns never render the same report twice.
+    """
+
+    def __init__(self, max_entries: int = PDF_CACHE_ENTRIES, max_workers: int = 1):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='traderecon-pdf')
+
+    def submit(self, text: str) -> Future:
+        """Start rendering in the background (no-op if cached or in progress)"""
+        key = content_key(text)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                future = Future()
+                future.set_result(self._cache[key])
+                return future
+            if key not in self._pending:
+                self._pending[key] = self._pool.submit(self._render, key, text)
+            return self._pending[key]
+
+    def _render(self, key: str, text: str) -> bytes:
+        try:
+            pdf = text_to_pdf(text)
+            with self._lock:
+                self._cache[key] = pdf
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            return pdf
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def render(self, text: str) -> bytes:
+        """PDF bytes for a report, waiting for (or starting) its rendering"""
+        return self.submit(text).result()
+
+    def get(self, text: str) -> Optional[bytes]:
+        """PDF bytes if the report is already rendered, else None"""
+        key = content_key(text)
+        with self._lock:
+            pdf = self._cache.get(key)
+            if pdf is not None:
+                self._cache.move_to_end(key)
+            return pdf
+
+
+# Shared exporter; module state survives Streamlit reruns
+pdf_exporter = PDFExporter()
+
+
+def _sheet_names(name: str, parts: int) -> list:
+    """Worksheet names for a table split into parts sheets, within Excel's 31 characters"""
+    if parts == 1:
+        return [name[:EXCEL_SHEET_NAME_LENGTH]]
+    names = []
+    for part in range(1, parts + 1):
+        suffix = f" ({part})"
+        names.append(name[:EXCEL_SHEET_NAME_LENGTH - len(suffix)].rstrip() + suffix)
+    return names
+
+
+def _excel_rows(df: pd.DataFrame, start: int, stop: int, chunk_rows: int) -> Iterator[tuple]:
+    """Rows start..stop of df as tuples of Excel-writable values, chunk by chunk"""
+    for chunk_start in range(start, stop, chunk_rows):
+        chunk = df.iloc[chunk_start:min(chunk_start + chunk_rows, stop)]
+        for column, dtype in chunk.dtypes.items():
+            # openpyxl rejects timezone-aware datetimes
+            if isinstance(dtype, pd.DatetimeTZDtype):
+                chunk = chunk.assign(**{column: chunk[column].dt.tz_localize(None)})
+        objects = [column for column, dtype in chunk.dtypes.items() if dtype == object]
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for column in objects:
+            # Nested values (e.g. summary dicts) are written as JSON text
+            chunk[column] = chunk[column].map(
+                lambda value: json.dumps(value, default=str) if isinstance(value, (dict, list, tuple)) else value
+            )
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def write_excel(dataframes: Dict[str, pd.DataFrame], out: Any = None, max_rows: int = EXCEL_MAX_ROWS,
+                chunk_rows: int = EXCEL_CHUNK_ROWS) -> Optional[bytes]:
+    """
+    Write DataFrames to an xlsx workbook, one or more sheets each.
+
+    Uses openpyxl's write-only mode: rows are streamed to the sheet one at a
+    time instead of building every cell object in memory. A table longer than
+    max_rows (header included) continues on "Name (2)", "Name (3)", ...
+
+    Args:
+        dataframes: Sheet name -> DataFrame
+        out: Optional path or binary file object to write to (writing to a
+            path keeps memory flat; otherwise the finished file is returned)
+        max_rows: Rows per sheet including the header
+        chunk_rows: Rows converted per step
+
+    Returns:
+        xlsx bytes, or None when written to out
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    rows_per_sheet = max_rows - 1
+    for name, df in dataframes.items():
+        if not isinstance(df, pd.DataFrame):
+            df = pd.DataFrame(df)
+        parts = max(1, -(-len(df) // rows_per_sheet))
+        for part, sheet_name in enumerate(_sheet_names(str(name), parts)):
+            sheet = workbook.create_sheet(title=sheet_name)
+            sheet.append([str(column) for column in df.columns])
+            start = part * rows_per_sheet
+            for row in _excel_rows(df, start, min(start + rows_per_sheet, len(df)), chunk_rows):
+                sheet.append(row)
+
+    target = BytesIO() if out is None else out
+    workbook.save(target)
+    if out is None:
+        return target.getvalue()
+    return None
+
+
+def write_bulk(df: pd.DataFrame, fmt: str = 'csv.gz', out: Any = None) -> Optional[bytes]:
+    """
+    Write a large table as gzip-compressed CSV or Parquet.
+
+    Args:
+        df: Table to export
+        fmt: 'csv.gz' or 'parquet' (needs pyarrow)
+        out: Optional path or binary file object to write to
+
+    Returns:
+        File bytes, or None when written to out
+    """
+    if fmt not in BULK_FORMATS:
+        raise ValueError(f"fmt must be one of {tuple(BULK_FORMATS)}, got '{fmt}'")
+
+    target = BytesIO() if out is None else out
+    if fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet export requires 'pyarrow'. Install with: pip install pyarrow")
+        df.to_parquet(target, index=False)
+    else:
+        df.to_csv(target, index=False, compression={'method': 'gzip', 'mtime': 0})
+    if out is None:
+        return target.getvalue()
+    return None
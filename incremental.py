@@ -0,0 +1,260 @@
+"""
+TradeRecon AI - Incremental delta reconciliation
+Persists per-trade fingerprints between runs so reruns only re-examine the delta
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from matching import FUZZY_TIME_TOLERANCE, REQUIRED_COLUMNS, reconcile_trades, validate_columns
+from rules import resolve_rules
+
+DEFAULT_STATE_PATH = Path(__file__).parent / '.traderecon_state.sqlite'
+
+# Per-trade status persisted between runs
+STATUS_MATCHED = 'matched'
+STATUS_EXCEPTION = 'exception'
+STATUS_DUPLICATE = 'duplicate'
+
+# Fingerprint stored for a side that does not carry the trade
+ABSENT_FINGERPRINT = 0
+
+
+class ReconciliationStateStore:
+    """
+    Local SQLite store of per-trade fingerprints and match status
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        """Open (and create if needed) the state database"""
+        self.path = str(path)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS trade_state (
+                    trade_id TEXT PRIMARY KEY,
+                    broker_fp INTEGER NOT NULL,
+                    exchange_fp INTEGER NOT NULL,
+                    status TEXT NOT NULL
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS run_settings (
+                    name TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )"""
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def sync_settings(self, fingerprint: str) -> bool:
+        """
+        Tie the stored state to the settings it was reconciled under.
+
+        Statuses are only valid for the rules that produced them, so when the
+        fingerprint differs from the stored one every trade state is discarded.
+
+        Args:
+            fingerprint: settings_fingerprint() of the current run
+
+        Returns:
+            True if existing state was discarded
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM run_settings WHERE name = 'fingerprint'").fetchone()
+            if row is not None and row[0] == fingerprint:
+                return False
+            discarded = conn.execute("DELETE FROM trade_state").rowcount > 0
+            conn.execute(
+                """INSERT INTO run_settings (name, value) VALUES ('fingerprint', ?)
+                   ON CONFLICT(name) DO UPDATE SET value = excluded.value""",
+                (fingerprint,)
+            )
+        return discarded
+
+    def load(self) -> pd.DataFrame:
+        """Load the state of the previous run, indexed by trade_id"""
+        with self._connect() as conn:
+            state = pd.read_sql_query(
+                "SELECT trade_id, broker_fp, exchange_fp, status FROM trade_state", conn
+            )
+        return state.set_index('trade_id')
+
+    def apply_delta(self, upserts: pd.DataFrame, removed_ids):
+        """
+        Write changed trades and drop trades that no longer appear in either input.
+
+        Args:
+            upserts: DataFrame indexed by trade_id with broker_fp, exchange_fp and status
+            removed_ids: Iterable of trade_ids to delete
+        """
+        rows = zip(
+            upserts.index.astype(str),
+            upserts['broker_fp'].astype(np.int64).tolist(),
+            upserts['exchange_fp'].astype(np.int64).tolist(),
+            upserts['status'].astype(str)
+        )
+        with self._connect() as conn:
+            conn.executemany(
+                """INSERT INTO trade_state (trade_id, broker_fp, exchange_fp, status)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(trade_id) DO UPDATE SET
+                       broker_fp = excluded.broker_fp,
+                       exchange_fp = excluded.exchange_fp,
+                       status = excluded.status""",
+                rows
+            )
+            conn.executemany(
+                "DELETE FROM trade_state WHERE trade_id = ?",
+                ((str(trade_id),) for trade_id in removed_ids)
+            )
+
+    def clear(self):
+        """Forget all persisted state (next run reconciles from scratch)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM trade_state")
+            conn.execute("DELETE FROM run_settings")
+
+
+def settings_fingerprint(rules, fuzzy_match, fuzzy_tolerance):
+    """
+    Fingerprint of everything besides the trades that decides a trade's status.
+
+    Args:
+        rules: Compiled ToleranceRules
+        fuzzy_match: Whether orphan trades are fuzzy-paired
+        fuzzy_tolerance: trade_time window of the fuzzy pass
+
+    Returns:
+        SHA-256 hex digest
+    """
+    settings = {
+        'rules': rules.config,
+        'fuzzy_match': bool(fuzzy_match),
+        'fuzzy_tolerance': pd.Timedelta(fuzzy_tolerance).value if fuzzy_match else None
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def trade_fingerprints(trades_df):
+    """
+    Fingerprint every trade_id on one side.
+
+    Rows are hashed column-wise over the required columns; trades with several
+    rows under the same trade_id combine their row hashes.
+
+    Args:
+        trades_df: Broker or exchange trades
+
+    Returns:
+        Tuple of (int64 Series of fingerprints indexed by trade_id as str,
+        Index of trade_ids that occur more than once)
+    """
+    trades = trades_df[REQUIRED_COLUMNS].assign(
+        trade_id=trades_df['trade_id'].astype(str),
+        trade_time=pd.to_datetime(trades_df['trade_time'])
+    )
+    row_hashes = pd.util.hash_pandas_object(trades, index=False).to_numpy()
+
+    ids = trades['trade_id'].to_numpy()
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]) if len(ids) else np.array([], dtype=int)
+
+    # uint64 addition wraps, which is exactly what we want for combining hashes
+    combined = np.add.reduceat(row_hashes[order], starts) if len(ids) else np.array([], dtype=np.uint64)
+    fingerprints = pd.Series(combined.view(np.int64), index=pd.Index(sorted_ids[starts], name='trade_id'))
+
+    counts = np.diff(np.r_[starts, len(ids)])
+    duplicates = fingerprints.index[counts > 1]
+    return fingerprints, duplicates
+
+
+def reconcile_trades_incremental(broker_df, exchange_df, state_path=DEFAULT_STATE_PATH, fuzzy_match=False,
+                                 fuzzy_tolerance=FUZZY_TIME_TOLERANCE, rules=None):
+    """
+    Stateful reconcile_trades() that only re-examines the delta since the last run.
+
+    A trade_id is carried forward as matched when both of its fingerprints are
+    unchanged and it matched last time. New, changed, previously unmatched and
+    duplicated trade_ids are reconciled again; the state store is then updated.
+    State saved under different rules or fuzzy-match settings is discarded and
+    the run reconciles from scratch.
+
+    Args:
+        broker_df: DataFrame with broker trades
+        exchange_df: DataFrame with exchange trades
+        state_path: SQLite file holding the state of the previous run
+        fuzzy_match: Pair orphan trades whose trade_id differs (see reconcile_trades())
+        fuzzy_tolerance: Maximum trade_time distance for the fuzzy pass
+        rules: Tolerance/severity rules - a ToleranceRules, config dict or JSON path
+
+    Returns:
+        Dictionary containing reconciliation results, same structure as
+        reconcile_trades(), plus 'delta_stats'
+    """
+    validate_columns(broker_df, exchange_df)
+    rules = resolve_rules(rules)
+    store = ReconciliationStateStore(state_path)
+    state_reset = store.sync_settings(settings_fingerprint(rules, fuzzy_match, fuzzy_tolerance))
+
+    broker_fp, broker_dups = trade_fingerprints(broker_df)
+    exchange_fp, exchange_dups = trade_fingerprints(exchange_df)
+
+    # Reindex with fill_value so fingerprints never round-trip through float64
+    all_ids = broker_fp.index.union(exchange_fp.index)
+    current = pd.DataFrame({
+        'broker_fp': broker_fp.reindex(all_ids, fill_value=ABSENT_FINGERPRINT),
+        'exchange_fp': exchange_fp.reindex(all_ids, fill_value=ABSENT_FINGERPRINT)
+    })
+
+    previous = store.load()
+    aligned = previous.reindex(current.index, fill_value=ABSENT_FINGERPRINT)
+
+    unchanged = (
+        (aligned['status'] == STATUS_MATCHED)
+        & (aligned['broker_fp'] == current['broker_fp'])
+        & (aligned['exchange_fp'] == current['exchange_fp'])
+    )
+    delta_ids = current.index[~unchanged.to_numpy()]
+    carried = int(unchanged.sum())
+
+    # Reconcile only the delta
+    broker_ids = broker_df['trade_id'].astype(str)
+    exchange_ids = exchange_df['trade_id'].astype(str)
+    results = reconcile_trades(
+        broker_df[broker_ids.isin(delta_ids).to_numpy()],
+        exchange_df[exchange_ids.isin(delta_ids).to_numpy()],
+        fuzzy_match=fuzzy_match,
+        fuzzy_tolerance=fuzzy_tolerance,
+        rules=rules
+    )
+
+    results['total_trades'] += carried
+    results['matched_count'] += carried
+
+    # New status for every re-examined trade_id
+    delta_state = current.loc[delta_ids].copy()
+    delta_state['status'] = STATUS_MATCHED
+    # A fuzzy-paired exchange trade shares its broker partner's exception
+    exceptions = results['exceptions']
+    exception_ids = pd.concat([exceptions['trade_id'], exceptions['trade_id_exchange'].dropna()]).astype(str)
+    delta_state.loc[delta_state.index.isin(exception_ids), 'status'] = STATUS_EXCEPTION
+    delta_state.loc[delta_state.index.isin(broker_dups.union(exchange_dups)), 'status'] = STATUS_DUPLICATE
+
+    removed_ids = previous.index.difference(current.index)
+    store.apply_delta(delta_state, removed_ids)
+
+    results['delta_stats'] = {
+        'carried_forward': carried,
+        'reexamined': len(delta_ids),
+        'removed': len(removed_ids),
+        'state_reset': state_reset
+    }
+
+    return results
@@ -0,0 +1,146 @@
+"""
+TradeRecon AI - Pipeline instrumentation
+Per-stage wall time, CPU time, row counts and peak memory for the reconciliation pipeline
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Process peak RSS so far in MB.
+
+    Uses resource.getrusage where available (ru_maxrss is KiB on Linux, bytes
+    on macOS); elsewhere falls back to psutil if it is installed.
+
+    Returns:
+        Peak RSS in MB, or None when the platform offers no way to read it
+    """
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    memory = psutil.Process().memory_info()
+    # peak_wset is the Windows peak working set; other platforms only report current RSS
+    return getattr(memory, 'peak_wset', memory.rss) / (1024 * 1024)
+
+
+def _round_mb(value):
+    return None if value is None else round(value, 1)
+
+
+class PipelineProfiler:
+    """
+    Records one entry per pipeline stage
+
+    Each stage records wall time, process CPU time, rows processed and the
+    process peak RSS after the stage. With trace_memory=True it also records the
+    peak Python heap allocation during the stage via tracemalloc (slower; stages
+    should then not be nested).
+    """
+
+    def __init__(self, name: str = 'reconciliation', trace_memory: bool = False):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        """
+        Time a block as a named stage.
+
+        Yields a dict; set record['rows'] inside the block when the row count is
+        only known afterwards.
+        """
+        record = {'stage': name, 'rows': rows}
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 6)
+            record['cpu_seconds'] = round(time.process_time() - cpu_start, 6)
+            record['start_offset_seconds'] = round(wall_start - self._origin, 6)
+            record['peak_rss_mb'] = _round_mb(peak_rss_mb())
+            if self.trace_memory and tracemalloc.is_tracing():
+                record['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            record['thread_id'] = threading.get_ident()
+            with self._lock:
+                self.stages.append(record)
+
+    def stop(self):
+        """Stop tracemalloc if this profiler started it"""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def as_dict(self):
+        """Profile summary suitable for attaching to a results dict"""
+        with self._lock:
+            stages = [dict(record) for record in self.stages]
+        return {
+            'pipeline': self.name,
+            'total_wall_seconds': round(sum(s['wall_seconds'] for s in stages), 6),
+            'total_cpu_seconds': round(sum(s['cpu_seconds'] for s in stages), 6),
+            'stages': stages
+        }
+
+    def format_table(self) -> str:
+        """Plain-text stage table for console output"""
+        lines = [f"{'Stage':<24}{'Wall (s)':>10}{'CPU (s)':>10}{'Rows':>12}{'Peak RSS (MB)':>15}"]
+        for s in self.as_dict()['stages']:
+            rows = '' if s['rows'] is None else f"{s['rows']:,}"
+            rss = 'n/a' if s['peak_rss_mb'] is None else f"{s['peak_rss_mb']:.1f}"
+            lines.append(f"{s['stage']:<24}{s['wall_seconds']:>10.3f}{s['cpu_seconds']:>10.3f}{rows:>12}{rss:>15}")
+        return '\n'.join(lines)
+
+    def dump_trace(self, path):
+        """
+        Write the stages as a Chrome trace-event file (chrome://tracing, Perfetto).
+
+        Args:
+            path: Output JSON path
+
+        Returns:
+            The path written
+        """
+        pid = os.getpid()
+        events = []
+        for s in self.as_dict()['stages']:
+            args = {key: s[key] for key in ('rows', 'cpu_seconds', 'peak_rss_mb', 'peak_alloc_mb') if s.get(key) is not None}
+            events.append({
+                'name': s['stage'],
+                'cat': self.name,
+                'ph': 'X',
+                'ts': int(s['start_offset_seconds'] * 1e6),
+                'dur': int(s['wall_seconds'] * 1e6),
+                'pid': pid,
+                'tid': s['thread_id'],
+                'args': args
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, indent=2)
+        return path
@@ -0,0 +1,173 @@
+"""
+TradeRecon AI - Typed columnar ingestion
+Loads trade files from CSV, Parquet or Arrow with an explicit schema
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from matching import REQUIRED_COLUMNS
+
+# Explicit dtypes for the required columns (trade_time is parsed separately)
+TRADE_DTYPES = {
+    'trade_id': 'object',
+    'symbol': 'category',
+    'side': 'category',
+    'quantity': 'Int64',  # nullable: a blank quantity is a mismatch, not a load error
+    'price': 'float64',
+    'currency': 'category',
+    'account_id': 'category',
+}
+DATETIME_COLUMNS = ['trade_time']
+
+CSV_SUFFIXES = ('.csv', '.txt')
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc')
+SUPPORTED_SUFFIXES = CSV_SUFFIXES + PARQUET_SUFFIXES + ARROW_SUFFIXES
+
+
+def _source_name(source):
+    """File name of a path or a file-like object (e.g. a Streamlit upload)"""
+    if isinstance(source, (str, os.PathLike)):
+        return str(source)
+    return getattr(source, 'name', '') or ''
+
+
+def _source_format(source, fmt=None):
+    """Resolve 'csv', 'parquet' or 'arrow' from an explicit format or the file suffix"""
+    if fmt:
+        return fmt
+    suffix = Path(_source_name(source)).suffix.lower()
+    if suffix in PARQUET_SUFFIXES:
+        return 'parquet'
+    if suffix in ARROW_SUFFIXES:
+        return 'arrow'
+    return 'csv'
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet/Arrow input requires 'pyarrow'. Install with: pip install pyarrow")
+
+
+def _check_columns(columns, label):
+    for col in REQUIRED_COLUMNS:
+        if col not in columns:
+            raise ValueError(f"Missing column '{col}' in {label}")
+
+
+def apply_trade_schema(df):
+    """
+    Coerce a trades DataFrame to the declared schema.
+
+    Columns that already have the target dtype are left untouched, so frames
+    loaded from Parquet/Arrow pass through without copies.
+
+    Args:
+        df: DataFrame with at least the required columns
+
+    Returns:
+        DataFrame with TRADE_DTYPES applied and trade_time as datetime64
+    """
+    casts = {
+        col: dtype for col, dtype in TRADE_DTYPES.items()
+        if col in df.columns and str(df[col].dtype) != dtype
+    }
+    if casts:
+        df = df.astype(casts)
+    for col in DATETIME_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df = df.assign(**{col: pd.to_datetime(df[col])})
+    return df
+
+
+def _parquet_cache_path(path, cache_dir, columns):
+    """Cache file keyed by source path, size, mtime and projected columns"""
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{','.join(columns)}"
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    return Path(cache_dir) / f"{Path(path).stem}-{digest}.parquet"
+
+
+def load_trades(source, columns=None, fmt=None, cache_dir=None, label='trade file'):
+    """
+    Load a trades file with explicit dtypes.
+
+    Args:
+        source: Path or file-like object (CSV, Parquet or Arrow/Feather)
+        columns: Columns to load (defaults to the required columns); extra columns
+            are projected at read time
+        fmt: Force 'csv', 'parquet' or 'arrow' instead of detecting by suffix
+        cache_dir: For CSV paths, keep a Parquet copy here so re-ingesting the
+            same feed skips CSV parsing
+        label: Name used in error messages (e.g. 'broker trades')
+
+    Returns:
+        Typed DataFrame
+    """
+    columns = list(columns or REQUIRED_COLUMNS)
+    _check_columns(columns, 'requested columns')
+    fmt = _source_format(source, fmt)
+
+    if fmt == 'parquet':
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        _check_columns(pq.read_schema(source).names, label)
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return apply_trade_schema(pd.read_parquet(source, columns=columns))
+
+    if fmt == 'arrow':
+        _require_pyarrow()
+        df = pd.read_feather(source)
+        _check_columns(df.columns, label)
+        return apply_trade_schema(df[columns])
+
+    cache_path = None
+    if cache_dir is not None and isinstance(source, (str, os.PathLike)):
+        _require_pyarrow()
+        cache_path = _parquet_cache_path(source, cache_dir, columns)
+        if cache_path.exists():
+            return apply_trade_schema(pd.read_parquet(cache_path, columns=columns))
+
+    header = pd.read_csv(source, nrows=0).columns
+    _check_columns(header, label)
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    df = pd.read_csv(
+        source,
+        usecols=columns,
+        dtype={col: dtype for col, dtype in TRADE_DTYPES.items() if col in columns},
+        parse_dates=[col for col in DATETIME_COLUMNS if col in columns]
+    )
+    df = apply_trade_schema(df)
+
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(cache_path, index=False)
+
+    return df
+
+
+def convert_to_parquet(source, target, columns=None):
+    """
+    Convert a CSV trades file to a typed Parquet file.
+
+    Args:
+        source: CSV path or file-like object
+        target: Parquet output path
+        columns: Columns to keep (defaults to the required columns)
+
+    Returns:
+        Path to the written file
+    """
+    _require_pyarrow()
+    df = load_trades(source, columns=columns, fmt='csv')
+    df.to_parquet(target, index=False)
+    return target
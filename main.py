@@ -4,13 +4,22 @@ UPGRADED: Now powered by a single unified Intelligence Engine
 """
 
 import os
+import queue
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
+import numpy as np
 import pandas as pd
 
 # Import the new Intelligence Engine
-from agents import TradeReconIntelligenceEngine
+from agents import TradeReconIntelligenceEngine, AnalysisCache
+from agents.analysis_cache import DEFAULT_CACHE_PATH
+from agents.clustering import cluster_exceptions, fan_out_analysis
+from agents.triage import triage_exceptions, triage_analysis, triage_summary, triaged_indices
+from agents.scheduler import priority_order, notional_at_risk, deferred_analysis, deadline_from_budget
+from instrumentation import PipelineProfiler
+from spool import ExceptionSpool
 
 # Load environment variables
 def load_env():
@@ -32,104 +41,393 @@ class TradeReconOrchestrator:
     Orchestrator that manages the Intelligence Engine
     """
     
-    def __init__(self, api_key: str = None):
-        """Initialize with the unified Intelligence Engine"""
+    def __init__(self, api_key: str = None, cache_path: str = DEFAULT_CACHE_PATH, prompt_mode: str = 'verbose',
+                 backend: Any = None):
+        """
+        Initialize with the unified Intelligence Engine
+        
+        cache_path is the on-disk analysis cache for recurring breaks; None disables it.
+        prompt_mode 'compact' sends a shorter encoding of the same analysis request.
+        backend replaces the Groq client (see agents/backends.py), e.g. for offline load tests.
+        """
         try:
-            self.engine = TradeReconIntelligenceEngine(api_key=api_key or GROQ_API_KEY)
+            cache = AnalysisCache(cache_path) if cache_path else None
+            self.engine = TradeReconIntelligenceEngine(api_key=api_key or GROQ_API_KEY, cache=cache,
+                                                       prompt_mode=prompt_mode, backend=backend)
             self.agents_initialized = True
             print("✅ TradeRecon Orchestrator ready")
         except Exception as e:
             print(f"❌ Failed to initialize Intelligence Engine: {e}")
             self.agents_initialized = False
     
-    def run_full_reconciliation(
+    @staticmethod
+    def _enrich_exception(exception_dict: Dict[str, Any], ai_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge original exception data with the engine's analysis"""
+        trade_id = exception_dict.get('trade_id', 'Unknown')
+        return {
+            **exception_dict,
+            'root_cause': ai_analysis.get('root_cause', {}),
+            'severity_classification': {'severity': ai_analysis.get('severity', 'Medium')},
+            'fix_suggestion': ai_analysis.get('fix_suggestion', {}),
+            'risk_assessment': ai_analysis.get('risk_assessment', {}),
+            'analysis': ai_analysis.get('full_explanation') or f"Trade {trade_id} requires investigation due to {exception_dict.get('exception_type', 'data mismatch')}. The reconciliation team should review source documents to identify root cause and implement corrections.",
+            'compliance_summary': ai_analysis.get('compliance_note') or f"Trade {trade_id} flagged for review and documented in exception tracking system for audit compliance.",
+            'severity': ai_analysis.get('severity', 'Medium')  # needed for report
+        }
+    
+    def iter_full_reconciliation(
         self,
         broker_df: pd.DataFrame,
-        exchange_df: pd.DataFrame
-    ) -> Dict[str, Any]:
+        exchange_df: pd.DataFrame,
+        fuzzy_match: bool = False,
+        rules: Any = None,
+        trace_path: str = None,
+        trace_memory: bool = False,
+        max_concurrency: int = None,
+        batch_analysis: bool = True,
+        cluster_analysis: bool = True,
+        triage: bool = True,
+        spool_path: str = None,
+        prioritize: bool = True,
+        time_budget_seconds: float = None,
+        report_path: str = None,
+        report_detail_limit: int = None
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Run complete reconciliation workflow with Intelligence Engine
+        Run the reconciliation workflow as a stream of events
+        
+        Yields, in order:
+            {'event': 'matching', ...}   matching counts and the structured exceptions
+            {'event': 'exception', ...}  one per enriched exception, as soon as it is
+                                         analyzed (index is its position in 'exceptions')
+            {'event': 'report', ...}     summary, compliance report, circuit breaker
+                                         metrics and profile
+        An {'event': 'error'} is yielded instead when the engine is unavailable.
+        
+        With spool_path, enriched exceptions are written to a JSON Lines file as
+        they complete and the report is built by re-reading it, so the full
+        enriched list is never held in memory (the report then lists exceptions
+        in completion order). With report_path, the compliance report is streamed
+        to that file and 'final_compliance_report' is None. Options are as for
+        run_full_reconciliation().
+        
+        Closing the generator early (or dropping it) stops the analysis: requests
+        already in flight finish, and nothing further is sent to the model.
         """
         if not self.agents_initialized:
-            return {
-                'error': 'Intelligence Engine not initialized. Check GROQ_API_KEY.',
-                'summary': {},
-                'enriched_exceptions': []
-            }
+            yield {'event': 'error', 'error': 'Intelligence Engine not initialized. Check GROQ_API_KEY.'}
+            return
         
         print("\n" + "="*60)
         print("🚀 TradeRecon Intelligence Engine - STARTING")
         print("="*60 + "\n")
         
+        deadline = deadline_from_budget(time_budget_seconds)
+        profiler = PipelineProfiler('full_reconciliation', trace_memory=trace_memory)
+        
         # Step 1: Run local reconciliation (matching logic)
-        from matching import reconcile_trades
-        results = reconcile_trades(broker_df, exchange_df)
+        from matching import reconcile_trades, render_exception
+        results = reconcile_trades(broker_df, exchange_df, fuzzy_match=fuzzy_match, rules=rules,
+                                   profiler=profiler)
         
         print(f"✅ Trade matching complete:")
         print(f"   Total: {results['total_trades']}")
         print(f"   Matched: {results['matched_count']}")
         print(f"   Exceptions: {results['mismatch_count'] + results['missing_count']}")
         
-        # Step 2: Analyze each exception with the Intelligence Engine (1 call per exception)
         exceptions_df = results['exceptions']
-        enriched_exceptions = []
+        yield {
+            'event': 'matching',
+            'total_trades': results['total_trades'],
+            'matched_count': results['matched_count'],
+            'mismatch_count': results['mismatch_count'],
+            'missing_count': results['missing_count'],
+            'exceptions': exceptions_df
+        }
+        
+        # Step 2: Analyze exceptions with the Intelligence Engine
+        # Render text fields only now, for the prompt and the report
+        exception_dicts = [render_exception(row) for row in exceptions_df.to_dict('records')]
+        
+        # Most urgent first: preliminary severity, then notional at risk
+        notional = notional_at_risk(exceptions_df)
+        order = priority_order(exceptions_df) if prioritize else np.arange(len(exception_dicts))
+        priority_rank = np.empty(len(order), dtype=np.int64)
+        priority_rank[order] = np.arange(1, len(order) + 1)
+        
+        member_analyses = [None] * len(exception_dicts)
+        member_clusters = [(None, 1)] * len(exception_dicts)
+        
+        # Deterministic triage: recognized patterns never reach the engine
+        with profiler.stage('triage', rows=len(exception_dicts)):
+            if triage:
+                patterns = triage_exceptions(exceptions_df, rules)
+            else:
+                patterns = np.full(len(exception_dicts), '', dtype=object)
+            for idx in triaged_indices(patterns):
+                member_analyses[idx] = triage_analysis(exception_dicts[idx], patterns[idx])
+        triage_stats = triage_summary(patterns)
+        if triage_stats['triaged_locally']:
+            print(f"🧮 {triage_stats['triaged_locally']} exceptions classified by triage rules "
+                  f"({triage_stats['triaged_share']:.0%})")
+        model_indices = [idx for idx in order.tolist() if member_analyses[idx] is None]
+        
+        # Group near-identical exceptions; only representatives reach the engine
+        # (clusters keep priority order, led by their most urgent member)
+        with profiler.stage('clustering', rows=len(model_indices)) as record:
+            if cluster_analysis:
+                clusters = [[model_indices[i] for i in cluster]
+                            for cluster in cluster_exceptions([exception_dicts[idx] for idx in model_indices])]
+            else:
+                clusters = [[idx] for idx in model_indices]
+            representatives = [exception_dicts[cluster[0]] for cluster in clusters]
+            record['clusters'] = len(clusters)
+        for cluster_id, cluster in enumerate(clusters, 1):
+            for idx in cluster:
+                member_clusters[idx] = (cluster_id, len(cluster))
+        if len(clusters) < len(model_indices):
+            print(f"🧩 {len(model_indices)} exceptions grouped into {len(clusters)} clusters\n")
+        if representatives:
+            print(f"\n🤖 Analyzing {len(representatives)} exceptions with Intelligence Engine...\n")
+        
+        spool = ExceptionSpool(spool_path) if spool_path else None
+        enriched_exceptions = spool if spool is not None else [None] * len(exception_dicts)
+        severity_counts = {'High': 0, 'Medium': 0, 'Low': 0}
+        completed = 0
+        deferred = 0
         
-        if len(exceptions_df) > 0:
-            print(f"\n🤖 Analyzing {len(exceptions_df)} exceptions with Intelligence Engine...\n")
+        def _enriched_event(idx, ai_analysis):
+            enriched = self._enrich_exception(exception_dicts[idx], ai_analysis)
+            enriched['cluster_id'], enriched['cluster_size'] = member_clusters[idx]
+            enriched['triage_pattern'] = patterns[idx] or None
+            enriched['priority_rank'] = int(priority_rank[idx])
+            enriched['notional_at_risk'] = float(notional[idx])
+            enriched['deferred'] = bool(ai_analysis.get('_deferred'))
+            severity = enriched['severity_classification'].get('severity')
+            if severity in severity_counts:
+                severity_counts[severity] += 1
+            if spool is not None:
+                spool.append(enriched)
+            else:
+                enriched_exceptions[idx] = enriched
+            return {'event': 'exception', 'index': idx, 'completed': completed, 'total': len(exception_dicts),
+                    'exception': enriched}
+        
+        # Triaged exceptions are ready straight away
+        for idx in triaged_indices(patterns):
+            completed += 1
+            yield _enriched_event(idx, member_analyses[idx])
+        
+        cache_before = self.engine.cache.stats() if self.engine.cache is not None else None
+        usage_mark = len(self.engine.usage_log)
+        with profiler.stage('llm_analysis', rows=len(representatives)):
+            # The engine runs on a background thread and hands over analyses as they complete.
+            # If the consumer closes or abandons this generator, stop is set and the
+            # engine skips everything it has not started yet.
+            done = object()
+            handoff = queue.Queue()
+            outcome = {}
+            stop = threading.Event()
             
-            for idx, row in exceptions_df.iterrows():
-                exception_dict = row.to_dict()
-                trade_id = exception_dict.get('trade_id', 'Unknown')
-                
-                print(f"   [{idx+1}/{len(exceptions_df)}] Processing Trade {trade_id}...")
-                
-                # SINGLE UNIFIED CALL
-                ai_analysis = self.engine.analyze_exception(exception_dict)
-
-                # Merge original data with AI insights
-                enriched = {
-                    **exception_dict,
-                    'root_cause': ai_analysis.get('root_cause', {}),
-                    'severity_classification': {'severity': ai_analysis.get('severity', 'Medium')},
-                    'fix_suggestion': ai_analysis.get('fix_suggestion', {}),
-                    'risk_assessment': ai_analysis.get('risk_assessment', {}),
-                    'analysis': ai_analysis.get('full_explanation') or f"Trade {trade_id} requires investigation due to {exception_dict.get('exception_type', 'data mismatch')}. The reconciliation team should review source documents to identify root cause and implement corrections.",
-                    'compliance_summary': ai_analysis.get('compliance_note') or f"Trade {trade_id} flagged for review and documented in exception tracking system for audit compliance.",
-                    'severity': ai_analysis.get('severity', 'Medium')  # ADD THIS LINE - needed for report
-                }
-
-                enriched_exceptions.append(enriched)
-                print(f"   ✅ Complete\n")
+            def _on_result(rep, analysis):
+                if not stop.is_set():
+                    handoff.put((rep, analysis))
+            
+            def _analyze():
+                try:
+                    analyze = self.engine.analyze_exceptions_batch if batch_analysis else self.engine.analyze_exceptions
+                    outcome['analyses'] = analyze(representatives, max_concurrency=max_concurrency,
+                                                  on_result=_on_result, deadline=deadline, stop=stop)
+                except Exception as e:
+                    outcome['error'] = e
+                finally:
+                    handoff.put(done)
+            
+            worker = threading.Thread(target=_analyze, name='traderecon-analysis', daemon=True)
+            worker.start()
+            
+            emitted = set()
+            try:
+                while True:
+                    item = handoff.get()
+                    if item is done:
+                        break
+                    rep, ai_analysis = item
+                    if rep in emitted:
+                        continue
+                    emitted.add(rep)
+                    
+                    # Fan the analysis out to every member of the representative's cluster
+                    cluster = clusters[rep]
+                    suffix = f" (cluster of {len(cluster)})" if len(cluster) > 1 else ""
+                    print(f"   [{len(emitted)}/{len(representatives)}] ✅ Trade {representatives[rep].get('trade_id', 'Unknown')} analyzed{suffix}")
+                    for idx in cluster:
+                        completed += 1
+                        analysis = ai_analysis if idx == cluster[0] else \
+                            fan_out_analysis(ai_analysis, exception_dicts[cluster[0]], exception_dicts[idx])
+                        yield _enriched_event(idx, analysis)
+            finally:
+                # Runs on normal completion and on close()/garbage collection of the generator
+                stop.set()
+            worker.join()
+            
+            if 'error' in outcome:
+                raise outcome['error']
+            # Anything the engine returned without reporting it through on_result;
+            # None means the time budget ran out before it was analyzed
+            for rep, ai_analysis in enumerate(outcome.get('analyses', [])):
+                if rep not in emitted:
+                    emitted.add(rep)
+                    for idx in clusters[rep]:
+                        completed += 1
+                        if ai_analysis is None:
+                            deferred += 1
+                            analysis = deferred_analysis(exception_dicts[idx], time_budget_seconds)
+                        elif idx == clusters[rep][0]:
+                            analysis = ai_analysis
+                        else:
+                            analysis = fan_out_analysis(ai_analysis, exception_dicts[clusters[rep][0]], exception_dicts[idx])
+                        yield _enriched_event(idx, analysis)
+        if deferred:
+            print(f"⏰ {deferred} lower-priority exceptions deferred after the {time_budget_seconds:g}s time budget")
+        
+        if cache_before is not None:
+            cache_after = self.engine.cache.stats()
+            cache_hits = cache_after['hits'] - cache_before['hits']
+            cache_misses = cache_after['misses'] - cache_before['misses']
+            print(f"🗄️  Analysis cache: {cache_hits} hits, {cache_misses} misses")
+        else:
+            cache_hits = cache_misses = 0
+        
+        token_usage = self.engine.usage_summary(since=usage_mark)
+        if token_usage['calls']:
+            print(f"🔢 Token usage: {token_usage['total_tokens']:,} tokens over {token_usage['calls']} calls "
+                  f"({token_usage['tokens_per_exception']:,.0f} per analyzed exception)")
         
         # Step 3: Generate compliance report
         print("📄 Generating compliance report...")
-        final_report = self.engine.generate_compliance_report(results, enriched_exceptions)
-        
-        # Compile final results
-        final_results = {
-            'summary': {
-                'total_trades': results['total_trades'],
-                'matched_count': results['matched_count'],
-                'mismatch_count': results['mismatch_count'],
-                'missing_count': results['missing_count'],
-                'exceptions_processed': len(enriched_exceptions),
-                'high_severity_count': sum(1 for e in enriched_exceptions 
-                                          if e.get('severity_classification', {}).get('severity') == 'High'),
-                'medium_severity_count': sum(1 for e in enriched_exceptions 
-                                            if e.get('severity_classification', {}).get('severity') == 'Medium'),
-                'low_severity_count': sum(1 for e in enriched_exceptions 
-                                         if e.get('severity_classification', {}).get('severity') == 'Low'),
-            },
-            'exceptions': results['exceptions'],
-            'enriched_exceptions': enriched_exceptions,
-            'final_compliance_report': final_report
+        if spool is not None:
+            spool.close()
+        with profiler.stage('report_generation', rows=len(exception_dicts)):
+            if report_path:
+                self.engine.write_compliance_report(report_path, results, enriched_exceptions,
+                                                    detail_limit=report_detail_limit)
+                final_report = None
+                print(f"📄 Compliance report written to {report_path}")
+            else:
+                final_report = self.engine.generate_compliance_report(results, enriched_exceptions,
+                                                                      detail_limit=report_detail_limit)
+        
+        summary = {
+            'total_trades': results['total_trades'],
+            'matched_count': results['matched_count'],
+            'mismatch_count': results['mismatch_count'],
+            'missing_count': results['missing_count'],
+            'exceptions_processed': completed,
+            'high_severity_count': severity_counts['High'],
+            'medium_severity_count': severity_counts['Medium'],
+            'low_severity_count': severity_counts['Low'],
+            'clusters': len(clusters),
+            **triage_stats,
+            'cache_hits': cache_hits,
+            'cache_misses': cache_misses,
+            'token_usage': token_usage,
+            'deferred_count': deferred,
+            'time_budget_seconds': time_budget_seconds,
         }
+        profile = profiler.as_dict()
+        profiler.stop()
+        
+        print("⏱️  Stage timings:")
+        print(profiler.format_table())
+        if trace_path:
+            profiler.dump_trace(trace_path)
+            print(f"⏱️  Trace written to {trace_path}")
         
         print("\n" + "="*60)
         print("✅ INTELLIGENCE ENGINE ANALYSIS COMPLETE!")
         print("="*60 + "\n")
         
-        return final_results
+        yield {
+            'event': 'report',
+            'summary': summary,
+            'final_compliance_report': final_report,
+            'circuit_breaker': self.engine.breaker.metrics(),
+            'profile': profile,
+            'spool_path': spool_path,
+            'report_path': report_path
+        }
+    
+    def run_full_reconciliation(
+        self,
+        broker_df: pd.DataFrame,
+        exchange_df: pd.DataFrame,
+        fuzzy_match: bool = False,
+        rules: Any = None,
+        trace_path: str = None,
+        trace_memory: bool = False,
+        max_concurrency: int = None,
+        batch_analysis: bool = True,
+        cluster_analysis: bool = True,
+        triage: bool = True,
+        prioritize: bool = True,
+        time_budget_seconds: float = None,
+        report_detail_limit: int = None
+    ) -> Dict[str, Any]:
+        """
+        Run complete reconciliation workflow with Intelligence Engine
+        
+        fuzzy_match pairs trades whose trade_id differs between systems before
+        analysis, so each such fill reaches the engine once instead of twice.
+        rules is a tolerance rule config (see rules.py) passed to matching.
+        Per-stage timings are returned under 'profile'; trace_path also writes
+        them as a Chrome trace file, and trace_memory adds tracemalloc peaks.
+        max_concurrency bounds the number of in-flight engine calls (defaults to
+        the engine's setting; 1 analyzes sequentially). batch_analysis packs
+        several exceptions into each engine request; set it to False for one
+        request per exception. cluster_analysis groups near-identical exceptions
+        and analyzes one representative per cluster. triage classifies obvious
+        patterns (small timing skews, sub-tick prices, currency mislabels)
+        locally so they skip the engine. prioritize analyzes exceptions by
+        preliminary severity, then notional at risk (quantity x price delta),
+        instead of DataFrame order. time_budget_seconds is a wall-clock budget
+        counted from the start of the run: once it expires no new analyses are
+        started, in-flight calls are cut off, and the remaining exceptions are
+        returned with deferred=True (listed in the report, counted in
+        summary['deferred_count']). report_detail_limit produces a summary
+        report with per-exception detail for the most severe
+        report_detail_limit exceptions only.
+        
+        Collects iter_full_reconciliation() into a single results dictionary.
+        """
+        exceptions_df = None
+        enriched_exceptions = []
+        for event in self.iter_full_reconciliation(
+            broker_df, exchange_df, fuzzy_match=fuzzy_match, rules=rules, trace_path=trace_path,
+            trace_memory=trace_memory, max_concurrency=max_concurrency, batch_analysis=batch_analysis,
+            cluster_analysis=cluster_analysis, triage=triage, prioritize=prioritize,
+            time_budget_seconds=time_budget_seconds, report_detail_limit=report_detail_limit
+        ):
+            if event['event'] == 'error':
+                return {
+                    'error': event['error'],
+                    'summary': {},
+                    'enriched_exceptions': []
+                }
+            if event['event'] == 'matching':
+                exceptions_df = event['exceptions']
+                enriched_exceptions = [None] * len(exceptions_df)
+            elif event['event'] == 'exception':
+                enriched_exceptions[event['index']] = event['exception']
+            elif event['event'] == 'report':
+                return {
+                    'summary': event['summary'],
+                    'exceptions': exceptions_df,
+                    'enriched_exceptions': enriched_exceptions,
+                    'final_compliance_report': event['final_compliance_report'],
+                    'circuit_breaker': event['circuit_breaker'],
+                    'profile': event['profile']
+                }
 
 # Global orchestrator instance
 orchestrator = None
@@ -141,9 +439,21 @@ def get_orchestrator() -> TradeReconOrchestrator:
         orchestrator = TradeReconOrchestrator()
     return orchestrator
 
-def run_full_reconciliation(broker_df: pd.DataFrame, exchange_df: pd.DataFrame) -> Dict[str, Any]:
+def iter_full_reconciliation(broker_df: pd.DataFrame, exchange_df: pd.DataFrame, **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the autonomous reconciliation workflow as events (see
+    TradeReconOrchestrator.iter_full_reconciliation)
+    """
+    orch = get_orchestrator()
+    yield from orch.iter_full_reconciliation(broker_df, exchange_df, **kwargs)
+
+def run_full_reconciliation(broker_df: pd.DataFrame, exchange_df: pd.DataFrame, fuzzy_match: bool = False,
+                            rules: Any = None, max_concurrency: int = None,
+                            batch_analysis: bool = True, time_budget_seconds: float = None) -> Dict[str, Any]:
     """
     Run complete autonomous reconciliation workflow
     """
     orch = get_orchestrator()
-    return orch.run_full_reconciliation(broker_df, exchange_df)
+    return orch.run_full_reconciliation(broker_df, exchange_df, fuzzy_match=fuzzy_match, rules=rules,
+                                        max_concurrency=max_concurrency, batch_analysis=batch_analysis,
+                                        time_budget_seconds=time_budget_seconds)
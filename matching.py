@@ -1,37 +1,79 @@
 import pandas as pd
 import numpy as np
 
-def reconcile_trades(broker_df, exchange_df):
+from rules import resolve_rules
+from instrumentation import PipelineProfiler
+
+# Columns every trade file must provide
+REQUIRED_COLUMNS = ['trade_id', 'symbol', 'side', 'quantity', 'price', 'currency', 'trade_time', 'account_id']
+
+# Fields compared between broker and exchange, in reporting order
+COMPARE_FIELDS = ['symbol', 'side', 'quantity', 'price', 'currency', 'account_id']
+NUMERIC_FIELDS = ('quantity', 'price')
+
+# Secondary (fuzzy) pass for trades whose trade_id differs between systems
+BLOCKING_FIELDS = ['symbol', 'side', 'account_id', 'currency']
+FUZZY_TIME_TOLERANCE = pd.Timedelta(seconds=60)
+
+# Every field that can mismatch, in reporting order, and its bit in mismatch_mask
+MISMATCH_FIELDS = ['trade_id'] + COMPARE_FIELDS + ['trade_time']
+FIELD_BITS = {field: 1 << bit for bit, field in enumerate(MISMATCH_FIELDS)}
+
+# Fields whose broker and exchange values are kept on every exception
+VALUE_FIELDS = COMPARE_FIELDS + ['trade_time']
+
+# Structured exceptions frame returned by reconcile_trades()
+EXCEPTION_COLUMNS = [
+    'trade_id', 'trade_id_exchange', 'exception_type', 'severity', 'mismatch_mask'
+] + [f'{field}_{side}' for field in VALUE_FIELDS for side in ('broker', 'exchange')]
+
+# Human-readable columns produced by render_exceptions()
+RENDERED_EXCEPTION_COLUMNS = [
+    'trade_id', 'exception_type', 'mismatched_fields', 
+    'broker_values', 'exchange_values', 'severity'
+]
+
+MISSING_TYPES = ('missing_in_exchange', 'missing_in_broker')
+
+
+def validate_columns(broker_df, exchange_df):
     """
-    Reconcile trades between broker and exchange data.
+    Check that both trade files carry every required column.
     
-    Args:
-        broker_df: DataFrame with broker trades
-        exchange_df: DataFrame with exchange trades
-    
-    Returns:
-        Dictionary containing reconciliation results
+    Raises:
+        ValueError: If a required column is missing from either side
     """
-    
-    # Validate required columns
-    required_columns = ['trade_id', 'symbol', 'side', 'quantity', 'price', 'currency', 'trade_time', 'account_id']
-    
-    for col in required_columns:
+    for col in REQUIRED_COLUMNS:
         if col not in broker_df.columns:
             raise ValueError(f"Missing column '{col}' in broker trades")
         if col not in exchange_df.columns:
             raise ValueError(f"Missing column '{col}' in exchange trades")
+
+
+def _with_datetime(trades_df):
+    """Parse trade_time unless the frame already carries datetime64 values"""
+    if pd.api.types.is_datetime64_any_dtype(trades_df['trade_time']):
+        return trades_df
+    return trades_df.assign(trade_time=pd.to_datetime(trades_df['trade_time']))
+
+
+def merge_trades(broker_df, exchange_df):
+    """
+    Outer-merge broker and exchange trades on trade_id.
     
-    # Create copies to avoid modifying original dataframes
-    broker = broker_df.copy()
-    exchange = exchange_df.copy()
+    Args:
+        broker_df: DataFrame with broker trades
+        exchange_df: DataFrame with exchange trades
     
-    # Convert trade_time to datetime for comparison
-    broker['trade_time'] = pd.to_datetime(broker['trade_time'])
-    exchange['trade_time'] = pd.to_datetime(exchange['trade_time'])
+    Returns:
+        Merged DataFrame with '_broker'/'_exchange' suffixes and a '_merge' indicator
+    """
+    # Convert trade_time to datetime for comparison (typed inputs are used as-is;
+    # assign() leaves the original dataframes untouched)
+    broker = _with_datetime(broker_df)
+    exchange = _with_datetime(exchange_df)
     
-    # Merge on trade_id
-    merged = pd.merge(
+    return pd.merge(
         broker,
         exchange,
         on='trade_id',
@@ -39,112 +81,455 @@ def reconcile_trades(broker_df, exchange_df):
         suffixes=('_broker', '_exchange'),
         indicator=True
     )
+
+
+def _values_differ(broker_col, exchange_col):
+    """
+    Elementwise string inequality of two columns.
     
-    # Initialize results
-    results = {
-        'total_trades': len(merged),
-        'matched_count': 0,
-        'mismatch_count': 0,
-        'missing_count': 0,
-        'exceptions': []
+    Categorical columns with string categories are compared on codes over the
+    union of their categories, avoiding a str() of every row.
+    """
+    if (isinstance(broker_col.dtype, pd.CategoricalDtype)
+            and isinstance(exchange_col.dtype, pd.CategoricalDtype)
+            and broker_col.cat.categories.dtype == object
+            and exchange_col.cat.categories.dtype == object):
+        categories = broker_col.cat.categories.union(exchange_col.cat.categories)
+        broker_codes = broker_col.cat.set_categories(categories).cat.codes.to_numpy()
+        exchange_codes = exchange_col.cat.set_categories(categories).cat.codes.to_numpy()
+        return broker_codes != exchange_codes
+    return (broker_col.astype(str) != exchange_col.astype(str)).to_numpy()
+
+
+def compute_mismatch_masks(merged, rules=None):
+    """
+    Build one boolean mismatch mask per compared field over the whole merged frame.
+    
+    Only rows present on both sides can mismatch; one-sided rows are reported
+    as missing instead. Numeric and time tolerances come from the compiled
+    rules as per-row arrays, so every check stays vectorized.
+    
+    Args:
+        merged: DataFrame from merge_trades()
+        rules: ToleranceRules, config dict or JSON path (None for defaults)
+    
+    Returns:
+        Dictionary mapping field name to a boolean numpy array, in reporting order
+        (trade_id, COMPARE_FIELDS, then trade_time)
+    """
+    rules = resolve_rules(rules)
+    in_both = (merged['_merge'] == 'both').to_numpy()
+    masks = {}
+    tolerances = {
+        'quantity': rules.quantity_tolerance(merged),
+        'price': rules.price_tolerance(merged)
     }
     
-    exceptions_list = []
+    # Trades paired by the fuzzy pass carry the exchange's own trade_id
+    if 'trade_id_exchange' in merged.columns:
+        exchange_ids = merged['trade_id_exchange']
+        masks['trade_id'] = (
+            exchange_ids.notna() & (exchange_ids.astype(str) != merged['trade_id'].astype(str))
+        ).to_numpy()
+    else:
+        masks['trade_id'] = np.zeros(len(merged), dtype=bool)
     
-    for idx, row in merged.iterrows():
-        trade_id = row['trade_id']
-        
-        # Case 1: Trade only in broker (missing in exchange)
-        if row['_merge'] == 'left_only':
-            results['missing_count'] += 1
-            exceptions_list.append({
-                'trade_id': trade_id,
-                'exception_type': 'missing_in_exchange',
-                'mismatched_fields': 'N/A',
-                'broker_values': f"symbol={row['symbol_broker']}, quantity={row['quantity_broker']}, price={row['price_broker']}",
-                'exchange_values': 'NOT FOUND',
-                'severity': 'High'
-            })
+    for field in COMPARE_FIELDS:
+        broker_col = merged[f'{field}_broker']
+        exchange_col = merged[f'{field}_exchange']
         
-        # Case 2: Trade only in exchange (missing in broker)
-        elif row['_merge'] == 'right_only':
-            results['missing_count'] += 1
-            exceptions_list.append({
-                'trade_id': trade_id,
-                'exception_type': 'missing_in_broker',
-                'mismatched_fields': 'N/A',
-                'broker_values': 'NOT FOUND',
-                'exchange_values': f"symbol={row['symbol_exchange']}, quantity={row['quantity_exchange']}, price={row['price_exchange']}",
-                'severity': 'High'
-            })
+        # Handle NaN comparisons: two missing values are not a mismatch
+        both_na = (broker_col.isna() & exchange_col.isna()).to_numpy()
         
-        # Case 3: Trade in both - check for mismatches
+        # Compare values (with tolerance for float comparisons)
+        if field in NUMERIC_FIELDS:
+            diff = (broker_col.astype(float) - exchange_col.astype(float)).abs()
+            # A value present on one side only (e.g. a blank quantity) is a mismatch
+            one_na = (broker_col.isna() ^ exchange_col.isna()).to_numpy()
+            differs = (diff.to_numpy() > tolerances[field]) | one_na
         else:
-            mismatches = []
-            broker_vals = []
-            exchange_vals = []
-            
-            # Check each field for mismatches
-            fields_to_check = ['symbol', 'side', 'quantity', 'price', 'currency', 'account_id']
-            
-            for field in fields_to_check:
-                broker_val = row[f'{field}_broker']
-                exchange_val = row[f'{field}_exchange']
-                
-                # Handle NaN comparisons
-                if pd.isna(broker_val) and pd.isna(exchange_val):
-                    continue
-                
-                # Compare values (with tolerance for float comparisons)
-                if field == 'price' or field == 'quantity':
-                    if abs(float(broker_val) - float(exchange_val)) > 0.01:
-                        mismatches.append(field)
-                        broker_vals.append(f"{field}={broker_val}")
-                        exchange_vals.append(f"{field}={exchange_val}")
-                else:
-                    if str(broker_val) != str(exchange_val):
-                        mismatches.append(field)
-                        broker_vals.append(f"{field}={broker_val}")
-                        exchange_vals.append(f"{field}={exchange_val}")
-            
-            # Check trade_time (allow 1 second tolerance)
-            time_diff = abs((row['trade_time_broker'] - row['trade_time_exchange']).total_seconds())
-            if time_diff > 1:
-                mismatches.append('trade_time')
-                broker_vals.append(f"trade_time={row['trade_time_broker']}")
-                exchange_vals.append(f"trade_time={row['trade_time_exchange']}")
-            
-            # Determine severity based on mismatches
-            severity = 'Low'
-            if 'quantity' in mismatches or 'price' in mismatches:
-                severity = 'High'
-            elif 'side' in mismatches or 'symbol' in mismatches:
-                severity = 'High'
-            elif len(mismatches) > 2:
-                severity = 'Medium'
-            
-            if mismatches:
-                results['mismatch_count'] += 1
-                exceptions_list.append({
-                    'trade_id': trade_id,
-                    'exception_type': 'mismatch',
-                    'mismatched_fields': ', '.join(mismatches),
-                    'broker_values': ' | '.join(broker_vals),
-                    'exchange_values': ' | '.join(exchange_vals),
-                    'severity': severity
-                })
-            else:
-                results['matched_count'] += 1
-    
-    # Convert exceptions to DataFrame
-    if exceptions_list:
-        results['exceptions'] = pd.DataFrame(exceptions_list)
+            differs = _values_differ(broker_col, exchange_col)
+        
+        masks[field] = in_both & ~both_na & differs
+    
+    # Check trade_time (1 second tolerance unless the rules say otherwise)
+    time_diff = (merged['trade_time_broker'] - merged['trade_time_exchange']).abs()
+    masks['trade_time'] = in_both & (time_diff.to_numpy() > rules.time_tolerance(merged))
+    
+    return masks
+
+
+def _join_flagged(parts, flags, sep, n):
+    """Join, per row, the parts whose flag is set (vectorized ', '.join)"""
+    out = np.full(n, '', dtype=object)
+    for part, flag in zip(parts, flags):
+        if not flag.any():
+            continue
+        current = out[flag]
+        out[flag] = np.where(current == '', part[flag], current + sep + part[flag])
+    return out
+
+
+def _side_column(field, side):
+    """Merged/exceptions-frame column holding one side's value of a field"""
+    if field == 'trade_id':
+        return 'trade_id' if side == 'broker' else 'trade_id_exchange'
+    return f'{field}_{side}'
+
+
+def build_exceptions(merged, masks, rules=None):
+    """
+    Build the structured exceptions DataFrame from the merged frame and its masks.
+    
+    Exceptions keep typed broker/exchange values for every field plus a
+    mismatch_mask bitmask (see FIELD_BITS); no strings are built here. Use
+    render_exceptions() / render_exception() when text is needed.
+    
+    Args:
+        merged: DataFrame from merge_trades()
+        masks: Dictionary from compute_mismatch_masks()
+        rules: ToleranceRules, config dict or JSON path (None for defaults)
+    
+    Returns:
+        DataFrame with EXCEPTION_COLUMNS, in merged-frame order
+    """
+    rules = resolve_rules(rules)
+    merge_flag = merged['_merge'].to_numpy()
+    left_only = merge_flag == 'left_only'
+    right_only = merge_flag == 'right_only'
+    any_mismatch = np.logical_or.reduce(list(masks.values()))
+    
+    selected = left_only | right_only | any_mismatch
+    if not selected.any():
+        return pd.DataFrame(columns=EXCEPTION_COLUMNS)
+    
+    exc = merged.loc[selected].reset_index(drop=True)
+    left_only = left_only[selected]
+    right_only = right_only[selected]
+    sub_masks = {field: mask[selected] for field, mask in masks.items()}
+    n = len(exc)
+    
+    mismatch_mask = np.zeros(n, dtype=np.uint16)
+    for field, mask in sub_masks.items():
+        mismatch_mask[mask] |= FIELD_BITS[field]
+    
+    severity = rules.severity(mismatch_mask)
+    exception_type = np.full(n, 'mismatch', dtype=object)
+    
+    # Case 1: Trade only in broker (missing in exchange)
+    exception_type[left_only] = 'missing_in_exchange'
+    
+    # Case 2: Trade only in exchange (missing in broker)
+    exception_type[right_only] = 'missing_in_broker'
+    
+    severity[left_only | right_only] = rules.missing_severity
+    
+    if 'trade_id_exchange' in exc.columns:
+        trade_id_exchange = exc['trade_id_exchange']
     else:
-        results['exceptions'] = pd.DataFrame(columns=[
-            'trade_id', 'exception_type', 'mismatched_fields', 
-            'broker_values', 'exchange_values', 'severity'
-        ])
+        trade_id_exchange = pd.Series(np.nan, index=exc.index, dtype=object)
+    
+    columns = {
+        'trade_id': exc['trade_id'],
+        'trade_id_exchange': trade_id_exchange,
+        'exception_type': exception_type,
+        'severity': severity,
+        'mismatch_mask': mismatch_mask
+    }
+    for field in VALUE_FIELDS:
+        for side in ('broker', 'exchange'):
+            columns[f'{field}_{side}'] = exc[f'{field}_{side}']
+    
+    return pd.DataFrame(columns, columns=EXCEPTION_COLUMNS)
+
+
+def mismatched_field_names(mask):
+    """Decode a mismatch_mask value into field names, in reporting order"""
+    return [field for field in MISMATCH_FIELDS if int(mask) & FIELD_BITS[field]]
+
+
+def render_exceptions(exceptions_df):
+    """
+    Render structured exceptions into the human-readable exception table.
+    
+    Intended for the UI, exports and anything else that needs text; the
+    reconciliation itself never builds these strings.
+    
+    Args:
+        exceptions_df: Structured DataFrame from reconcile_trades()
+    
+    Returns:
+        DataFrame with RENDERED_EXCEPTION_COLUMNS, aligned with exceptions_df
+    """
+    n = len(exceptions_df)
+    if n == 0:
+        return pd.DataFrame(columns=RENDERED_EXCEPTION_COLUMNS)
+    
+    exc = exceptions_df
+    masks = exc['mismatch_mask'].to_numpy(dtype=np.int64)
+    exception_type = exc['exception_type'].to_numpy()
+    left_only = exception_type == 'missing_in_exchange'
+    right_only = exception_type == 'missing_in_broker'
+    
+    # Only fields that actually mismatch somewhere need rendering
+    fields = [field for field in MISMATCH_FIELDS if (masks & FIELD_BITS[field]).any()]
+    flags = [(masks & FIELD_BITS[field]) != 0 for field in fields]
     
+    def _values(side, field):
+        return (f'{field}=' + exc[_side_column(field, side)].astype(str)).to_numpy(dtype=object)
+    
+    def _summary(side):
+        return (
+            'symbol=' + exc[f'symbol_{side}'].astype(str)
+            + ', quantity=' + exc[f'quantity_{side}'].astype(str)
+            + ', price=' + exc[f'price_{side}'].astype(str)
+        ).to_numpy(dtype=object)
+    
+    # Mismatch rows: list the differing fields and their values on each side
+    mismatched_fields = _join_flagged([np.full(n, f, dtype=object) for f in fields], flags, ', ', n)
+    broker_values = _join_flagged([_values('broker', f) for f in fields], flags, ' | ', n)
+    exchange_values = _join_flagged([_values('exchange', f) for f in fields], flags, ' | ', n)
+    
+    # Missing rows: summarise the side that has the trade
+    if left_only.any():
+        broker_values[left_only] = _summary('broker')[left_only]
+        exchange_values[left_only] = 'NOT FOUND'
+    if right_only.any():
+        broker_values[right_only] = 'NOT FOUND'
+        exchange_values[right_only] = _summary('exchange')[right_only]
+    mismatched_fields[left_only | right_only] = 'N/A'
+    
+    return pd.DataFrame({
+        'trade_id': exc['trade_id'].to_numpy(),
+        'exception_type': exception_type,
+        'mismatched_fields': mismatched_fields,
+        'broker_values': broker_values,
+        'exchange_values': exchange_values,
+        'severity': exc['severity'].to_numpy()
+    }, index=exc.index)
+
+
+def render_exception(exception):
+    """
+    Render a single structured exception record (e.g. row.to_dict()).
+    
+    Args:
+        exception: Dictionary with the EXCEPTION_COLUMNS keys
+    
+    Returns:
+        Copy of the record with mismatched_fields, broker_values and
+        exchange_values filled in
+    """
+    rendered = dict(exception)
+    exception_type = exception.get('exception_type')
+    
+    def _summary(side):
+        return (
+            f"symbol={exception.get(f'symbol_{side}')}, "
+            f"quantity={exception.get(f'quantity_{side}')}, "
+            f"price={exception.get(f'price_{side}')}"
+        )
+    
+    if exception_type in MISSING_TYPES:
+        rendered['mismatched_fields'] = 'N/A'
+        if exception_type == 'missing_in_exchange':
+            rendered['broker_values'] = _summary('broker')
+            rendered['exchange_values'] = 'NOT FOUND'
+        else:
+            rendered['broker_values'] = 'NOT FOUND'
+            rendered['exchange_values'] = _summary('exchange')
+        return rendered
+    
+    fields = mismatched_field_names(exception.get('mismatch_mask', 0))
+    rendered['mismatched_fields'] = ', '.join(fields)
+    rendered['broker_values'] = ' | '.join(
+        f"{field}={exception.get(_side_column(field, 'broker'))}" for field in fields
+    )
+    rendered['exchange_values'] = ' | '.join(
+        f"{field}={exception.get(_side_column(field, 'exchange'))}" for field in fields
+    )
+    return rendered
+
+
+def _orphans(merged, side, flag):
+    """One side's unmatched rows with their blocking key, sorted by trade_time"""
+    rows = merged.loc[merged['_merge'] == flag]
+    block = rows[[f'{field}_{side}' for field in BLOCKING_FIELDS]].astype(str)
+    block.columns = BLOCKING_FIELDS
+    orphans = pd.DataFrame({
+        'row': rows.index.to_numpy(),
+        'block': pd.util.hash_pandas_object(block, index=False).to_numpy(),
+        'trade_time': rows[f'trade_time_{side}'].to_numpy()
+    })
+    return orphans.dropna(subset=['trade_time']).sort_values('trade_time', kind='stable')
+
+
+def pair_orphans(merged, tolerance=FUZZY_TIME_TOLERANCE):
+    """
+    Pair broker-only and exchange-only rows that are likely the same fill.
+    
+    Orphans are blocked on BLOCKING_FIELDS and joined with a sorted as-of join on
+    trade_time within tolerance, so the pass is O(n log n). Each exchange orphan
+    is paired at most once, with its nearest broker orphan.
+    
+    Args:
+        merged: DataFrame from merge_trades()
+        tolerance: Maximum trade_time distance for a pair (pd.Timedelta)
+    
+    Returns:
+        Tuple of (broker row labels, exchange row labels) as numpy arrays
+    """
+    broker_orphans = _orphans(merged, 'broker', 'left_only')
+    exchange_orphans = _orphans(merged, 'exchange', 'right_only')
+    if broker_orphans.empty or exchange_orphans.empty:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    
+    candidates = pd.merge_asof(
+        broker_orphans,
+        exchange_orphans.assign(exchange_time=exchange_orphans['trade_time']),
+        on='trade_time',
+        by='block',
+        tolerance=tolerance,
+        direction='nearest',
+        suffixes=('_broker', '_exchange')
+    ).dropna(subset=['row_exchange'])
+    
+    # Keep the closest broker orphan for every exchange orphan
+    candidates['gap'] = (candidates['trade_time'] - candidates['exchange_time']).abs()
+    pairs = candidates.sort_values('gap', kind='stable').drop_duplicates('row_exchange')
+    
+    return pairs['row_broker'].to_numpy(dtype=np.int64), pairs['row_exchange'].to_numpy(dtype=np.int64)
+
+
+def fold_orphan_pairs(merged, tolerance=FUZZY_TIME_TOLERANCE):
+    """
+    Fold fuzzy-paired orphans into single 'both' rows of the merged frame.
+    
+    The exchange side of each pair is moved onto the broker row, whose
+    'trade_id_exchange' records the exchange's trade_id; the exchange-only
+    row is dropped.
+    
+    Args:
+        merged: DataFrame from merge_trades()
+        tolerance: Maximum trade_time distance for a pair (pd.Timedelta)
+    
+    Returns:
+        Merged DataFrame with a 'trade_id_exchange' column
+    """
+    broker_rows, exchange_rows = pair_orphans(merged, tolerance)
+    
+    folded = merged.copy()
+    folded['trade_id_exchange'] = pd.Series(np.nan, index=folded.index, dtype=object)
+    if len(broker_rows) == 0:
+        return folded
+    
+    # Assign column by column so every column keeps its dtype
+    for col in [c for c in merged.columns if c.endswith('_exchange')]:
+        folded.loc[broker_rows, col] = merged.loc[exchange_rows, col].to_numpy()
+    folded.loc[broker_rows, 'trade_id_exchange'] = merged.loc[exchange_rows, 'trade_id'].to_numpy()
+    folded.loc[broker_rows, '_merge'] = 'both'
+    
+    return folded.drop(index=exchange_rows).reset_index(drop=True)
+
+
+def reconcile_merged(merged, rules=None, profiler=None):
+    """
+    Reconcile an already-merged broker/exchange frame column-wise.
+    
+    Args:
+        merged: DataFrame from merge_trades()
+        rules: ToleranceRules, config dict or JSON path (None for defaults)
+        profiler: Optional PipelineProfiler recording the comparison and
+            exception-frame stages
+    
+    Returns:
+        Dictionary containing reconciliation results
+    """
+    rules = resolve_rules(rules)
+    profiler = profiler or PipelineProfiler()
+    
+    with profiler.stage('comparison', rows=len(merged)):
+        masks = compute_mismatch_masks(merged, rules)
+        merge_flag = merged['_merge'].to_numpy()
+        in_both = merge_flag == 'both'
+        any_mismatch = np.logical_or.reduce(list(masks.values()))
+        mismatch_count = int(any_mismatch.sum())
+    
+    with profiler.stage('exception_frame') as stage:
+        exceptions = build_exceptions(merged, masks, rules)
+        stage['rows'] = len(exceptions)
+    
+    return {
+        'total_trades': len(merged),
+        'matched_count': int(in_both.sum()) - mismatch_count,
+        'mismatch_count': mismatch_count,
+        'missing_count': int((~in_both).sum()),
+        'exceptions': exceptions
+    }
+
+
+def hash_partitions(keys, partitions):
+    """
+    Stable hash partition number for each key.
+    
+    Keys are hashed as strings so the same value lands in the same partition
+    regardless of how a particular chunk or file inferred its dtype.
+    
+    Args:
+        keys: Series of partition keys (e.g. trade_id)
+        partitions: Number of partitions
+    
+    Returns:
+        int64 numpy array of partition numbers in [0, partitions)
+    """
+    hashes = pd.util.hash_pandas_object(keys.astype(str), index=False).to_numpy()
+    return (hashes % np.uint64(partitions)).astype(np.int64)
+
+
+def reconcile_trades(broker_df, exchange_df, fuzzy_match=False, fuzzy_tolerance=FUZZY_TIME_TOLERANCE,
+                     rules=None, profiler=None):
+    """
+    Reconcile trades between broker and exchange data.
+    
+    Args:
+        broker_df: DataFrame with broker trades
+        exchange_df: DataFrame with exchange trades
+        fuzzy_match: Pair left-over missing trades whose trade_id differs between
+            systems (same symbol/side/account/currency, trade_time within
+            fuzzy_tolerance); pairs are reported as a single 'trade_id' mismatch
+        fuzzy_tolerance: Maximum trade_time distance for the fuzzy pass
+        rules: Tolerance/severity rules - a ToleranceRules, config dict or JSON
+            path (see rules.py); None keeps the default tolerances
+        profiler: Optional PipelineProfiler shared with the caller; per-stage
+            timings are attached to the results as 'profile' either way
+    
+    Returns:
+        Dictionary containing reconciliation results
+    """
+    profiler = profiler or PipelineProfiler()
+    input_rows = len(broker_df) + len(exchange_df)
+    
+    # Validate required columns
+    with profiler.stage('validation', rows=input_rows):
+        validate_columns(broker_df, exchange_df)
+    
+    with profiler.stage('datetime_parsing', rows=input_rows):
+        broker = _with_datetime(broker_df)
+        exchange = _with_datetime(exchange_df)
+    
+    # Merge on trade_id and compare every field column-wise
+    with profiler.stage('merge') as stage:
+        merged = merge_trades(broker, exchange)
+        stage['rows'] = len(merged)
+    
+    # Second pass over the left_only/right_only residue
+    if fuzzy_match:
+        with profiler.stage('fuzzy_match') as stage:
+            merged = fold_orphan_pairs(merged, fuzzy_tolerance)
+            stage['rows'] = len(merged)
+    
+    results = reconcile_merged(merged, rules, profiler)
+    results['profile'] = profiler.as_dict()
     return results
 
 
@@ -205,11 +590,11 @@ def export_exceptions_to_csv(exceptions_df, filename='exceptions_export.csv'):
     Export exceptions to CSV file.
     
     Args:
-        exceptions_df: DataFrame of exceptions
+        exceptions_df: Structured DataFrame of exceptions (rendered on export)
         filename: Output filename
     
     Returns:
         Path to exported file
     """
-    exceptions_df.to_csv(filename, index=False)
+    render_exceptions(exceptions_df).to_csv(filename, index=False)
     return filename
\ No newline at end of file
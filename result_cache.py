@@ -0,0 +1,138 @@
+"""
+TradeRecon AI - In-process result cache
+Memoizes parsed trade files and reconciliation results by a SHA-256 of the
+uploaded bytes, bounded by entry count and estimated memory, and shared by
+every Streamlit session in the process
+"""
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+import numpy as np
+import pandas as pd
+
+# Default bounds for the shared cache
+RESULT_CACHE_ENTRIES = 8
+RESULT_CACHE_BYTES = 2 * 1024 ** 3
+
+
+def content_digest(data: bytes) -> str:
+    """Cache key for uploaded file content: SHA-256 of the bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory held by a cached value.
+
+    DataFrames and Series are measured with memory_usage(deep=True), numpy
+    arrays by nbytes, and dicts/lists/tuples by their contents.
+
+    Args:
+        value: Object to measure
+
+    Returns:
+        Size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by entry count and estimated bytes
+
+    Values are shared between callers (and Streamlit sessions) without
+    copying, so they must be treated as read-only. Concurrent requests for a
+    key that is still being computed wait for that computation instead of
+    repeating it. A value larger than max_bytes is returned but not kept.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_ENTRIES, max_bytes: int = RESULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._pending = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value for key, calling compute() once on a miss"""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return self._cache[key]
+            self._misses += 1
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            self._store(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _store(self, key: Hashable, value: Any):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            print(f"⚠️ Result cache: {size / 1e6:.0f} MB entry exceeds the {self.max_bytes / 1e6:.0f} MB limit, not cached")
+            return
+        with self._lock:
+            if key in self._cache:
+                self._bytes -= self._sizes[key]
+            self._cache[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._cache) > self.max_entries or self._bytes > self.max_bytes:
+                evicted, _ = self._cache.popitem(last=False)
+                self._bytes -= self._sizes.pop(evicted)
+
+    def clear(self):
+        """Drop every cached value"""
+        with self._lock:
+            self._cache.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count, estimated bytes, hits and misses"""
+        with self._lock:
+            return {
+                'entries': len(self._cache),
+                'bytes': self._bytes,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+# Shared cache; module state survives Streamlit reruns and is shared across sessions
+result_cache = ResultCache()
@@ -0,0 +1,229 @@
+"""
+TradeRecon AI - Tolerance and severity rule engine
+Loads per-symbol / per-currency / per-account tolerances and severity rules from
+a config file and compiles them into vectorized checks over the merged frame
+"""
+
+import copy
+import json
+
+import numpy as np
+import pandas as pd
+
+# Tolerance parameters and their defaults (the historical hard-coded behaviour)
+DEFAULT_TOLERANCES = {
+    'price_abs': 0.01,       # absolute price tolerance
+    'price_bps': 0.0,        # relative price tolerance in basis points of the broker price
+    'tick_size': 0.0,        # instrument tick size
+    'price_ticks': 0.0,      # price tolerance expressed in ticks
+    'quantity_abs': 0.01,    # absolute quantity tolerance
+    'lot_size': 0.0,         # instrument lot size
+    'quantity_lots': 0.0,    # quantity tolerance expressed in lots
+    'time_seconds': 1.0,     # trade_time tolerance
+}
+
+# Override scopes, least to most specific (later scopes win)
+OVERRIDE_SCOPES = ('currency', 'symbol', 'account_id')
+
+SEVERITY_LEVELS = ('High', 'Medium', 'Low')
+
+DEFAULT_RULES_CONFIG = {
+    'tolerances': dict(DEFAULT_TOLERANCES),
+    'overrides': {},
+    'severity_rules': [
+        {'severity': 'High', 'any_of': ['quantity', 'price', 'side', 'symbol']},
+        {'severity': 'Medium', 'any_of': ['trade_id']},
+        {'severity': 'Medium', 'min_fields': 3},
+    ],
+    'default_severity': 'Low',
+    'missing_severity': 'High',
+}
+
+
+class ToleranceRules:
+    """
+    Compiled tolerance and severity rules
+
+    Config layout (JSON):
+        tolerances: defaults for the DEFAULT_TOLERANCES parameters
+        overrides: {scope: {key: {parameter: value}}} for scope in OVERRIDE_SCOPES
+        severity_rules: ordered list of {severity, any_of | all_of | min_fields};
+            the first matching rule wins
+        default_severity: severity when no rule matches
+        missing_severity: severity of missing_in_broker / missing_in_exchange
+    """
+
+    def __init__(self, config=None):
+        """Validate the config and compile it once"""
+        from matching import MISMATCH_FIELDS, FIELD_BITS
+
+        config = copy.deepcopy(config if config is not None else DEFAULT_RULES_CONFIG)
+        self.config = config
+
+        # Tolerances
+        self.defaults = dict(DEFAULT_TOLERANCES)
+        self.defaults.update(self._check_params(config.get('tolerances', {}), 'tolerances'))
+
+        # Per-parameter list of (scope, {key: value}) in precedence order
+        self._scoped = {}
+        overrides = config.get('overrides', {})
+        for scope in overrides:
+            if scope not in OVERRIDE_SCOPES:
+                raise ValueError(f"Unknown override scope '{scope}' (expected one of {OVERRIDE_SCOPES})")
+        for scope in OVERRIDE_SCOPES:
+            for key, params in overrides.get(scope, {}).items():
+                for param, value in self._check_params(params, f"overrides.{scope}.{key}").items():
+                    mapping = self._scope_mapping(param, scope)
+                    mapping[key] = value
+
+        # Severity rules compiled to bit tests on mismatch_mask
+        self._severity_tests = []
+        for i, rule in enumerate(config.get('severity_rules', [])):
+            severity = self._check_severity(rule.get('severity'), f'severity_rules[{i}]')
+            if 'any_of' in rule or 'all_of' in rule:
+                kind = 'any_of' if 'any_of' in rule else 'all_of'
+                bits = 0
+                for field in rule[kind]:
+                    if field not in FIELD_BITS:
+                        raise ValueError(f"Unknown field '{field}' in severity_rules[{i}] (expected one of {MISMATCH_FIELDS})")
+                    bits |= FIELD_BITS[field]
+                self._severity_tests.append((kind, bits, severity))
+            elif 'min_fields' in rule:
+                self._severity_tests.append(('min_fields', int(rule['min_fields']), severity))
+            else:
+                raise ValueError(f"severity_rules[{i}] needs one of 'any_of', 'all_of' or 'min_fields'")
+
+        self.default_severity = self._check_severity(config.get('default_severity', 'Low'), 'default_severity')
+        self.missing_severity = self._check_severity(config.get('missing_severity', 'High'), 'missing_severity')
+
+        # Popcount lookup for min_fields over every possible mask value
+        self._field_counts = np.array(
+            [bin(value).count('1') for value in range(1 << len(MISMATCH_FIELDS))], dtype=np.int64
+        )
+
+    @staticmethod
+    def _check_params(params, where):
+        for param, value in params.items():
+            if param not in DEFAULT_TOLERANCES:
+                raise ValueError(f"Unknown tolerance '{param}' in {where}")
+            if not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f"Tolerance '{param}' in {where} must be a non-negative number")
+        return {param: float(value) for param, value in params.items()}
+
+    @staticmethod
+    def _check_severity(severity, where):
+        if severity not in SEVERITY_LEVELS:
+            raise ValueError(f"Invalid severity '{severity}' in {where} (expected one of {SEVERITY_LEVELS})")
+        return severity
+
+    def _scope_mapping(self, param, scope):
+        scoped = self._scoped.setdefault(param, [])
+        for existing_scope, mapping in scoped:
+            if existing_scope == scope:
+                return mapping
+        mapping = {}
+        scoped.append((scope, mapping))
+        scoped.sort(key=lambda item: OVERRIDE_SCOPES.index(item[0]))
+        return mapping
+
+    def parameter(self, merged, param):
+        """
+        Effective value of one tolerance parameter for every merged row.
+
+        Overrides are looked up on the broker-side key, falling back to the
+        exchange side for exchange-only rows.
+        """
+        values = np.full(len(merged), self.defaults[param], dtype=float)
+        for scope, mapping in self._scoped.get(param, []):
+            broker_key = merged[f'{scope}_broker']
+            from_broker = np.asarray(broker_key.map(mapping), dtype=float)
+            from_exchange = np.asarray(merged[f'{scope}_exchange'].map(mapping), dtype=float)
+            overridden = np.where(broker_key.notna().to_numpy(), from_broker, from_exchange)
+            values = np.where(np.isnan(overridden), values, overridden)
+        return values
+
+    def price_tolerance(self, merged):
+        """Per-row price tolerance: the widest of absolute, bps and tick-based limits"""
+        reference = merged['price_broker'].astype(float).fillna(merged['price_exchange'].astype(float))
+        return np.maximum.reduce([
+            self.parameter(merged, 'price_abs'),
+            self.parameter(merged, 'price_bps') * np.abs(reference.to_numpy()) / 10_000,
+            self.parameter(merged, 'price_ticks') * self.parameter(merged, 'tick_size'),
+        ])
+
+    def quantity_tolerance(self, merged):
+        """Per-row quantity tolerance: the wider of absolute and lot-based limits"""
+        return np.maximum(
+            self.parameter(merged, 'quantity_abs'),
+            self.parameter(merged, 'quantity_lots') * self.parameter(merged, 'lot_size')
+        )
+
+    def time_tolerance(self, merged):
+        """Per-row trade_time tolerance as timedelta64[ns]"""
+        seconds = self.parameter(merged, 'time_seconds')
+        return pd.to_timedelta(seconds, unit='s').to_numpy()
+
+    def severity(self, mismatch_mask):
+        """
+        Classify mismatched rows from their mismatch_mask bits.
+
+        Args:
+            mismatch_mask: Integer numpy array (see matching.FIELD_BITS)
+
+        Returns:
+            Object numpy array of severities
+        """
+        mask = np.asarray(mismatch_mask, dtype=np.int64)
+        conditions, choices = [], []
+        for kind, arg, severity in self._severity_tests:
+            if kind == 'any_of':
+                conditions.append((mask & arg) != 0)
+            elif kind == 'all_of':
+                conditions.append((mask & arg) == arg)
+            else:
+                conditions.append(self._field_counts[mask] >= arg)
+            choices.append(severity)
+        if not conditions:
+            return np.full(len(mask), self.default_severity, dtype=object)
+        return np.select(conditions, choices, default=self.default_severity).astype(object)
+
+
+def load_rules(path):
+    """
+    Load and compile tolerance rules from a JSON config file.
+
+    Missing sections fall back to DEFAULT_RULES_CONFIG.
+
+    Args:
+        path: Path to the JSON config
+
+    Returns:
+        ToleranceRules
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    merged_config = copy.deepcopy(DEFAULT_RULES_CONFIG)
+    merged_config.update(config)
+    return ToleranceRules(merged_config)
+
+
+_default_rules = None
+
+
+def default_rules():
+    """Shared compiled default rules"""
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = ToleranceRules()
+    return _default_rules
+
+
+def resolve_rules(rules):
+    """Accept None (defaults), a ToleranceRules, a config dict or a JSON path"""
+    if rules is None:
+        return default_rules()
+    if isinstance(rules, ToleranceRules):
+        return rules
+    if isinstance(rules, dict):
+        return ToleranceRules(rules)
+    return load_rules(rules)
@@ -0,0 +1,68 @@
+"""
+TradeRecon AI - Enriched exception spool
+Append-only JSON Lines file of enriched exceptions that can be re-read lazily,
+so long runs do not have to hold every enriched exception in memory
+"""
+
+import json
+import math
+
+
+def _json_default(value):
+    """JSON encoding for numpy scalars, timestamps and anything else"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _clean_nan(record):
+    """Replace NaN floats (not valid JSON) with None"""
+    return {
+        key: None if isinstance(value, float) and math.isnan(value) else value
+        for key, value in record.items()
+    }
+
+
+class ExceptionSpool:
+    """
+    JSON Lines spool of enriched exceptions
+
+    Records are written as they complete; iterating the spool re-reads the file,
+    so it can be passed wherever a sequence of enriched exceptions is consumed
+    (len() and repeated iteration are supported).
+    """
+
+    def __init__(self, path):
+        """Create (or truncate) the spool file"""
+        self.path = str(path)
+        self._count = 0
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def append(self, record):
+        """Write one enriched exception"""
+        self._file.write(json.dumps(_clean_nan(record), default=_json_default) + '\n')
+        self._count += 1
+
+    def close(self):
+        """Flush and close the spool for writing"""
+        if not self._file.closed:
+            self._file.close()
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        if not self._file.closed:
+            self._file.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,165 @@
+"""
+TradeRecon AI - Out-of-core streaming reconciliation
+Reconciles trade files larger than RAM by hash-partitioning them on disk
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from rules import resolve_rules
+from matching import (
+    REQUIRED_COLUMNS,
+    EXCEPTION_COLUMNS,
+    hash_partitions,
+    merge_trades,
+    reconcile_merged,
+)
+
+DEFAULT_PARTITIONS = 64
+DEFAULT_CHUNKSIZE = 500_000
+
+# Identifier columns are always read as text: per-chunk inference would turn
+# all-numeric trade_ids into int64 (dropping leading zeros) in some partitions
+# and leave them as strings in others, and merge refuses int64 vs object keys
+TEXT_COLUMNS = {'trade_id': str, 'symbol': str, 'side': str, 'currency': str, 'account_id': str}
+
+
+def _validate_header(path, side):
+    """Check the file header for required columns without reading any rows"""
+    columns = pd.read_csv(path, nrows=0).columns
+    for col in REQUIRED_COLUMNS:
+        if col not in columns:
+            raise ValueError(f"Missing column '{col}' in {side} trades")
+
+
+def partition_trades(path, side, work_dir, partitions=DEFAULT_PARTITIONS, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Hash-partition a trade file on trade_id into per-partition CSV files.
+
+    Only one chunk of the source file is held in memory at a time.
+
+    Args:
+        path: Source CSV path
+        side: 'broker' or 'exchange', used for file naming and error messages
+        work_dir: Directory that receives the partition files
+        partitions: Number of hash partitions
+        chunksize: Rows read per chunk
+
+    Returns:
+        List of partition file paths (a path may not exist if the partition is empty)
+    """
+    _validate_header(path, side)
+    paths = [Path(work_dir) / f'{side}_{i:04d}.csv' for i in range(partitions)]
+
+    for chunk in pd.read_csv(path, usecols=REQUIRED_COLUMNS, dtype=TEXT_COLUMNS, chunksize=chunksize):
+        part_ids = hash_partitions(chunk['trade_id'], partitions)
+        for part_id, part in chunk.groupby(part_ids, sort=False):
+            target = paths[part_id]
+            part.to_csv(target, mode='a', header=not target.exists(), index=False)
+
+    return paths
+
+
+def _read_partition(path):
+    """Load one partition, or an empty frame when nothing hashed into it"""
+    if path.exists():
+        return pd.read_csv(path, dtype=TEXT_COLUMNS)
+    return pd.DataFrame(columns=REQUIRED_COLUMNS)
+
+
+def iter_reconcile_partitions(broker_path, exchange_path, partitions=DEFAULT_PARTITIONS,
+                              chunksize=DEFAULT_CHUNKSIZE, work_dir=None, rules=None):
+    """
+    Reconcile two trade files partition by partition.
+
+    Both files are partitioned to a temporary directory first; each pair of
+    partitions is then merged and reconciled on its own, so peak memory is
+    bounded by the largest partition rather than the input size.
+
+    Args:
+        broker_path: Broker trades CSV path
+        exchange_path: Exchange trades CSV path
+        partitions: Number of hash partitions
+        chunksize: Rows read per chunk while partitioning
+        work_dir: Optional parent directory for partition files (defaults to system temp)
+        rules: Tolerance/severity rules (see rules.py); None keeps the defaults
+
+    Yields:
+        Reconciliation results dictionary for each non-empty partition
+    """
+    rules = resolve_rules(rules)
+    with tempfile.TemporaryDirectory(prefix='traderecon_', dir=work_dir) as tmp:
+        broker_parts = partition_trades(broker_path, 'broker', tmp, partitions, chunksize)
+        exchange_parts = partition_trades(exchange_path, 'exchange', tmp, partitions, chunksize)
+
+        for broker_part, exchange_part in zip(broker_parts, exchange_parts):
+            if not broker_part.exists() and not exchange_part.exists():
+                continue
+
+            merged = merge_trades(_read_partition(broker_part), _read_partition(exchange_part))
+            yield reconcile_merged(merged, rules)
+
+            # Free disk as we go
+            for part in (broker_part, exchange_part):
+                if part.exists():
+                    os.remove(part)
+
+
+def reconcile_trades_streaming(broker_path, exchange_path, partitions=DEFAULT_PARTITIONS,
+                               chunksize=DEFAULT_CHUNKSIZE, exceptions_path=None, work_dir=None,
+                               rules=None):
+    """
+    Out-of-core equivalent of reconcile_trades() for files larger than RAM.
+
+    Args:
+        broker_path: Broker trades CSV path
+        exchange_path: Exchange trades CSV path
+        partitions: Number of hash partitions
+        chunksize: Rows read per chunk while partitioning
+        exceptions_path: If given, exceptions are appended to this CSV as each
+            partition completes and are not kept in memory
+        work_dir: Optional parent directory for partition files
+        rules: Tolerance/severity rules (see rules.py); None keeps the defaults
+
+    Returns:
+        Dictionary containing reconciliation results. When exceptions_path is set,
+        'exceptions' is an empty frame and 'exceptions_path' points at the full set.
+    """
+    results = {
+        'total_trades': 0,
+        'matched_count': 0,
+        'mismatch_count': 0,
+        'missing_count': 0,
+        'exceptions': []
+    }
+
+    exceptions_frames = []
+    if exceptions_path is not None:
+        # Start from a fresh export with just the header
+        pd.DataFrame(columns=EXCEPTION_COLUMNS).to_csv(exceptions_path, index=False)
+
+    for part_results in iter_reconcile_partitions(broker_path, exchange_path, partitions,
+                                                  chunksize, work_dir, rules):
+        for key in ('total_trades', 'matched_count', 'mismatch_count', 'missing_count'):
+            results[key] += part_results[key]
+
+        part_exceptions = part_results['exceptions']
+        if len(part_exceptions) == 0:
+            continue
+        if exceptions_path is not None:
+            part_exceptions.to_csv(exceptions_path, mode='a', header=False, index=False)
+        else:
+            exceptions_frames.append(part_exceptions)
+
+    if exceptions_frames:
+        results['exceptions'] = pd.concat(exceptions_frames, ignore_index=True)
+    else:
+        results['exceptions'] = pd.DataFrame(columns=EXCEPTION_COLUMNS)
+
+    if exceptions_path is not None:
+        results['exceptions_path'] = str(exceptions_path)
+
+    return results
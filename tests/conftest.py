@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the top-level modules (matching, streaming, ...) directly
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
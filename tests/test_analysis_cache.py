@@ -0,0 +1,94 @@
+import sqlite3
+import time
+
+import pandas as pd
+
+from agents.analysis_cache import AnalysisCache, exception_signature, substitute_trade_id
+
+
+def _exception(trade_id):
+    return {
+        'trade_id': trade_id, 'exception_type': 'mismatch', 'mismatched_fields': 'price',
+        'symbol_broker': 'AAPL', 'account_id_broker': 'ACC001',
+        'price_broker': 150.25, 'price_exchange': 150.50,
+    }
+
+
+def test_numeric_trade_id_replaces_whole_tokens_only():
+    analysis = {
+        'root_cause': {'reason': 'Trade 1 was booked at 1.50 instead of 1,000.25 on 2024-01-01 at 10:01.'},
+        'fix_suggestion': {'estimated_time': '1 business day', 'suggested_fix': 'Amend trade 1 (ref 1-A).'},
+        'compliance_note': 'Trade 1: price corrected for TRD1 and 11 units.',
+        'full_explanation': 'Trade ID 1 (#1) needs 1 review.',
+    }
+
+    result = substitute_trade_id(analysis, 1, 7)
+
+    assert result['root_cause']['reason'] == \
+        'Trade 7 was booked at 1.50 instead of 1,000.25 on 2024-01-01 at 10:01.'
+    assert result['fix_suggestion']['estimated_time'] == '1 business day'
+    assert result['fix_suggestion']['suggested_fix'] == 'Amend trade 7 (ref 1-A).'
+    assert result['compliance_note'] == 'Trade 7: price corrected for TRD1 and 11 units.'
+    assert result['full_explanation'] == 'Trade ID 7 (#7) needs 1 review.'
+
+
+def test_alphanumeric_trade_id_is_replaced():
+    result = substitute_trade_id({'note': 'TRD001 and TRD0010 differ; see TRD001.'}, 'TRD001', 'TRD042')
+
+    assert result['note'] == 'TRD042 and TRD0010 differ; see TRD042.'
+
+
+def test_cache_hit_rewrites_numeric_trade_id(tmp_path):
+    cache = AnalysisCache(tmp_path / 'cache.sqlite')
+    cache.put(_exception('1'), {'severity': 'Low', 'full_explanation': 'Trade 1 should settle within 1 business day.'})
+
+    hit = cache.get(_exception('7'))
+
+    assert hit['full_explanation'] == 'Trade 7 should settle within 1 business day.'
+    assert hit['_trade_id'] == '7'
+    assert hit['_cache_hit'] is True
+
+
+def _price_break(trade_id, quantity, broker_price, exchange_price, time):
+    return {
+        'trade_id': trade_id, 'exception_type': 'mismatch', 'mismatched_fields': 'price',
+        'symbol_broker': 'AAPL', 'account_id_broker': 'ACC001',
+        'quantity_broker': quantity, 'quantity_exchange': quantity,
+        'price_broker': broker_price, 'price_exchange': exchange_price,
+        'trade_time_broker': pd.Timestamp(time), 'trade_time_exchange': pd.Timestamp(time),
+    }
+
+
+def test_cache_hit_quotes_the_requesting_trades_values(tmp_path):
+    source = _price_break('TRD001', 100, 150.25, 150.50, '2024-03-15 09:30:00')
+    other = _price_break('TRD002', 250, 98.10, 98.35, '2024-03-15 14:05:10')
+    assert exception_signature(source) == exception_signature(other)
+    cache = AnalysisCache(tmp_path / 'cache.sqlite')
+    cache.put(source, {
+        'root_cause': {'reason': 'TRD001 bought 100 shares at 150.25 but the exchange printed 150.50 '
+                                 '(notional 15,025.00 vs 15,050.00) at 09:30:00.'},
+        'severity': 'Low',
+    })
+
+    hit = cache.get(other)
+
+    assert hit['root_cause']['reason'] == (
+        'TRD002 bought 250 shares at 98.10 but the exchange printed 98.35 '
+        '(notional 24,525.00 vs 24,587.50) at 14:05:10.'
+    )
+    assert hit['_trade_id'] == 'TRD002'
+
+
+def test_entries_without_source_values_are_discarded(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    with sqlite3.connect(path) as conn:
+        conn.execute("""CREATE TABLE analysis_cache (signature TEXT PRIMARY KEY, trade_id TEXT NOT NULL,
+                        analysis TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)""")
+        conn.execute("INSERT INTO analysis_cache VALUES (?, 'TRD001', '{}', ?, ?)",
+                     (exception_signature(_exception('TRD001')), time.time(), time.time()))
+    conn.close()
+
+    cache = AnalysisCache(path)
+
+    assert cache.get(_exception('TRD002')) is None
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,53 @@
+import httpx
+from groq import RateLimitError
+
+from agents.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+MODEL = 'primary'
+
+
+def _rate_limit_error():
+    request = httpx.Request('POST', 'http://test/chat/completions')
+    response = httpx.Response(429, headers={'retry-after': '1'}, request=request)
+    return RateLimitError('Rate limit reached', response=response, body=None)
+
+
+def _state(breaker):
+    return breaker.metrics()['models'][MODEL]['state']
+
+
+def test_opens_after_failure_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=60)
+    for _ in range(2):
+        breaker.record_failure(MODEL, RuntimeError('boom'))
+    assert _state(breaker) == CLOSED
+
+    breaker.record_failure(MODEL, RuntimeError('boom'))
+
+    assert _state(breaker) == OPEN
+    assert not breaker.allow(MODEL)
+
+
+def test_rate_limit_failures_open_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=60)
+
+    for _ in range(3):
+        breaker.record_failure(MODEL, _rate_limit_error())
+
+    assert _state(breaker) == OPEN
+    assert breaker.metrics()['transitions'][-1]['reason'].endswith('RateLimitError')
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0)
+    breaker.record_failure(MODEL, _rate_limit_error())
+    assert _state(breaker) == OPEN
+
+    assert breaker.allow(MODEL)
+    assert _state(breaker) == HALF_OPEN
+    breaker.record_failure(MODEL, _rate_limit_error())
+    assert _state(breaker) == OPEN
+
+    assert breaker.allow(MODEL)
+    breaker.record_success(MODEL, latency=0.1)
+    assert _state(breaker) == CLOSED
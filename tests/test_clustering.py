@@ -0,0 +1,55 @@
+import pandas as pd
+
+from agents.clustering import cluster_exceptions, fan_out_analysis
+
+
+def _mismatch(trade_id, quantity_broker, quantity_exchange, price, time):
+    return {
+        'trade_id': trade_id, 'exception_type': 'mismatch', 'mismatched_fields': 'quantity',
+        'symbol_broker': 'AAPL', 'account_id_broker': 'ACC001',
+        'quantity_broker': quantity_broker, 'quantity_exchange': quantity_exchange,
+        'price_broker': price, 'price_exchange': price,
+        'trade_time_broker': pd.Timestamp(time), 'trade_time_exchange': pd.Timestamp(time),
+    }
+
+
+def _missing(trade_id, quantity, price):
+    return {
+        'trade_id': trade_id, 'exception_type': 'missing_in_exchange', 'mismatched_fields': 'N/A',
+        'symbol_broker': 'AAPL', 'account_id_broker': 'ACC001',
+        'quantity_broker': quantity, 'price_broker': price, 'trade_time_broker': pd.Timestamp('2024-03-15 09:30:00'),
+        'quantity_exchange': None, 'price_exchange': float('nan'), 'trade_time_exchange': pd.NaT,
+    }
+
+
+def test_fan_out_substitutes_member_values():
+    representative = _mismatch('TRD001', 120, 125, 178.9, '2024-03-15 09:35:00')
+    member = _mismatch('TRD002', 200, 205, 99.5, '2024-03-15 11:02:30')
+    assert cluster_exceptions([representative, member]) == [[0, 1]]
+    analysis = {
+        'root_cause': {'reason': 'Trade TRD001 was booked for 120 shares at $178.90 but the exchange '
+                                 'reports 125 shares at 09:35:00, a difference of 5 shares.'},
+        'risk_assessment': {'financial_risk': 'Notional of $21,468.00 is misstated.'},
+    }
+
+    fanned = fan_out_analysis(analysis, representative, member)
+
+    assert fanned['root_cause']['reason'] == (
+        'Trade TRD002 was booked for 200 shares at $99.50 but the exchange '
+        'reports 205 shares at 11:02:30, a difference of 5 shares.'
+    )
+    assert fanned['risk_assessment']['financial_risk'] == 'Notional of $19,900.00 is misstated.'
+    assert fanned['_trade_id'] == 'TRD002'
+    # The representative's own analysis is left untouched
+    assert analysis['root_cause']['reason'].startswith('Trade TRD001 was booked for 120 shares')
+    assert '_trade_id' not in analysis
+
+
+def test_missing_trades_cluster_by_size():
+    exceptions = [
+        _missing('T1', 100, 50.0),      # 5,000
+        _missing('T2', 150, 40.0),      # 6,000
+        _missing('T3', 50_000, 50.0),   # 2,500,000
+    ]
+
+    assert cluster_exceptions(exceptions) == [[0, 1], [2]]
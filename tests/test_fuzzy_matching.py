@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from matching import BLOCKING_FIELDS, fold_orphan_pairs, merge_trades, reconcile_trades
+
+
+def _trade(trade_id, trade_time='2024-03-15 09:30:00', **values):
+    trade = {'trade_id': trade_id, 'symbol': 'AAPL', 'side': 'BUY', 'quantity': 100, 'price': 150.25,
+             'currency': 'USD', 'trade_time': pd.Timestamp(trade_time), 'account_id': 'ACC001'}
+    trade.update(values)
+    return trade
+
+
+def _fold(broker, exchange, tolerance=pd.Timedelta(seconds=60)):
+    return fold_orphan_pairs(merge_trades(pd.DataFrame(broker), pd.DataFrame(exchange)), tolerance)
+
+
+def test_orphans_with_same_block_are_folded_into_one_row():
+    folded = _fold([_trade('B1')], [_trade('X1', trade_time='2024-03-15 09:30:20')])
+
+    assert len(folded) == 1
+    row = folded.iloc[0]
+    assert (row['trade_id'], row['trade_id_exchange'], row['_merge']) == ('B1', 'X1', 'both')
+    assert row['trade_time_exchange'] == pd.Timestamp('2024-03-15 09:30:20')
+
+
+def test_fuzzy_pair_is_reported_as_one_trade_id_mismatch():
+    broker = pd.DataFrame([_trade('B1'), _trade('T2')])
+    exchange = pd.DataFrame([_trade('X1', trade_time='2024-03-15 09:30:20'), _trade('T2')])
+
+    results = reconcile_trades(broker, exchange, fuzzy_match=True)
+
+    assert (results['missing_count'], results['mismatch_count'], results['matched_count']) == (0, 1, 1)
+    exception = results['exceptions'].iloc[0]
+    assert (exception['trade_id'], exception['trade_id_exchange']) == ('B1', 'X1')
+
+
+@pytest.mark.parametrize('field, value', [
+    ('symbol', 'MSFT'), ('side', 'SELL'), ('account_id', 'ACC002'), ('currency', 'EUR')
+])
+def test_orphans_in_different_blocks_are_not_paired(field, value):
+    assert field in BLOCKING_FIELDS
+
+    folded = _fold([_trade('B1')], [_trade('X1', **{field: value})])
+
+    assert sorted(folded['_merge']) == ['left_only', 'right_only']
+    assert folded['trade_id_exchange'].isna().all()
+
+
+@pytest.mark.parametrize('seconds, paired', [(59, True), (60, True), (61, False)])
+def test_time_window(seconds, paired):
+    exchange_time = pd.Timestamp('2024-03-15 09:30:00') + pd.Timedelta(seconds=seconds)
+
+    folded = _fold([_trade('B1')], [_trade('X1', trade_time=exchange_time)])
+
+    assert (len(folded) == 1) is paired
+
+
+def test_each_exchange_orphan_pairs_with_its_nearest_broker_orphan():
+    broker = [_trade('B1', trade_time='2024-03-15 09:30:00'), _trade('B2', trade_time='2024-03-15 09:30:40')]
+    exchange = [_trade('X1', trade_time='2024-03-15 09:30:30')]
+
+    folded = _fold(broker, exchange).set_index('trade_id')
+
+    assert folded.loc['B2', 'trade_id_exchange'] == 'X1'
+    assert folded.loc['B1', '_merge'] == 'left_only'
+    assert len(folded) == 2
+
+
+def test_orphans_without_trade_time_are_not_paired():
+    folded = _fold([_trade('B1', trade_time=pd.NaT)], [_trade('X1', trade_time=pd.NaT)])
+
+    assert sorted(folded['_merge']) == ['left_only', 'right_only']
@@ -0,0 +1,94 @@
+import pandas as pd
+
+from incremental import reconcile_trades_incremental
+from matching import reconcile_trades
+
+
+def _trades(count=6):
+    return pd.DataFrame({
+        'trade_id': [f'T{i:03d}' for i in range(count)],
+        'symbol': 'AAPL',
+        'side': 'BUY',
+        'quantity': 100,
+        'price': [150.0 + i for i in range(count)],
+        'currency': 'USD',
+        'trade_time': pd.date_range('2024-03-15 09:30:00', periods=count, freq='min'),
+        'account_id': 'ACC001',
+    })
+
+
+def _counts(results):
+    return {key: results[key] for key in ('total_trades', 'matched_count', 'mismatch_count', 'missing_count')}
+
+
+def test_rerun_carries_unchanged_matches_forward(tmp_path):
+    state = tmp_path / 'state.sqlite'
+    broker, exchange = _trades(), _trades()
+    exchange.loc[1, 'price'] += 1
+
+    first = reconcile_trades_incremental(broker, exchange, state_path=state)
+    second = reconcile_trades_incremental(broker, exchange, state_path=state)
+
+    assert first['delta_stats']['carried_forward'] == 0
+    assert second['delta_stats'] == {'carried_forward': 5, 'reexamined': 1, 'removed': 0, 'state_reset': False}
+    assert _counts(second) == _counts(reconcile_trades(broker, exchange))
+    assert second['exceptions']['trade_id'].tolist() == ['T001']
+
+
+def test_delta_rerun_reexamines_changed_and_new_trades(tmp_path):
+    state = tmp_path / 'state.sqlite'
+    broker, exchange = _trades(), _trades()
+    reconcile_trades_incremental(broker, exchange, state_path=state)
+
+    exchange.loc[2, 'quantity'] = 90
+    broker = pd.concat([broker, _trades(7).tail(1)], ignore_index=True)
+    results = reconcile_trades_incremental(broker, exchange, state_path=state)
+
+    assert results['delta_stats']['carried_forward'] == 5
+    assert results['delta_stats']['reexamined'] == 2
+    assert _counts(results) == _counts(reconcile_trades(broker, exchange))
+    assert sorted(results['exceptions']['trade_id']) == ['T002', 'T006']
+
+
+def test_removed_trades_are_dropped_from_state(tmp_path):
+    state = tmp_path / 'state.sqlite'
+    reconcile_trades_incremental(_trades(), _trades(), state_path=state)
+
+    results = reconcile_trades_incremental(_trades(4), _trades(4), state_path=state)
+
+    assert results['delta_stats'] == {'carried_forward': 4, 'reexamined': 0, 'removed': 2, 'state_reset': False}
+    assert results['total_trades'] == 4
+
+
+def test_rules_change_discards_state(tmp_path):
+    state = tmp_path / 'state.sqlite'
+    broker, exchange = _trades(), _trades()
+    exchange.loc[3, 'price'] += 0.05
+    loose = {'tolerances': {'price_abs': 0.1}}
+
+    first = reconcile_trades_incremental(broker, exchange, state_path=state, rules=loose)
+    assert first['matched_count'] == 6
+
+    # T003 matched under the loose tolerance and must not be carried forward under the default one
+    second = reconcile_trades_incremental(broker, exchange, state_path=state)
+    assert second['delta_stats']['state_reset'] is True
+    assert second['delta_stats']['carried_forward'] == 0
+    assert second['exceptions']['trade_id'].tolist() == ['T003']
+
+    third = reconcile_trades_incremental(broker, exchange, state_path=state)
+    assert third['delta_stats']['state_reset'] is False
+    assert third['delta_stats']['carried_forward'] == 5
+
+
+def test_fuzzy_pairs_are_reexamined_on_both_sides(tmp_path):
+    state = tmp_path / 'state.sqlite'
+    broker, exchange = _trades(), _trades()
+    exchange.loc[4, 'trade_id'] = 'X004'
+
+    first = reconcile_trades_incremental(broker, exchange, state_path=state, fuzzy_match=True)
+    second = reconcile_trades_incremental(broker, exchange, state_path=state, fuzzy_match=True)
+
+    expected = _counts(reconcile_trades(broker, exchange, fuzzy_match=True))
+    assert _counts(first) == expected
+    assert _counts(second) == expected
+    assert second['delta_stats']['reexamined'] == 2
@@ -0,0 +1,21 @@
+import sys
+
+import instrumentation
+from instrumentation import PipelineProfiler, peak_rss_mb
+
+
+def test_peak_rss_is_reported_where_resource_exists():
+    assert peak_rss_mb() > 0
+
+
+def test_profiler_works_without_resource_or_psutil(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'resource', None)
+    monkeypatch.setitem(sys.modules, 'psutil', None)
+    profiler = PipelineProfiler()
+
+    with profiler.stage('merge', rows=10):
+        pass
+
+    assert peak_rss_mb() is None
+    assert profiler.as_dict()['stages'][0]['peak_rss_mb'] is None
+    assert profiler.format_table().splitlines()[1].rstrip().endswith('n/a')
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+from groq import APITimeoutError
+
+from agents.backends import FakeBackend
+from agents.circuit_breaker import OPEN, CircuitBreaker
+from agents.intelligence_engine import TradeReconIntelligenceEngine
+
+PRIMARY = 'openai/gpt-oss-120b'
+
+
+class RecordingBackend(FakeBackend):
+    """FakeBackend that remembers which model each call went to"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.models = []
+
+    def complete(self, model, messages, max_tokens, temperature, timeout):
+        self.models.append(model)
+        return super().complete(model, messages, max_tokens, temperature, timeout)
+
+
+class ThrottledBackend(RecordingBackend):
+    """Rate-limits the first throttled_calls calls, then answers normally"""
+
+    def __init__(self, throttled_calls, **kwargs):
+        super().__init__(**kwargs)
+        self.throttled_calls = throttled_calls
+
+    def complete(self, model, messages, max_tokens, temperature, timeout):
+        self.rate_limit_rate = 1.0 if len(self.models) < self.throttled_calls else 0.0
+        return super().complete(model, messages, max_tokens, temperature, timeout)
+
+
+def _exception(i):
+    return {
+        'trade_id': f'TRD{i:03d}', 'exception_type': 'mismatch', 'mismatched_fields': 'price',
+        'symbol_broker': 'AAPL', 'account_id_broker': 'ACC001',
+        'broker_values': 'price=150.25', 'exchange_values': f'price={151 + i}',
+    }
+
+
+def test_always_rate_limited_primary_opens_the_breaker():
+    backend = RecordingBackend(rate_limit_rate=0.0, retry_after=0.0,
+                               model_overrides={PRIMARY: {'rate_limit_rate': 1.0}})
+    engine = TradeReconIntelligenceEngine(backend=backend, max_retries=1, backoff_base=0.0,
+                                          breaker=CircuitBreaker(failure_threshold=2, cooldown_seconds=60))
+
+    analyses = [engine.analyze_exception(_exception(i)) for i in range(5)]
+
+    assert engine.breaker.metrics()['models'][PRIMARY]['state'] == OPEN
+    # Two exceptions exhaust their retries on the primary; after that it is skipped
+    assert backend.models.count(PRIMARY) == 2 * (engine.max_retries + 1)
+    assert all(analysis['_engine_model'] == engine.fallback_model for analysis in analyses)
+
+
+def test_transient_rate_limit_does_not_count_as_failure():
+    backend = ThrottledBackend(throttled_calls=1, retry_after=0.0)
+    engine = TradeReconIntelligenceEngine(backend=backend, max_retries=3, backoff_base=0.0,
+                                          breaker=CircuitBreaker(failure_threshold=1))
+
+    analysis = engine.analyze_exception(_exception(0))
+
+    assert backend.models == [PRIMARY, PRIMARY]
+    assert analysis['_engine_model'] == PRIMARY
+    assert engine.breaker.metrics()['models'][PRIMARY]['failed_calls'] == 0
+
+
+def test_slow_backend_times_out_at_the_request_timeout():
+    backend = RecordingBackend(model_overrides={PRIMARY: {'latency_seconds': 5.0}})
+    engine = TradeReconIntelligenceEngine(backend=backend, request_timeout=0.05, max_retries=1, backoff_base=0.0,
+                                          breaker=CircuitBreaker(failure_threshold=10))
+
+    started = time.perf_counter()
+    analysis = engine.analyze_exception(_exception(0))
+    elapsed = time.perf_counter() - started
+
+    # Both primary attempts wait out the timeout, then the fast fallback answers
+    assert elapsed < 1.0
+    assert backend.models == [PRIMARY, PRIMARY, engine.fallback_model]
+    assert analysis['_engine_model'] == engine.fallback_model
+    assert engine.breaker.metrics()['models'][PRIMARY]['failed_calls'] == 2
+
+
+def test_fake_backend_raises_the_groq_timeout_error():
+    backend = FakeBackend(latency_seconds=1.0)
+
+    started = time.perf_counter()
+    with pytest.raises(APITimeoutError):
+        backend.complete(PRIMARY, [{'role': 'user', 'content': '{}'}], max_tokens=10, temperature=0.2, timeout=0.05)
+
+    assert 0.05 <= time.perf_counter() - started < 0.5
@@ -0,0 +1,32 @@
+import io
+
+import pandas as pd
+
+from loader import load_trades
+from matching import reconcile_trades
+
+HEADER = 'trade_id,symbol,side,quantity,price,currency,trade_time,account_id'
+
+
+def _csv(*rows):
+    source = io.StringIO('\n'.join((HEADER,) + rows))
+    source.name = 'trades.csv'
+    return source
+
+
+def test_blank_quantity_loads_and_is_reported():
+    broker = load_trades(_csv('T1,AAPL,BUY,,150.25,USD,2024-03-15 09:30:00,ACC001'))
+    exchange = load_trades(_csv('T1,AAPL,BUY,100,150.25,USD,2024-03-15 09:30:00,ACC001'))
+
+    assert str(broker['quantity'].dtype) == 'Int64'
+    assert pd.isna(broker.loc[0, 'quantity'])
+
+    results = reconcile_trades(broker, exchange)
+    assert results['mismatch_count'] == 1
+
+
+def test_blank_on_both_sides_is_not_a_mismatch():
+    row = 'T1,AAPL,BUY,,150.25,USD,2024-03-15 09:30:00,ACC001'
+    results = reconcile_trades(load_trades(_csv(row)), load_trades(_csv(row)))
+
+    assert results['matched_count'] == 1
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from matching import reconcile_trades, render_exceptions
+
+FIELDS = ['symbol', 'side', 'quantity', 'price', 'currency', 'account_id']
+
+
+def _reference_reconcile(broker_df, exchange_df):
+    """
+    The original row-by-row reconcile_trades(), kept as the behavioural reference.
+
+    One deliberate difference: a numeric value present on one side only is a
+    mismatch (the original silently matched it because NaN never exceeds the tolerance).
+    """
+    broker = broker_df.assign(trade_time=pd.to_datetime(broker_df['trade_time']))
+    exchange = exchange_df.assign(trade_time=pd.to_datetime(exchange_df['trade_time']))
+    merged = pd.merge(broker, exchange, on='trade_id', how='outer', suffixes=('_broker', '_exchange'), indicator=True)
+
+    counts = {'total_trades': len(merged), 'matched_count': 0, 'mismatch_count': 0, 'missing_count': 0}
+    exceptions = []
+    for _, row in merged.iterrows():
+        if row['_merge'] == 'left_only':
+            counts['missing_count'] += 1
+            exceptions.append((row['trade_id'], 'missing_in_exchange', 'N/A', 'High'))
+            continue
+        if row['_merge'] == 'right_only':
+            counts['missing_count'] += 1
+            exceptions.append((row['trade_id'], 'missing_in_broker', 'N/A', 'High'))
+            continue
+
+        mismatches = []
+        for field in FIELDS:
+            broker_val, exchange_val = row[f'{field}_broker'], row[f'{field}_exchange']
+            if pd.isna(broker_val) and pd.isna(exchange_val):
+                continue
+            if field in ('price', 'quantity'):
+                if pd.isna(broker_val) != pd.isna(exchange_val) or abs(float(broker_val) - float(exchange_val)) > 0.01:
+                    mismatches.append(field)
+            elif str(broker_val) != str(exchange_val):
+                mismatches.append(field)
+        time_diff = abs((row['trade_time_broker'] - row['trade_time_exchange']).total_seconds())
+        if time_diff > 1:
+            mismatches.append('trade_time')
+
+        severity = 'Low'
+        if 'quantity' in mismatches or 'price' in mismatches or 'side' in mismatches or 'symbol' in mismatches:
+            severity = 'High'
+        elif len(mismatches) > 2:
+            severity = 'Medium'
+
+        if mismatches:
+            counts['mismatch_count'] += 1
+            exceptions.append((row['trade_id'], 'mismatch', ', '.join(mismatches), severity))
+        else:
+            counts['matched_count'] += 1
+    return counts, sorted(exceptions)
+
+
+def _trade(trade_id, **values):
+    trade = {'trade_id': trade_id, 'symbol': 'AAPL', 'side': 'BUY', 'quantity': 100.0, 'price': 150.25,
+             'currency': 'USD', 'trade_time': '2024-03-15 09:30:00', 'account_id': 'ACC001'}
+    trade.update(values)
+    return trade
+
+
+def _frames():
+    broker = [
+        _trade('T01'),
+        _trade('T02', price=150.00),                       # price one tolerance away
+        _trade('T03', price=150.00),                       # price just inside the tolerance
+        _trade('T04', quantity=100.0),                     # quantity exactly one tolerance away
+        _trade('T05', price=np.nan),                       # NaN on both sides: not a mismatch
+        _trade('T06', price=np.nan),                       # NaN on one side: mismatch
+        _trade('T07', trade_time=None),                    # NaT on both sides
+        _trade('T08', trade_time=None),                    # NaT on one side
+        _trade('T09', trade_time='2024-03-15 09:30:01'),   # exactly on the 1s time tolerance
+        _trade('T10', trade_time='2024-03-15 09:30:02'),   # beyond it
+        _trade('T11', symbol='MSFT'),
+        _trade('T12', currency='EUR', account_id='ACC002', trade_time='2024-03-15 09:31:00'),
+        _trade('T13'),                                     # duplicate trade_id on the broker side
+        _trade('T13', quantity=200.0),
+        _trade('T14'),                                     # missing in exchange
+        _trade('T16', side='SELL', quantity=np.nan),
+    ]
+    exchange = [
+        _trade('T01'),
+        _trade('T02', price=150.01),
+        _trade('T03', price=150.005),
+        _trade('T04', quantity=100.01),
+        _trade('T05', price=np.nan),
+        _trade('T06'),
+        _trade('T07', trade_time=None),
+        _trade('T08'),
+        _trade('T09'),
+        _trade('T10'),
+        _trade('T11'),
+        _trade('T12'),
+        _trade('T13'),
+        _trade('T15'),                                     # missing in broker
+        _trade('T16', quantity=np.nan),
+    ]
+    return pd.DataFrame(broker), pd.DataFrame(exchange)
+
+
+def test_matches_row_by_row_reference():
+    broker, exchange = _frames()
+    expected_counts, expected_exceptions = _reference_reconcile(broker, exchange)
+
+    results = reconcile_trades(broker, exchange)
+
+    assert {key: results[key] for key in expected_counts} == expected_counts
+    rendered = render_exceptions(results['exceptions'])
+    actual = sorted(zip(rendered['trade_id'], rendered['exception_type'],
+                        rendered['mismatched_fields'], rendered['severity']))
+    assert actual == expected_exceptions
+
+
+def test_boundary_cases_are_classified_as_expected():
+    broker, exchange = _frames()
+
+    rendered = render_exceptions(reconcile_trades(broker, exchange)['exceptions']).set_index('trade_id')
+
+    # On the boundary the float difference decides, exactly as it did row by row:
+    # 150.01 - 150.00 is just under 0.01, 100.01 - 100.0 just over
+    assert 'T02' not in rendered.index
+    assert 'T03' not in rendered.index
+    assert rendered.loc['T04', 'mismatched_fields'] == 'quantity'
+    assert 'T05' not in rendered.index
+    assert rendered.loc['T06', 'mismatched_fields'] == 'price'
+    assert 'T07' not in rendered.index and 'T08' not in rendered.index and 'T09' not in rendered.index
+    assert rendered.loc['T10', 'mismatched_fields'] == 'trade_time'
+    assert rendered.loc['T12', 'severity'] == 'Medium'
+    assert rendered.loc['T14', 'exception_type'] == 'missing_in_exchange'
+    assert rendered.loc['T15', 'exception_type'] == 'missing_in_broker'
+
+
+def test_rendered_values_match_reference_format():
+    broker, exchange = _frames()
+
+    rendered = render_exceptions(reconcile_trades(broker, exchange)['exceptions']).set_index('trade_id')
+
+    assert rendered.loc['T11', 'broker_values'] == 'symbol=MSFT'
+    assert rendered.loc['T11', 'exchange_values'] == 'symbol=AAPL'
+    assert rendered.loc['T14', 'broker_values'] == 'symbol=AAPL, quantity=100.0, price=150.25'
+    assert rendered.loc['T14', 'exchange_values'] == 'NOT FOUND'
+    assert rendered.loc['T10', 'broker_values'] == 'trade_time=2024-03-15 09:30:02'
@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+from agents.backends import FakeBackend
+from benchmarks.synthetic_trades import generate_trade_pair
+from main import TradeReconOrchestrator
+
+
+@pytest.mark.parametrize('batch_analysis', [False, True])
+def test_closing_the_event_stream_stops_analysis(batch_analysis):
+    broker_df, exchange_df = generate_trade_pair(2000, seed=7)
+    backend = FakeBackend(latency_seconds=0.05)
+    orchestrator = TradeReconOrchestrator(cache_path=None, backend=backend)
+
+    events = orchestrator.iter_full_reconciliation(broker_df, exchange_df, max_concurrency=2, batch_analysis=batch_analysis,
+                                                   cluster_analysis=False, triage=False)
+    total = None
+    for event in events:
+        if event['event'] == 'exception':
+            total = event['total']
+            break
+    events.close()
+
+    # In-flight requests may finish; nothing new is started afterwards
+    time.sleep(0.2)
+    calls = backend.calls
+    time.sleep(0.3)
+    assert backend.calls == calls
+    assert calls < total / 2
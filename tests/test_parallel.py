@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic_trades import generate_trade_pair
+from matching import reconcile_trades, render_exceptions
+from parallel import reconcile_trades_parallel
+from rules import load_rules
+
+SAMPLE_RULES = Path(__file__).resolve().parent.parent / 'sample_data' / 'tolerance_rules.json'
+
+
+def _trade_pair():
+    broker, exchange = generate_trade_pair(3000, mismatch_rate=0.05, missing_rate=0.02,
+                                           duplicate_rate=0.01, time_skew_rate=0.02, seed=11)
+    # Account partitioning is only exact when both systems agree on account_id
+    accounts = broker.set_index('trade_id')['account_id']
+    exchange['account_id'] = exchange['trade_id'].map(accounts).fillna(exchange['account_id'])
+    return broker, exchange
+
+
+def _canonical(exceptions):
+    rendered = render_exceptions(exceptions)
+    return rendered.sort_values(list(rendered.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('partition_key', ['trade_id', 'account_id'])
+def test_process_pool_matches_reconcile_trades(partition_key):
+    broker, exchange = _trade_pair()
+    rules = load_rules(SAMPLE_RULES)
+    expected = reconcile_trades(broker, exchange, rules=rules)
+
+    results = reconcile_trades_parallel(broker, exchange, workers=2, partitions=5,
+                                        partition_key=partition_key, rules=rules)
+
+    for key in ('total_trades', 'matched_count', 'mismatch_count', 'missing_count'):
+        assert results[key] == expected[key]
+    assert expected['mismatch_count'] and expected['missing_count']
+    assert _canonical(results['exceptions']).equals(_canonical(expected['exceptions']))
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from matching import merge_trades, reconcile_trades
+from rules import ToleranceRules
+
+OVERRIDES = {
+    'currency': {'JPY': {'price_abs': 1.0}},
+    'symbol': {'AAPL': {'price_abs': 2.0}},
+    'account_id': {'ACC009': {'price_abs': 3.0}},
+}
+
+
+def _trade(trade_id, **values):
+    trade = {'trade_id': trade_id, 'symbol': 'MSFT', 'side': 'BUY', 'quantity': 100, 'price': 150.0,
+             'currency': 'USD', 'trade_time': pd.Timestamp('2024-03-15 09:30:00'), 'account_id': 'ACC001'}
+    trade.update(values)
+    return trade
+
+
+def _merged(broker, exchange):
+    return merge_trades(pd.DataFrame(broker), pd.DataFrame(exchange)).set_index('trade_id', drop=False)
+
+
+def test_scope_precedence_account_over_symbol_over_currency():
+    trades = [
+        _trade('DEFAULT'),
+        _trade('CCY', currency='JPY'),
+        _trade('SYM', currency='JPY', symbol='AAPL'),
+        _trade('ACCT', currency='JPY', symbol='AAPL', account_id='ACC009'),
+    ]
+    merged = _merged(trades, trades)
+
+    values = pd.Series(ToleranceRules({'overrides': OVERRIDES}).parameter(merged, 'price_abs'), index=merged.index)
+
+    assert values.to_dict() == {'DEFAULT': 0.01, 'CCY': 1.0, 'SYM': 2.0, 'ACCT': 3.0}
+
+
+def test_precedence_is_independent_of_config_order():
+    reordered = {scope: OVERRIDES[scope] for scope in reversed(list(OVERRIDES))}
+    trades = [_trade('ACCT', currency='JPY', symbol='AAPL', account_id='ACC009')]
+
+    values = ToleranceRules({'overrides': reordered}).parameter(_merged(trades, trades), 'price_abs')
+
+    assert values.tolist() == [3.0]
+
+
+def test_overrides_apply_per_parameter():
+    rules = ToleranceRules({'overrides': {
+        'currency': {'JPY': {'price_abs': 1.0, 'time_seconds': 5}},
+        'symbol': {'AAPL': {'price_abs': 2.0}},
+    }})
+    trades = [_trade('T1', currency='JPY', symbol='AAPL')]
+    merged = _merged(trades, trades)
+
+    assert rules.parameter(merged, 'price_abs').tolist() == [2.0]
+    assert rules.parameter(merged, 'time_seconds').tolist() == [5.0]
+
+
+def test_one_sided_rows_fall_back_to_the_exchange_key():
+    rules = ToleranceRules({'overrides': OVERRIDES})
+    merged = _merged([_trade('BROKER_ONLY', symbol='AAPL')], [_trade('EXCHANGE_ONLY', account_id='ACC009')])
+
+    values = pd.Series(rules.parameter(merged, 'price_abs'), index=merged.index)
+
+    assert values.to_dict() == {'BROKER_ONLY': 2.0, 'EXCHANGE_ONLY': 3.0}
+
+
+def test_broker_key_wins_when_both_sides_are_present():
+    rules = ToleranceRules({'overrides': OVERRIDES})
+    merged = _merged([_trade('T1', symbol='AAPL')], [_trade('T1', symbol='TSLA')])
+
+    assert rules.parameter(merged, 'price_abs').tolist() == [2.0]
+
+
+def test_price_tolerance_takes_the_widest_limit():
+    rules = ToleranceRules({'tolerances': {'price_abs': 0.01, 'price_bps': 10, 'tick_size': 0.05, 'price_ticks': 2}})
+    trades = [_trade('T1', price=50.0), _trade('T2', price=1000.0)]
+
+    tolerance = rules.price_tolerance(_merged(trades, trades))
+
+    np.testing.assert_allclose(tolerance, [0.1, 1.0])
+
+
+def test_overrides_change_reconciliation_outcome():
+    broker = pd.DataFrame([_trade('T1', symbol='AAPL'), _trade('T2')])
+    exchange = pd.DataFrame([_trade('T1', symbol='AAPL', price=151.0), _trade('T2', price=151.0)])
+
+    results = reconcile_trades(broker, exchange, rules={'overrides': OVERRIDES})
+
+    assert results['exceptions']['trade_id'].tolist() == ['T2']
+
+
+@pytest.mark.parametrize('config, message', [
+    ({'overrides': {'exchange': {'XNYS': {'price_abs': 1}}}}, "Unknown override scope 'exchange'"),
+    ({'tolerances': {'price_pct': 1}}, "Unknown tolerance 'price_pct'"),
+    ({'overrides': {'symbol': {'AAPL': {'lot_size': 'ten'}}}}, 'must be a non-negative number'),
+    ({'tolerances': {'price_abs': -0.01}}, 'must be a non-negative number'),
+    ({'severity_rules': [{'severity': 'Critical', 'any_of': ['price']}]}, "Invalid severity 'Critical'"),
+    ({'severity_rules': [{'severity': 'High', 'any_of': ['venue']}]}, "Unknown field 'venue'"),
+    ({'severity_rules': [{'severity': 'High'}]}, "needs one of 'any_of', 'all_of' or 'min_fields'"),
+    ({'default_severity': 'Urgent'}, "Invalid severity 'Urgent' in default_severity"),
+])
+def test_invalid_config_is_rejected(config, message):
+    with pytest.raises(ValueError, match=message):
+        ToleranceRules(config)
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from streaming import reconcile_trades_streaming
+
+TRADE = {
+    'symbol': 'AAPL', 'side': 'BUY', 'quantity': 100, 'price': 10.0, 'currency': 'USD',
+    'trade_time': '2024-01-01 10:00:00', 'account_id': 'ACC1',
+}
+
+
+def _write(path, trade_ids):
+    pd.DataFrame([dict(TRADE, trade_id=trade_id) for trade_id in trade_ids]).to_csv(path, index=False)
+    return path
+
+
+def test_numeric_and_alphanumeric_trade_ids_merge(tmp_path):
+    # One partition holds only numeric ids on the broker side and a mix on the exchange side
+    broker = _write(tmp_path / 'broker.csv', ['1001', '1002'])
+    exchange = _write(tmp_path / 'exchange.csv', ['1001', 'T1002'])
+
+    results = reconcile_trades_streaming(broker, exchange, partitions=1)
+
+    assert results['matched_count'] == 1
+    assert results['missing_count'] == 2
+
+
+def test_leading_zeros_are_kept(tmp_path):
+    broker = _write(tmp_path / 'broker.csv', ['0042'])
+    exchange = _write(tmp_path / 'exchange.csv', ['42'])
+
+    results = reconcile_trades_streaming(broker, exchange, partitions=1)
+
+    assert results['matched_count'] == 0
+    assert set(results['exceptions']['trade_id']) == {'0042', '42'}
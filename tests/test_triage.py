@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import pandas as pd
+
+from agents.triage import ROUNDING_DISCREPANCY, NOT_TRIAGED, triage_exceptions
+from matching import reconcile_trades
+from rules import ToleranceRules, load_rules
+
+TRADE = {
+    'symbol': 'MSFT', 'side': 'BUY', 'quantity': 100, 'currency': 'USD',
+    'trade_time': pd.Timestamp('2024-03-15 09:30:00'), 'account_id': 'ACC001',
+}
+
+
+def _patterns(broker_prices, exchange_prices, rules, symbol='MSFT'):
+    trade = dict(TRADE, symbol=symbol)
+    broker = pd.DataFrame([dict(trade, trade_id=f'T{i}', price=p) for i, p in enumerate(broker_prices)])
+    exchange = pd.DataFrame([dict(trade, trade_id=f'T{i}', price=p) for i, p in enumerate(exchange_prices)])
+    exceptions = reconcile_trades(broker, exchange, rules=rules)['exceptions']
+    return list(triage_exceptions(exceptions, rules))
+
+
+def test_rounding_with_default_rules():
+    # Default price tolerance 0.01 and tick 0.01: 0.015 is a rounding break, 0.05 is not
+    rules = ToleranceRules()
+
+    assert _patterns([100.00, 100.00], [100.015, 100.05], rules) == [ROUNDING_DISCREPANCY, NOT_TRIAGED]
+
+
+def test_rounding_with_sample_rules():
+    # AAPL: tick 0.01, tolerance 2 ticks
+    rules = load_rules(Path(__file__).resolve().parent.parent / 'sample_data' / 'tolerance_rules.json')
+
+    assert _patterns([150.00, 150.00], [150.025, 150.05], rules, symbol='AAPL') == [ROUNDING_DISCREPANCY, NOT_TRIAGED]